@@ -54,10 +54,11 @@ if __name__ == "__main__":
 
     setup_requires = ["setuptools_scm"]
 
-    data_requirements = ["vivarium_inputs>={{cookiecutter.vivarium_inputs_version}}"]
+    data_requirements = ["vivarium_inputs>={{cookiecutter.vivarium_inputs_version}}", "pyarrow"]
     interactive_requirements = ["vivarium_dependencies[interactive]"]
     cluster_requirements = ["vivarium_cluster_tools>={{cookiecutter.vivarium_cluster_tools_version}}"]
     test_requirements = ["vivarium_dependencies[pytest]"]
+    benchmark_requirements = ["pytest-benchmark"]
     lint_requirements = ["vivarium_dependencies[lint]"]
 
     setup(
@@ -77,6 +78,7 @@ if __name__ == "__main__":
             "cluster": cluster_requirements,
             "data": data_requirements + cluster_requirements,
             "interactive": interactive_requirements,
+            "benchmark": test_requirements + benchmark_requirements,
             "dev": test_requirements
             + cluster_requirements
             + lint_requirements
@@ -92,5 +94,7 @@ if __name__ == "__main__":
         entry_points="""
             [console_scripts]
             make_artifacts={{cookiecutter.package_name}}.tools.cli:make_artifacts
+            artifact_status={{cookiecutter.package_name}}.tools.cli:artifact_status
+            benchmark_write_profiles={{cookiecutter.package_name}}.tools.cli:benchmark_write_profiles
         """,
     )
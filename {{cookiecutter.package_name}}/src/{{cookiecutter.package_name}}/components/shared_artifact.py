@@ -0,0 +1,339 @@
+"""A node-local shared memory cache of artifact data for simulation workers.
+
+Under ``psimulate`` every worker on a node opens the artifact named in the
+model specification and reads the same tables from it, decompressing every
+draw of every table into its own memory just to keep one draw. This module
+provides an artifact manager that decodes each table once per node into
+POSIX shared memory instead. Workers attach to the shared table read-only
+and only copy the draw they simulate, so the memory and startup time of a
+node no longer grow with the number of workers on it.
+
+To use it, replace the artifact manager in the model specification::
+
+    plugins:
+        required:
+            data:
+                controller: "{{cookiecutter.package_name}}.components.shared_artifact.SharedMemoryArtifactManager"
+                builder_interface: "vivarium.framework.artifact.ArtifactInterface"
+
+Shared tables are named after the path, size and modification time of the
+artifact, so rebuilding an artifact never serves stale data. They hold every
+draw, so workers simulating different input draws share the same tables.
+Each table and its lock file are removed when the last worker using it
+exits. Tables left behind by workers that were killed are removed when the
+next worker that uses them exits.
+
+"""
+import _posixshmem
+import atexit
+import fcntl
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+from collections.abc import Callable
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+import pandas as pd
+from vivarium.framework.artifact import Artifact, ArtifactException, hdf
+from vivarium.framework.artifact.manager import (
+    ArtifactManager,
+    get_base_filter_terms,
+    parse_artifact_path_config,
+)
+
+SHARED_TABLE_PREFIX = "artifact_"
+# Lock files live next to the shared memory segments, so every process that
+# can see a segment also sees its lock
+LOCK_DIR = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+# Written at the start of a segment once it is completely filled in
+READY = b"shared01"
+# Offsets of the header fields and the alignment of the table values
+HEADER_SIZE = 16
+ALIGNMENT = 64
+# Byte ranges of the lock file. The first serializes creating the segment,
+# the second is held shared by every process attached to it.
+CREATE_LOCK, USERS_LOCK = 0, 1
+
+
+class SharedTable(NamedTuple):
+    """A shared memory segment this process is attached to."""
+
+    memory: SharedMemory
+    lock_file: int
+
+
+_ATTACHED: dict[str, SharedTable] = {}
+
+
+def get_shared_filter_terms(filter_terms: list[str] | None) -> list[str] | None:
+    """Returns the filter terms that apply to a shared table.
+
+    Terms on draws are left out, since every draw is shared.
+
+    """
+    terms = [term for term in filter_terms or [] if not _is_draw_term(term)]
+    return terms or None
+
+
+def filter_draw_rows(data: pd.DataFrame, filter_terms: list[str] | None) -> pd.DataFrame:
+    """Applies the draw filter terms to a table stored long on draws.
+
+    Tables with a ``draw`` index level or column hold one row per draw, so
+    the artifact filters their rows on the draw terms. Other tables are
+    returned as they are.
+
+    """
+    draw_terms = [term for term in filter_terms or [] if _is_draw_term(term)]
+    if not draw_terms or "draw" not in [*data.index.names, *data.columns]:
+        return data
+    return data.query(" & ".join(f"({term})" for term in draw_terms))
+
+
+def _is_draw_term(term: str) -> bool:
+    # Mirrors how vivarium finds the draw terms among its filter terms
+    conditions = re.split("[&|]", re.sub("[()]", "", term))
+    return any(
+        re.split("[<=>! ]", condition.strip())[0] == "draw" for condition in conditions
+    )
+
+
+def get_shared_table_name(
+    artifact_path: str | Path, key: str, filter_terms: list[str] | None
+) -> str:
+    """Returns the name of the shared memory segment holding a key of an artifact.
+
+    ``filter_terms`` are the terms the shared table is loaded with (see
+    :func:`get_shared_filter_terms`).
+
+    """
+    artifact_path = Path(artifact_path).resolve()
+    stat = artifact_path.stat()
+    identity = [str(artifact_path), stat.st_size, stat.st_mtime_ns, key, filter_terms]
+    digest = hashlib.sha256(repr(identity).encode()).hexdigest()
+    # Names of POSIX shared memory segments are short on some platforms
+    return f"{SHARED_TABLE_PREFIX}{digest[:20]}"
+
+
+def load_shared(name: str, load: Callable[[], Any]) -> Any:
+    """Returns data held in shared memory, loading it into shared memory first if needed.
+
+    Data frames whose columns all have the same numeric dtype are returned
+    as read-only views of the shared memory. Anything else is stored
+    pickled and each process gets its own copy, which still saves
+    decoding it from the artifact.
+
+    Parameters
+    ----------
+    name
+        The name of the shared memory segment.
+    load
+        Loads the data if no process on the node has put it in shared
+        memory yet.
+
+    Returns
+    -------
+        The data held in the segment.
+
+    """
+    if name not in _ATTACHED:
+        if not _ATTACHED:
+            atexit.register(release_shared)
+        lock_file = _lock(LOCK_DIR / f"{name}.lock")
+        try:
+            memory = _attach(name)
+            if memory is None:
+                memory = _create(name, load())
+            fcntl.lockf(lock_file, fcntl.LOCK_SH, 1, USERS_LOCK)
+            fcntl.lockf(lock_file, fcntl.LOCK_UN, 1, CREATE_LOCK)
+        except BaseException:
+            # Closing the file releases every lock this process holds on it
+            os.close(lock_file)
+            raise
+        _ATTACHED[name] = SharedTable(memory, lock_file)
+    return _read(_ATTACHED[name].memory)
+
+
+def release_shared() -> None:
+    """Detaches this process from every shared table.
+
+    Tables no other process is attached to are removed from shared memory
+    along with their lock files. Data returned by :func:`load_shared` must
+    not be used afterwards.
+
+    """
+    while _ATTACHED:
+        name, table = _ATTACHED.popitem()
+        fcntl.lockf(table.lock_file, fcntl.LOCK_EX, 1, CREATE_LOCK)
+        try:
+            fcntl.lockf(table.lock_file, fcntl.LOCK_UN, 1, USERS_LOCK)
+            try:
+                fcntl.lockf(table.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, USERS_LOCK)
+            except OSError:  # Another process is still attached
+                pass
+            else:
+                _unlink(table.memory)
+                # Processes waiting on this lock file notice it was removed
+                # and lock a new one (see _lock)
+                (LOCK_DIR / f"{name}.lock").unlink(missing_ok=True)
+        finally:
+            # Closing the file releases every lock this process holds on it
+            os.close(table.lock_file)
+
+
+def _lock(path: Path) -> int:
+    """Opens a lock file and takes its create lock."""
+    while True:
+        lock_file = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            fcntl.lockf(lock_file, fcntl.LOCK_EX, 1, CREATE_LOCK)
+            # The last process to detach may have removed the file while this
+            # process was waiting for the lock.
+            try:
+                current = os.stat(path).st_ino == os.fstat(lock_file).st_ino
+            except FileNotFoundError:
+                current = False
+        except BaseException:
+            os.close(lock_file)
+            raise
+        if current:
+            return lock_file
+        os.close(lock_file)
+
+
+def _attach(name: str) -> SharedMemory | None:
+    try:
+        memory = SharedMemory(name)
+    except FileNotFoundError:
+        return None
+    _untrack(memory)
+    if bytes(memory.buf[: len(READY)]) != READY:
+        # Left behind by a process that died while filling it in
+        memory.close()
+        _unlink(memory)
+        return None
+    return memory
+
+
+def _create(name: str, data: Any) -> SharedMemory:
+    if _is_shareable_table(data):
+        values = data.to_numpy()
+        header = {
+            "index": data.index,
+            "columns": data.columns,
+            "dtype": values.dtype.str,
+            "shape": values.shape,
+        }
+    else:
+        values, header = None, {"data": data}
+    header = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)
+    offset = -(-(HEADER_SIZE + len(header)) // ALIGNMENT) * ALIGNMENT
+    size = offset + (values.nbytes if values is not None else 0)
+
+    memory = SharedMemory(name, create=True, size=size)
+    _untrack(memory)
+    try:
+        memory.buf[len(READY) : HEADER_SIZE] = len(header).to_bytes(8, "little")
+        memory.buf[HEADER_SIZE : HEADER_SIZE + len(header)] = header
+        if values is not None:
+            # Column-major, so that each draw is a contiguous block
+            shared = np.ndarray(
+                values.shape, values.dtype, buffer=memory.buf, offset=offset, order="F"
+            )
+            shared[:] = values
+            del shared
+        memory.buf[: len(READY)] = READY
+    except BaseException:
+        _unlink(memory)
+        raise
+    return memory
+
+
+def _read(memory: SharedMemory) -> Any:
+    header_size = int.from_bytes(memory.buf[len(READY) : HEADER_SIZE], "little")
+    header = pickle.loads(memory.buf[HEADER_SIZE : HEADER_SIZE + header_size])
+    if "data" in header:
+        return header["data"]
+    offset = -(-(HEADER_SIZE + header_size) // ALIGNMENT) * ALIGNMENT
+    values = np.ndarray(
+        header["shape"], header["dtype"], buffer=memory.buf, offset=offset, order="F"
+    )
+    values.flags.writeable = False
+    return pd.DataFrame(values, index=header["index"], columns=header["columns"], copy=False)
+
+
+def _is_shareable_table(data: Any) -> bool:
+    return (
+        isinstance(data, pd.DataFrame)
+        and not data.empty
+        and data.columns.is_unique
+        and data.dtypes.nunique() == 1
+        and data.dtypes.iloc[0].kind in "biuf"
+    )
+
+
+def _untrack(memory: SharedMemory) -> None:
+    # The resource tracker would remove the segment when this process exits,
+    # even when other processes are still attached to it.
+    resource_tracker.unregister(memory._name, "shared_memory")
+
+
+def _unlink(memory: SharedMemory) -> None:
+    # SharedMemory.unlink would unregister the segment from the resource
+    # tracker a second time, which makes the tracker print a KeyError.
+    _posixshmem.shm_unlink(memory._name)
+
+
+class SharedMemoryArtifact(Artifact):
+    """An artifact whose tables are decoded once per node into shared memory.
+
+    Each table is read with every draw and shared between all processes on
+    the node, whichever draw they simulate. Draw filter terms are applied
+    once the shared table is read: they select the draw columns of wide
+    tables and the rows of tables stored long on draws, so each process
+    only copies its own draws.
+
+    """
+
+    def load(self, entity_key: str) -> Any:
+        if entity_key not in self:
+            raise ArtifactException(f"{entity_key} should be in {self.path}.")
+
+        if entity_key not in self._cache:
+            filter_terms = get_shared_filter_terms(self._filter_terms)
+            name = get_shared_table_name(self.path, entity_key, filter_terms)
+            data = load_shared(
+                name, lambda: hdf.load(self._path, entity_key, filter_terms, None)
+            )
+            if isinstance(data, pd.DataFrame):
+                if self._draw_column_filter is not None:
+                    data = data[[c for c in data.columns if c in self._draw_column_filter]]
+                data = filter_draw_rows(data, self._filter_terms)
+            self._cache[entity_key] = data
+
+        return self._cache[entity_key]
+
+
+class SharedMemoryArtifactManager(ArtifactManager):
+    """An artifact manager that shares artifact data between the workers of a node."""
+
+    def _load_artifact(self, configuration) -> SharedMemoryArtifact | None:
+        if not configuration.input_data.artifact_path:
+            return None
+        artifact_path = parse_artifact_path_config(configuration)
+        base_filter_terms = get_base_filter_terms(configuration)
+        self.logger.info(
+            f"Running simulation from artifact located at {artifact_path} "
+            "through node-local shared memory."
+        )
+        self.logger.info(f"Artifact base filter terms are {base_filter_terms}.")
+        self.logger.info(f"Artifact additional filter terms are {self.config_filter_term}.")
+        return SharedMemoryArtifact(artifact_path, base_filter_terms)
+
+    def __repr__(self) -> str:
+        return "SharedMemoryArtifactManager()"
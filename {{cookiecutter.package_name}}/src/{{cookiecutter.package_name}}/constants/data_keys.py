@@ -25,6 +25,10 @@ class __Population(NamedTuple):
     def log_name(self):
         return "population"
 
+    @property
+    def write_profile(self):
+        return "default"
+
 
 POPULATION = __Population()
 
@@ -55,6 +59,11 @@ class __SomeDisease(NamedTuple):
     def log_name(self):
         return "some disease"
 
+    @property
+    def write_profile(self):
+        # One of metadata.WRITE_PROFILES
+        return "default"
+
 
 SOME_DISEASE = __SomeDisease()
 
@@ -63,3 +72,13 @@ MAKE_ARTIFACT_KEY_GROUPS = [
     # TODO: list all key groups here
     # SOME_DISEASE
 ]
+
+# Keys whose loaders read other keys through ``loader.get_data``, mapped to
+# the keys they read. Inputs don't have to be artifact keys themselves. The
+# build loads each input once, keeps it in memory until every key that
+# depends on it is loaded, and loads independent keys in parallel. Loaders
+# must read their inputs for the location and years they were called with.
+KEY_DEPENDENCIES = {
+    # TODO: declare derived keys here, e.g.
+    # SOME_RISK.PAF: [SOME_RISK.DISTRIBUTION, SOME_RISK.EXPOSURE, SOME_RISK.RELATIVE_RISK],
+}
@@ -1,7 +1,5 @@
 from typing import NamedTuple
 
-import pandas as pd
-
 ####################
 # Project metadata #
 ####################
@@ -14,11 +12,54 @@ MAKE_ARTIFACT_MEM = 10  # GB
 MAKE_ARTIFACT_CPU = 1
 MAKE_ARTIFACT_RUNTIME = "3:00:00"
 MAKE_ARTIFACT_SLEEP = 10
+MAKE_ARTIFACT_MAX_STATUS_QUERIES = 32  # per monitoring cycle, when verbose
+MAKE_ARTIFACT_MAX_RETRIES = 2
+MAKE_ARTIFACT_MAX_MEM = 120  # GB
+MAKE_ARTIFACT_MAX_RUNTIME = "24:00:00"
+DATA_CACHE_MAX_SIZE = 20  # GB
+
+
+class WriteProfile(NamedTuple):
+    """Storage settings for the tables written to an artifact."""
+
+    complib: str | None = "zlib"  # zlib, lzo, bzip2 or blosc[:blosclz|lz4|lz4hc|zlib|zstd]
+    complevel: int = 9
+    format: str = "table"  # table or fixed
+    # Sets the chunk shape PyTables picks for the table
+    expected_rows: int | None = None
+    # float32 values and a categorical/narrow demographic index
+    compact_dtypes: bool = False
+
+
+# Key groups pick one of these by name. "default" matches what
+# ``Artifact.write`` does on its own.
+WRITE_PROFILES = {
+    "default": WriteProfile(),
+    "fast": WriteProfile("blosc:lz4", 5),
+    "compact": WriteProfile("blosc:zstd", 7),
+    "uncompressed": WriteProfile(None, 0),
+    "compact_dtypes": WriteProfile(compact_dtypes=True),
+}
+# The largest relative change float32 rounding may make to a value before
+# the column is kept as float64 under compact dtypes. This is the rounding
+# error of float32 itself, so only values outside its normal range (which
+# overflow or lose precision as subnormals) keep a column as float64.
+COMPACT_DTYPES_RTOL = 2**-24
+# Strings in tables written in chunks are stored with at least this width,
+# since the width is fixed by the first chunk written.
+CHUNKED_WRITE_MIN_ITEMSIZE = 64
 
 LOCATIONS = [
     # TODO - project locations here
 ]
 
+# Modelable entities pulled once for all locations when building all artifacts,
+# with the measures to stage for each. See data/staging.py.
+STAGED_MODELABLE_ENTITIES = {
+    # TODO - modelable entity ids loaded with loader._load_em_from_meid, e.g.
+    # 1234: ["Prevalence", "Incidence rate"],
+}
+
 ARTIFACT_INDEX_COLUMNS = [
     "sex",
     "age_start",
@@ -28,7 +69,17 @@ ARTIFACT_INDEX_COLUMNS = [
 ]
 
 DRAW_COUNT = 1000
-ARTIFACT_COLUMNS = pd.Index([f"draw_{i}" for i in range(DRAW_COUNT)])
+
+
+def __getattr__(name: str):
+    # The command line tools import this module, so pandas is only imported
+    # once ARTIFACT_COLUMNS is first used
+    if name == "ARTIFACT_COLUMNS":
+        import pandas as pd
+
+        globals()[name] = pd.Index([f"draw_{i}" for i in range(DRAW_COUNT)])
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class __Scenarios(NamedTuple):
@@ -1,3 +1,5 @@
+import getpass
+import tempfile
 from pathlib import Path
 
 import {{cookiecutter.package_name}}
@@ -6,4 +8,10 @@ from {{cookiecutter.package_name}}.constants import metadata
 BASE_DIR = Path({{cookiecutter.package_name}}.__file__).resolve().parent
 
 ARTIFACT_ROOT = Path(f"/mnt/team/simulation_science/pub/models/{metadata.PROJECT_NAME}/artifacts/")
+# Extracts are cached on the disk of the machine building the artifact
+DATA_CACHE_ROOT = (
+    Path(tempfile.gettempdir())
+    / f"{metadata.PROJECT_NAME}_{getpass.getuser()}"
+    / "data_cache"
+)
 
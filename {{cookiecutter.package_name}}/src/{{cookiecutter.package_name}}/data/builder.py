@@ -9,14 +9,26 @@ Some degree of verbosity/boilerplate is fine in the interest of transparency.
    Logging in this module should be done at the ``debug`` level.
 
 """
+import shutil
+from collections.abc import Iterator
 from pathlib import Path
+from typing import NamedTuple
 
 import pandas as pd
+import tables
 from loguru import logger
-from vivarium.framework.artifact import Artifact, EntityKey
+from vivarium.framework.artifact import Artifact, EntityKey, hdf
 
-from {{cookiecutter.package_name}}.constants import data_keys
-from {{cookiecutter.package_name}}.data import loader
+from {{cookiecutter.package_name}}.constants import data_keys, metadata
+from {{cookiecutter.package_name}}.data import compact, draw_store, loader
+from {{cookiecutter.package_name}}.data.manifest import (
+    ArtifactManifest,
+    TableHasher,
+    hash_data,
+)
+
+# The index level year-partitioned builds split tables on
+YEAR_COLUMN = "year_start"
 
 
 def open_artifact(output_path: Path, location: str) -> Artifact:
@@ -48,9 +60,59 @@ def open_artifact(output_path: Path, location: str) -> Artifact:
     return artifact
 
 
+class ChunkedTable(NamedTuple):
+    """What was written for a key whose data was loaded in chunks.
+
+    The chunks can only be read once, so this is all that is left of them
+    once they have been written.
+
+    """
+
+    shape: tuple[int, int]
+    hash: str
+
+
+def is_chunked(data) -> bool:
+    """Returns whether loaded data is an iterator of chunks of a table."""
+    return isinstance(data, Iterator)
+
+
+def has_years(data) -> bool:
+    """Returns whether loaded data is a table indexed by year (or its chunks)."""
+    if is_chunked(data):
+        return True
+    return isinstance(data, pd.DataFrame) and YEAR_COLUMN in data.index.names
+
+
+class ArtifactData:
+    """A handle to the data stored under a single key of an artifact.
+
+    The data is only read back from disk when :meth:`load` is called, so
+    builds that never look at what they wrote don't pay for a full read.
+
+    """
+
+    def __init__(self, artifact: Artifact, key: str):
+        self.artifact = artifact
+        self.key = key
+
+    def load(self):
+        """Reads the data for this key from the artifact."""
+        return self.artifact.load(self.key)
+
+    def __repr__(self) -> str:
+        return f"ArtifactData({str(self.artifact.path)}, {self.key})"
+
+
 def load_and_write_data(
-    artifact: Artifact, key: str, location: str, years: str | None, replace: bool
-):
+    artifact: Artifact,
+    key: str,
+    location: str,
+    years: str | None,
+    replace: bool,
+    verify: bool = False,
+    manifest: ArtifactManifest | None = None,
+) -> ArtifactData:
     """Loads data and writes it to the artifact if not already present.
 
     Parameters
@@ -64,25 +126,488 @@ def load_and_write_data(
         write to.
     replace
         Flag which determines whether to overwrite existing data
+    verify
+        Whether to check the shape of the written data against the
+        loaded data.
+    manifest
+        The manifest of the artifact. If given, data being replaced is only
+        rewritten if its hash differs from the hash the manifest recorded
+        for the key.
+
+    Returns
+    -------
+        A handle that reads the data from the artifact on demand.
 
     """
-    if key in artifact and not replace:
+    if not needs_data(artifact, key, replace):
         logger.debug(f"Data for {key} already in artifact.  Skipping...")
     else:
-        logger.debug(f"Loading data for {key} for location {location}.")
-        # years is either a string we want to convert to an int, 'all', or None
-        years = int(years) if years and years != "all" else years
-        data = loader.get_data(key, location, years)
-        if key not in artifact:
-            logger.debug(f"Writing data for {key} to artifact.")
-            artifact.write(key, data)
-        else:  # key is in artifact, but should be replaced
-            logger.debug(f"Replacing data for {key} in artifact.")
-            artifact.replace(key, data)
-    return artifact.load(key)
-
-
-def write_data(artifact: Artifact, key: str, data: pd.DataFrame):
+        data = load_data(key, location, years)
+        if is_unchanged(artifact, manifest, key, data):
+            logger.debug(f"Data for {key} is unchanged.  Skipping...")
+        else:
+            write_or_replace_data(artifact, key, data, verify)
+    return ArtifactData(artifact, key)
+
+
+def is_unchanged(
+    artifact: Artifact, manifest: ArtifactManifest | None, key: str, data
+) -> bool:
+    """Determines whether freshly loaded data matches the data stored for a key.
+
+    The data is hashed and compared with the hash the manifest recorded
+    when the key was written, so the stored data is never read. Data
+    stored with a different write profile than its key group now asks for
+    is rewritten, even if its content is unchanged. Chunked data can't be
+    hashed before it is written and is never unchanged.
+
+    Parameters
+    ----------
+    artifact
+        The artifact the key would be written to.
+    manifest
+        The manifest of the artifact, which must be current. Nothing is
+        unchanged without one.
+    key
+        The entity key associated with the data.
+    data
+        The loaded data.
+
+    Returns
+    -------
+        Whether the key is in the artifact and its stored data has the same
+        content as ``data`` and is stored with the key's write profile.
+
+    """
+    if manifest is None or key not in manifest or key not in artifact or is_chunked(data):
+        return False
+    return manifest.has_profile(key, get_write_profile(key)) and manifest.has_hash(
+        key, hash_data(data)
+    )
+
+
+def needs_data(artifact: Artifact | ArtifactManifest, key: str, replace: bool) -> bool:
+    """Determines whether data for a key must be (re)loaded into the artifact.
+
+    Parameters
+    ----------
+    artifact
+        The artifact to check, or its manifest to avoid opening it.
+    key
+        The entity key associated with the data.
+    replace
+        Flag which determines whether to overwrite existing data
+
+    Returns
+    -------
+        Whether the key is missing from the artifact or should be replaced.
+
+    """
+    return key not in artifact or replace
+
+
+def load_data(key: str, location: str, years: str | None):
+    """Loads data for a key without touching the artifact.
+
+    This is safe to call from worker threads, since it only reads from
+    the data sources behind :func:`loader.get_data`.
+
+    Parameters
+    ----------
+    key
+        The entity key associated with the data to load.
+    location
+        The location associated with the data to load.
+    years
+        Years for which to load data. Can be a single year or 'all'.
+        If not specified, load the most recent year.
+
+    Returns
+    -------
+        The loaded data.
+
+    """
+    logger.debug(f"Loading data for {key} for location {location}.")
+    return loader.get_data(key, location, parse_years(years))
+
+
+def parse_years(years: str | int | list[int] | None) -> int | str | list[int] | None:
+    """Returns the years of a build in the form :func:`loader.get_data` takes them."""
+    # years is either a string we want to convert to an int, 'all',
+    # 'estimation', None or, for year-partitioned builds, a year or list of years
+    if years == "estimation":
+        return get_build_years()
+    return int(years) if isinstance(years, str) and years != "all" else years
+
+
+def get_build_years() -> list[int]:
+    """Returns the years a year-partitioned build loads one at a time.
+
+    These are the GBD estimation years, the only years data can be pulled
+    for one at a time. ``years="all"`` also holds the years in between,
+    which are only available when pulling every year at once.
+
+    """
+    return loader.get_estimation_years()
+
+
+def get_missing_years(manifest: ArtifactManifest, key: str, years: list[int]) -> list[int]:
+    """Returns the years a year-partitioned build still has to write for a key.
+
+    Parameters
+    ----------
+    manifest
+        The manifest of the artifact, which must be current.
+    key
+        The entity key of a key in the artifact.
+    years
+        The years of the build.
+
+    Returns
+    -------
+        The years the manifest doesn't record for the key. Keys recorded
+        without years, which aren't indexed by year or weren't built by
+        year, are never missing any.
+
+    """
+    recorded = manifest.get_years(key)
+    if recorded is None:
+        return []
+    return [year for year in years if year not in recorded]
+
+
+def load_data_by_year(key: str, location: str, years: list[int], stream: bool = True):
+    """Loads data for a key for a set of years in a year-partitioned build.
+
+    Parameters
+    ----------
+    key
+        The entity key associated with the data to load.
+    location
+        The location associated with the data to load.
+    years
+        The years to load.
+    stream
+        Whether to load the data one year at a time. The first year is
+        loaded right away and the rest only as the returned chunks are
+        consumed, so only one year is held in memory at a time. Keys that
+        other keys depend on, or that depend on other keys, can't be
+        chunked and are loaded for every year at once instead.
+
+    Returns
+    -------
+        The loaded data, trimmed to ``years`` if it is indexed by year. If
+        ``stream`` is set and the data is indexed by year, an iterator of
+        the data for each year. Data that isn't indexed by year is the same
+        for every year and is returned as is.
+
+    """
+    if not stream:
+        data = load_data(key, location, years)
+        if has_years(data) and not is_chunked(data):
+            data = data[data.index.get_level_values(YEAR_COLUMN).isin(years)]
+        return data
+
+    data = load_data(key, location, years[0])
+    if not has_years(data):
+        return data
+    return _load_remaining_years(data, key, location, years[1:])
+
+
+def _load_remaining_years(
+    data, key: str, location: str, years: list[int]
+) -> Iterator[pd.DataFrame]:
+    while True:
+        if is_chunked(data):
+            yield from data
+        else:
+            yield data
+        if not years:
+            return
+        year, years = years[0], years[1:]
+        data = load_data(key, location, year)
+
+
+def write_or_replace_data(
+    artifact: Artifact,
+    key: str,
+    data,
+    verify: bool = False,
+    profile: metadata.WriteProfile | None = None,
+) -> ChunkedTable | None:
+    """Writes data to the artifact, replacing the key if it already exists.
+
+    Artifact writes are not thread-safe, so this must only ever be called
+    from a single writer thread.
+
+    Data loaded as an iterator of chunks is appended to the artifact one
+    chunk at a time (see :func:`write_chunks`).
+
+    Parameters
+    ----------
+    artifact
+        The artifact to write to.
+    key
+        The entity key associated with the data to write.
+    data
+        The data to write.
+    verify
+        Whether to check the shape of the written data against ``data``.
+    profile
+        The storage settings to write the data with. Defaults to the write
+        profile of the key group the key belongs to.
+
+    Returns
+    -------
+        The shape and hash of the written table if ``data`` was chunked,
+        otherwise ``None``.
+
+    """
+    profile = get_write_profile(key) if profile is None else profile
+    if is_chunked(data):
+        return write_chunks(artifact, key, data, verify, profile)
+
+    if key in artifact:
+        logger.debug(f"Replacing data for {key} in artifact.")
+        artifact.remove(key)
+    else:
+        logger.debug(f"Writing data for {key} to artifact.")
+
+    if profile == metadata.WRITE_PROFILES["default"] or not isinstance(
+        data, (pd.DataFrame, pd.Series)
+    ):
+        artifact.write(key, data)
+    else:
+        if profile.format != "table":
+            raise ValueError(
+                f"Cannot write {key} in {profile.format} format. Artifacts can only "
+                "read data stored in table format."
+            )
+        write_hdf(artifact.path, key, data, profile)
+        # Artifact.write can't be given storage settings, so register the key
+        # with the artifact's keyspace ourselves.
+        artifact._keys.append(key)
+    if verify:
+        verify_data(artifact, key, data)
+
+
+def get_write_profile(key: str) -> metadata.WriteProfile:
+    """Returns the write profile of the key group a key belongs to.
+
+    Keys outside of ``data_keys.MAKE_ARTIFACT_KEY_GROUPS`` and key groups
+    without a ``write_profile`` use the default profile.
+
+    """
+    for key_group in data_keys.MAKE_ARTIFACT_KEY_GROUPS:
+        if key in key_group:
+            return metadata.WRITE_PROFILES[getattr(key_group, "write_profile", "default")]
+    return metadata.WRITE_PROFILES["default"]
+
+
+def write_hdf(
+    path: str | Path, key: str, data: pd.DataFrame | pd.Series, profile: metadata.WriteProfile
+) -> None:
+    """Writes a table to an HDF file with the given storage settings.
+
+    The table is stored the same way :meth:`Artifact.write` stores it, so
+    it can be read with :meth:`Artifact.load` if it is in table format.
+    The key is not added to the keyspace of any artifact. If the profile
+    asks for compact dtypes, :meth:`Artifact.load` returns the table in
+    those dtypes; read it back with
+    :func:`{{cookiecutter.package_name}}.utilities.read_compact_data` to
+    restore its original dtypes.
+
+    Parameters
+    ----------
+    path
+        The path of the HDF file to write to.
+    key
+        The entity key associated with the data to write.
+    data
+        The data to write.
+    profile
+        The storage settings to write the data with.
+
+    """
+    if data.empty:
+        # Mirrors Artifact.write, which stores the index of empty tables as
+        # columns since empty tables can't be written in table format.
+        data = data.reset_index()
+        if data.empty:
+            raise ValueError("Cannot write an empty dataframe that does not have an index.")
+        attrs, data_columns = {"is_empty": True}, True
+    else:
+        attrs, data_columns = {"is_empty": False}, None
+        if profile.compact_dtypes and isinstance(data, pd.DataFrame):
+            data, attrs["compact"] = compact.compact_dtypes(data)
+
+    node = EntityKey(key).path
+    with pd.HDFStore(path, complib=profile.complib, complevel=profile.complevel) as store:
+        if profile.format == "table":
+            store.append(
+                node,
+                data,
+                format="table",
+                data_columns=data_columns,
+                expectedrows=profile.expected_rows or len(data),
+            )
+        else:
+            store.put(node, data, format=profile.format)
+        store.get_storer(node).attrs.metadata = attrs
+
+
+def write_chunks(
+    artifact: Artifact,
+    key: str,
+    chunks: Iterator[pd.DataFrame],
+    verify: bool = False,
+    profile: metadata.WriteProfile | None = None,
+    append: bool = False,
+) -> ChunkedTable:
+    """Appends a table to the artifact one block of rows at a time.
+
+    Only one chunk is held in memory at a time, so the peak memory of the
+    write is bounded by the size of the largest chunk rather than the size
+    of the table. The key is only registered with the artifact once every
+    chunk has been written, so a build that dies part way through leaves
+    unregistered data that :func:`rollback_keys` removes. The key is
+    replaced if it already exists, unless ``append`` is set.
+
+    Parameters
+    ----------
+    artifact
+        The artifact to write to.
+    key
+        The entity key associated with the data to write.
+    chunks
+        Consecutive blocks of rows of the table, e.g. one per year or one
+        per category. Every chunk must have the same columns. Empty chunks
+        are skipped.
+    verify
+        Whether to check the shape of the written table against the total
+        shape of the chunks.
+    profile
+        The storage settings to write the data with. Defaults to the write
+        profile of the key group the key belongs to.
+    append
+        Whether to append the chunks to the table already stored for the
+        key, e.g. to add a year to a year-partitioned key. The stored table
+        must have been written in chunks. A build that dies part way
+        through appending leaves the key incomplete and
+        :func:`rollback_keys` removes it entirely.
+
+    Returns
+    -------
+        The shape of the written table and the hash of the chunks. When
+        appending, the shape is that of the whole table but the hash only
+        covers the appended chunks.
+
+    Raises
+    ------
+    ValueError
+        If the profile doesn't write in table format or asks for compact
+        dtypes, if the chunks don't all have the same columns as each other
+        and as the table appended to, if every chunk is empty or if
+        appending to a key that isn't in the artifact.
+
+    """
+    profile = get_write_profile(key) if profile is None else profile
+    if profile.format != "table" or profile.compact_dtypes:
+        raise ValueError(
+            f"Cannot write {key} in chunks with a profile that doesn't append to a table "
+            "or that asks for compact dtypes."
+        )
+    if append and key not in artifact:
+        raise ValueError(f"Cannot append to {key} since it isn't in the artifact.")
+    elif append:
+        logger.debug(f"Appending data for {key} to artifact in chunks.")
+    elif key in artifact:
+        logger.debug(f"Replacing data for {key} in artifact.")
+        artifact.remove(key)
+    else:
+        logger.debug(f"Writing data for {key} to artifact in chunks.")
+
+    node = EntityKey(key).path
+    hasher = TableHasher()
+    n_rows, columns, n_new_rows = 0, None, 0
+    with pd.HDFStore(
+        artifact.path, complib=profile.complib, complevel=profile.complevel
+    ) as store:
+        if append:
+            n_rows = int(store.get_storer(node).nrows)
+            columns = list(store.select(node, stop=0).columns)
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            if columns is None:
+                columns = list(chunk.columns)
+            elif list(chunk.columns) != columns:
+                raise ValueError(
+                    f"Chunk of {key} has columns {list(chunk.columns)}, but the rest "
+                    f"of the table has columns {columns}."
+                )
+            store.append(
+                node,
+                chunk,
+                format="table",
+                # The width of string columns is fixed by the first chunk
+                min_itemsize={"values": metadata.CHUNKED_WRITE_MIN_ITEMSIZE},
+                expectedrows=profile.expected_rows,
+            )
+            hasher.update(chunk)
+            n_rows += len(chunk)
+            n_new_rows += len(chunk)
+            logger.debug(f"Appended {len(chunk)} rows to {key}.")
+        if not n_new_rows:
+            raise ValueError(f"Every chunk loaded for {key} is empty.")
+        store.get_storer(node).attrs.metadata = {"is_empty": False}
+
+    if not append:
+        artifact._keys.append(key)
+    written = ChunkedTable((n_rows, len(columns)), hasher.hexdigest())
+    if verify:
+        verify_data(artifact, key, written)
+    return written
+
+
+def write_by_year(
+    artifact: Artifact, key: str, data, append: bool = False, verify: bool = False
+) -> ChunkedTable | None:
+    """Writes data loaded by :func:`load_data_by_year` to the artifact.
+
+    Data indexed by year is always written in chunks (see
+    :func:`write_chunks`), so that later builds can append years to it.
+    Anything else is written as usual.
+
+    Parameters
+    ----------
+    artifact
+        The artifact to write to.
+    key
+        The entity key associated with the data to write.
+    data
+        The data to write.
+    append
+        Whether to append the years in ``data`` to the years already stored
+        for the key instead of replacing it.
+    verify
+        Whether to check the shape of the written data.
+
+    Returns
+    -------
+        The shape and hash of the written table if ``data`` is indexed by
+        year, otherwise ``None``.
+
+    """
+    if not has_years(data):
+        return write_or_replace_data(artifact, key, data, verify)
+    chunks = data if is_chunked(data) else iter([data])
+    return write_chunks(artifact, key, chunks, verify, append=append)
+
+
+def write_data(
+    artifact: Artifact, key: str, data: pd.DataFrame, verify: bool = False
+) -> ArtifactData:
     """Writes data to the artifact if not already present.
 
     Parameters
@@ -93,6 +618,12 @@ def write_data(artifact: Artifact, key: str, data: pd.DataFrame):
         The entity key associated with the data to write.
     data
         The data to write.
+    verify
+        Whether to check the shape of the written data against ``data``.
+
+    Returns
+    -------
+        A handle that reads the data from the artifact on demand.
 
     """
     if key in artifact:
@@ -100,15 +631,169 @@ def write_data(artifact: Artifact, key: str, data: pd.DataFrame):
     else:
         logger.debug(f"Writing data for {key} to artifact.")
         artifact.write(key, data)
-    return artifact.load(key)
+        if verify:
+            verify_data(artifact, key, data)
+    return ArtifactData(artifact, key)
+
+
+def verify_data(artifact: Artifact, key: str, data) -> None:
+    """Checks that the table stored for a key has the same shape as ``data``.
+
+    Only the table metadata is read, so this is much cheaper than loading
+    the key back. Data that isn't a :class:`pandas.DataFrame` or a
+    :class:`ChunkedTable` is stored as a small json blob and isn't checked.
+    Keys in the draw store are checked against its metadata.
+
+    Parameters
+    ----------
+    artifact
+        The artifact the data was written to.
+    key
+        The entity key associated with the written data.
+    data
+        The data that was written.
+
+    Raises
+    ------
+    ValueError
+        If the stored table doesn't have the same number of rows and
+        columns as ``data``.
+
+    """
+    if not isinstance(data, (pd.DataFrame, ChunkedTable)):
+        return
+
+    draw_root = draw_store.get_draw_store_root(artifact.path)
+    if draw_store.has_key(draw_root, key):
+        stored_shape = draw_store.get_shape(draw_root, key)
+    else:
+        with pd.HDFStore(artifact.path, mode="r") as store:
+            storer = store.get_storer(EntityKey(key).path)
+            if not storer.is_table:
+                logger.debug(
+                    f"Data for {key} is not stored as a table. Skipping verification."
+                )
+                return
+            # Multi-indexed frames are stored with their index levels as columns
+            index_levels = storer.levels if isinstance(storer.levels, list) else []
+            columns = [c for c in storer.non_index_axes[0][1] if c not in index_levels]
+            stored_shape = (storer.nrows, len(columns))
+
+    if stored_shape != tuple(data.shape):
+        raise ValueError(
+            f"Data written for {key} has shape {stored_shape}, but the loaded data "
+            f"has shape {data.shape}."
+        )
+    logger.debug(f"Verified shape {stored_shape} of data written for {key}.")
+
+
+def rollback_keys(artifact: Artifact, keys: list[str]) -> None:
+    """Removes keys that may have been partially written from the artifact.
+
+    A build that dies while writing a key can leave its data in the file
+    without registering the key with the artifact, so the data is removed
+    from the file directly in that case. Draws written for the keys are
+    removed from the draw store of the artifact.
+
+    Parameters
+    ----------
+    artifact
+        The artifact to remove the keys from.
+    keys
+        The keys to remove.
+
+    """
+    stored_keys = set(hdf.get_keys(artifact.path))
+    draw_root = draw_store.get_draw_store_root(artifact.path)
+    for key in keys:
+        if draw_store.get_key_dir(draw_root, key).exists():
+            logger.debug(f"Removing partially written draws for {key}.")
+            draw_store.remove_draws(draw_root, key)
+        if key in artifact:
+            logger.debug(f"Removing partially written data for {key} from artifact.")
+            artifact.remove(key)
+        elif key in stored_keys:
+            logger.debug(f"Removing unregistered data for {key} from artifact.")
+            hdf.remove(artifact.path, key)
+
+
+def merge_artifacts(artifact: Artifact, shard_paths: list[Path]) -> None:
+    """Copies every key of a set of artifact shards into an artifact.
+
+    The HDF nodes of each key are copied as stored, with their compression
+    and attributes, so no data is loaded into memory. Keys already in the
+    artifact are replaced. Draws in the draw stores of the shards are copied
+    into the draw store of the artifact, along with their stubs.
+
+    Parameters
+    ----------
+    artifact
+        The artifact to write to.
+    shard_paths
+        The paths of the artifacts to copy keys from.
+
+    """
+    for shard_path in shard_paths:
+        logger.debug(f"Merging {str(shard_path)} into the artifact.")
+        # The artifact maintains its own locations and keyspace
+        keys = [
+            key
+            for key in Artifact(shard_path).keys
+            if key not in [data_keys.METADATA_LOCATIONS, "metadata.keyspace"]
+        ]
+        stored_keys = set(hdf.get_keys(shard_path))
+        draw_root = draw_store.get_draw_store_root(artifact.path)
+        for key in keys:
+            if key in artifact and key in stored_keys:
+                artifact.remove(key)
+                draw_store.remove_draws(draw_root, key)
+
+        with tables.open_file(str(shard_path), mode="r") as shard, tables.open_file(
+            str(artifact.path), mode="a"
+        ) as target:
+            for key in keys:
+                if key in stored_keys:
+                    _copy_node(shard, target, EntityKey(key).path)
+        for key in keys:
+            if key not in artifact:
+                artifact._keys.append(key)
+
+        shard_draws = draw_store.get_draw_store_root(shard_path)
+        if shard_draws.exists():
+            shutil.copytree(
+                shard_draws,
+                draw_store.get_draw_store_root(artifact.path),
+                dirs_exist_ok=True,
+            )
+            shutil.rmtree(shard_draws)
+
+
+def _copy_node(source, target, path: str) -> None:
+    parent_path, name = path.rsplit("/", 1)
+    try:
+        parent = target.get_node(parent_path or "/")
+    except tables.NoSuchNodeError:
+        parent_path, parent_name = parent_path.rsplit("/", 1)
+        parent = target.create_group(parent_path or "/", parent_name, createparents=True)
+    source.get_node(path)._f_copy(newparent=parent, newname=name, recursive=True)
 
 
 # TODO - writing and reading by draw is necessary if you are using
 #        LBWSG data. Find the read function in utilities.py
-def write_data_by_draw(artifact: Artifact, key: str, data: pd.DataFrame):
+def write_data_by_draw(
+    artifact: Artifact, key: str, data: pd.DataFrame | Iterator[pd.DataFrame]
+):
     """Writes data to the artifact on a per-draw basis. This is useful
     for large datasets like Low Birthweight Short Gestation (LBWSG).
 
+    The data is stored in the draw store next to the artifact file (see
+    :mod:`{{cookiecutter.package_name}}.data.draw_store`) so that simulations
+    can memory-map a single draw instead of reading the whole table. The
+    data may also be given as blocks of draw columns, which are written one
+    block at a time. A stub pointing to the draw store is written to the
+    artifact file for the key, so the artifact lists and loads it like any
+    other key.
+
     Parameters
     ----------
     artifact
@@ -116,13 +801,13 @@ def write_data_by_draw(artifact: Artifact, key: str, data: pd.DataFrame):
     key
         The entity key associated with the data to write.
     data
-        The data to write.
+        The data to write, or an iterator of blocks of its draw columns.
 
     """
-    with pd.HDFStore(artifact.path, complevel=9, mode="a") as store:
-        key = EntityKey(key)
-        artifact._keys.append(key)
-        store.put(f"{key.path}/index", data.index.to_frame(index=False))
-        data = data.reset_index(drop=True)
-        for c in data.columns:
-            store.put(f"{key.path}/{c}", data[c])
+    if key in artifact:
+        artifact.remove(key)
+    logger.debug(f"Writing data for {key} to the draw store.")
+    draw_store.write_draws(draw_store.get_draw_store_root(artifact.path), key, data)
+    # Writing the stub only once the draws are written means a build that
+    # dies while writing them writes them again.
+    artifact.write(key, draw_store.get_pointer(key))
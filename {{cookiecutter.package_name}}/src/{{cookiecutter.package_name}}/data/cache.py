@@ -0,0 +1,282 @@
+"""A local, size-capped cache for extracted input data.
+
+Pulling data through :func:`loader.get_data` is by far the most expensive
+part of building an artifact. This module stores each extract on disk in
+parquet format, keyed on the lookup key, location, years, the versions of
+the upstream data packages and the source of this package's ``data``
+modules, so that rebuilding an artifact only has to re-pull the keys that
+actually changed. Editing a loader invalidates every cached extract.
+Extracts pulled for preview builds (see
+:mod:`{{cookiecutter.package_name}}.data.preview`) are stored separately,
+keyed on their number of draws as well.
+
+The cache lives on the local disk of the machine running the build and is
+size-capped. When it grows past its limit, the least recently used extracts
+are evicted.
+
+Within a single build, inputs shared by several keys are additionally held
+in memory (see :class:`SharedInputs`) so that they are only loaded once.
+
+.. admonition::
+
+   Logging in this module should be done at the ``debug`` level.
+
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from {{cookiecutter.package_name}}.constants import metadata, paths
+
+UPSTREAM_PACKAGES = [
+    "vivarium",
+    "vivarium_inputs",
+    "vivarium_gbd_access",
+    "gbd_mapping",
+]
+
+
+def get_upstream_versions() -> dict[str, str]:
+    """Returns the installed versions of the packages data is pulled through."""
+    versions = {}
+    for package in UPSTREAM_PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = "not installed"
+    return versions
+
+
+def get_source_hash() -> str:
+    """Returns a hash of the source of the modules in this package's ``data`` package."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        digest.update(path.name.encode("utf8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class DataCache:
+    """An on-disk cache of extracted data frames.
+
+    Parameters
+    ----------
+    root
+        The directory to store cached extracts in.
+    max_size
+        The maximum size of the cache in GB.
+    refresh_keys
+        Keys which should always be re-pulled. Their fresh extracts
+        replace whatever is currently in the cache.
+
+    """
+
+    def __init__(self, root: Path, max_size: float, refresh_keys: tuple = ()):
+        self.root = Path(root)
+        self.max_size = max_size
+        self.refresh_keys = set(refresh_keys)
+        self._versions = get_upstream_versions()
+        self._source_hash = get_source_hash()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def load(
+        self,
+        key: str,
+        location: str,
+        years: int | str | list[int] | None,
+        draw_count: int | None = None,
+    ) -> pd.DataFrame | None:
+        """Returns the cached extract, or ``None`` if it is not cached.
+
+        ``draw_count`` selects the extract of a preview build with that
+        many draws instead of the full extract.
+
+        """
+        if key in self.refresh_keys:
+            return None
+        path = self._get_path(key, location, years, draw_count)
+        if not path.exists():
+            logger.debug(f"Cache miss for {key} for location {location}.")
+            return None
+        logger.debug(f"Cache hit for {key} for location {location}.")
+        # Bump the modification time so eviction is least recently used.
+        path.touch()
+        return pd.read_parquet(path)
+
+    def save(
+        self,
+        key: str,
+        location: str,
+        years: int | str | list[int] | None,
+        data,
+        draw_count: int | None = None,
+    ) -> None:
+        """Stores an extract in the cache.
+
+        Only data frames are cached. Everything else (locations,
+        metadata, etc.) is cheap to produce and is not stored. Extracts of
+        preview builds are stored with their ``draw_count``.
+
+        """
+        if not isinstance(data, pd.DataFrame):
+            return
+        path = self._get_path(key, location, years, draw_count)
+        # Write to a temporary file and move it into place, so concurrent
+        # builds never read a partially written extract.
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            data.to_parquet(tmp_path)
+        except (ValueError, TypeError, NotImplementedError) as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.debug(f"Unable to cache data for {key}: {e}")
+            return
+        os.replace(tmp_path, path)
+        logger.debug(f"Cached data for {key} for location {location}.")
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes least recently used extracts until the cache fits its cap."""
+        entries = []
+        for path in self.root.glob("*.parquet"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # Evicted by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(entry[1] for entry in entries)
+        max_size = self.max_size * 1024**3
+        for _, entry_size, path in sorted(entries):
+            if size <= max_size:
+                break
+            logger.debug(f"Evicting {path.name} from the data cache.")
+            path.unlink(missing_ok=True)
+            size -= entry_size
+
+    def clear(self) -> None:
+        """Removes every extract from the cache."""
+        logger.debug(f"Clearing data cache at {str(self.root)}.")
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _get_path(
+        self,
+        key: str,
+        location: str,
+        years: int | str | list[int] | None,
+        draw_count: int | None = None,
+    ) -> Path:
+        cache_key = [str(key), location, years, self._versions, self._source_hash]
+        if draw_count is not None:
+            cache_key.append(draw_count)
+        cache_key = json.dumps(cache_key, default=str)
+        digest = hashlib.sha256(cache_key.encode("utf8")).hexdigest()
+        return self.root / f"{digest}.parquet"
+
+
+class SharedInputs:
+    """In-memory store for inputs shared by several keys in a single build.
+
+    Each input is held only until every key that depends on it has been
+    loaded, and is only returned for the location and years it was loaded
+    for. This object is shared between loader threads, so all access goes
+    through a lock.
+
+    Parameters
+    ----------
+    consumer_counts
+        The number of keys that depend on each input.
+
+    """
+
+    def __init__(self, consumer_counts: dict[str, int]):
+        self._remaining = dict(consumer_counts)
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, location: str, years: int | str | list[int] | None):
+        """Returns the held data for an input, or ``None`` if it isn't held."""
+        with self._lock:
+            input_id, data = self._data.get(key, (None, None))
+        return data if input_id == _get_input_id(location, years) else None
+
+    def put(self, key: str, location: str, years: int | str | list[int] | None, data) -> None:
+        """Holds data for an input if any key still depends on it."""
+        with self._lock:
+            if self._remaining.get(key, 0) > 0:
+                self._data[key] = (_get_input_id(location, years), data)
+
+    def release(self, key: str) -> None:
+        """Records that one key depending on an input has been loaded.
+
+        The input is dropped once its last dependent key is loaded.
+
+        """
+        with self._lock:
+            self._remaining[key] -= 1
+            if self._remaining[key] <= 0:
+                logger.debug(f"Releasing shared input {key}.")
+                self._data.pop(key, None)
+
+
+def _get_input_id(location: str, years: int | str | list[int] | None) -> tuple:
+    return location, tuple(years) if isinstance(years, list) else years
+
+
+_ACTIVE_CACHE: DataCache | None = None
+_SHARED_INPUTS: SharedInputs | None = None
+
+
+def enable_cache(
+    root: Path = paths.DATA_CACHE_ROOT,
+    max_size: float = metadata.DATA_CACHE_MAX_SIZE,
+    refresh_keys: tuple = (),
+) -> DataCache:
+    """Turns on caching for every call to :func:`loader.get_data`.
+
+    Parameters
+    ----------
+    root
+        The directory to store cached extracts in.
+    max_size
+        The maximum size of the cache in GB.
+    refresh_keys
+        Keys which should always be re-pulled.
+
+    Returns
+    -------
+        The active cache.
+
+    """
+    global _ACTIVE_CACHE
+    _ACTIVE_CACHE = DataCache(root, max_size, refresh_keys)
+    return _ACTIVE_CACHE
+
+
+def disable_cache() -> None:
+    """Turns off caching for :func:`loader.get_data`."""
+    global _ACTIVE_CACHE
+    _ACTIVE_CACHE = None
+
+
+def get_active_cache() -> DataCache | None:
+    """Returns the active cache, or ``None`` if caching is disabled."""
+    return _ACTIVE_CACHE
+
+
+def set_shared_inputs(shared_inputs: SharedInputs | None) -> None:
+    """Sets the in-memory inputs :func:`loader.get_data` checks first."""
+    global _SHARED_INPUTS
+    _SHARED_INPUTS = shared_inputs
+
+
+def get_shared_inputs() -> SharedInputs | None:
+    """Returns the active in-memory inputs, or ``None`` if there are none."""
+    return _SHARED_INPUTS
@@ -0,0 +1,147 @@
+"""Compact dtypes for artifact tables.
+
+Artifact tables are mostly float64 draws over an index of
+``metadata.ARTIFACT_INDEX_COLUMNS``. Stored compactly:
+
+- float64 value columns become float32, unless the rounding changes any value
+  by more than ``metadata.COMPACT_DTYPES_RTOL`` (values too small or too
+  large for float32), in which case the column is kept as is.
+- ``sex`` becomes categorical.
+- ``age_start`` and ``age_end`` become float32.
+- ``year_start`` and ``year_end`` become int16.
+
+Every value is stored as itself in a narrower dtype, so
+:meth:`Artifact.load` returns the same table in the compact dtypes (draws
+and ages are rounded to float32). What was changed is recorded with the
+table in the HDF file, so :func:`restore_dtypes` can bring back the
+original dtypes and the exact original ages. The conversion only applies
+to keys whose write profile asks for it (see ``metadata.WRITE_PROFILES``).
+
+.. admonition::
+
+   Logging in this module should be done at the ``debug`` level.
+
+"""
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from {{cookiecutter.package_name}}.constants import metadata
+
+AGE_COLUMNS = ["age_start", "age_end"]
+YEAR_COLUMNS = ["year_start", "year_end"]
+SEX_COLUMN = "sex"
+
+
+def compact_dtypes(data: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """Converts a table to compact dtypes.
+
+    Parameters
+    ----------
+    data
+        The table to convert.
+
+    Returns
+    -------
+        The converted table and a description of the conversion, which
+        :func:`restore_dtypes` uses to undo it.
+
+    """
+    spec = {"float32": [], "ages": {}, "index_dtypes": {}}
+    float_columns = data.columns[(data.dtypes == np.float64).to_numpy()]
+    values = data[float_columns].to_numpy()
+    # Values outside the range of float32 fail the precision check below
+    with np.errstate(over="ignore", under="ignore"):
+        compact_values = values.astype(np.float32)
+    precise = np.isclose(
+        compact_values,
+        values,
+        rtol=metadata.COMPACT_DTYPES_RTOL,
+        atol=0,
+        equal_nan=True,
+    ).all(axis=0)
+    for column in float_columns[~precise]:
+        logger.debug(f"Keeping {column} as float64 since float32 would lose precision.")
+
+    compact_columns = float_columns[precise]
+    spec["float32"] = [str(column) for column in compact_columns]
+    compact_data = pd.DataFrame(
+        compact_values[:, precise], index=data.index, columns=compact_columns
+    )
+    compact_data = pd.concat([compact_data, data.drop(columns=compact_columns)], axis=1)[
+        data.columns
+    ]
+
+    levels = []
+    for i, name in enumerate(data.index.names):
+        level = data.index.get_level_values(i)
+        if name in AGE_COLUMNS:
+            ages = np.sort(level.unique().to_numpy())
+            # Distinct ages must stay distinct to be restored exactly
+            if len(np.unique(ages.astype(np.float32))) == len(ages):
+                spec["ages"][name] = ages.tolist()
+                spec["index_dtypes"][name] = str(level.dtype)
+                level = level.astype(np.float32)
+        elif name in YEAR_COLUMNS:
+            spec["index_dtypes"][name] = str(level.dtype)
+            level = level.astype(np.int16)
+        elif name == SEX_COLUMN:
+            spec["index_dtypes"][name] = str(level.dtype)
+            level = pd.CategoricalIndex(level, name=name)
+        levels.append(level)
+    if spec["index_dtypes"]:
+        compact_data.index = _from_levels(levels)
+    return compact_data, spec
+
+
+def restore_dtypes(data: pd.DataFrame, spec: dict) -> pd.DataFrame:
+    """Undoes :func:`compact_dtypes`.
+
+    Values stored as float32 come back as float64, so they match the
+    original values to within ``metadata.COMPACT_DTYPES_RTOL``. Ages are
+    mapped back to the exact ages of the original table.
+
+    Parameters
+    ----------
+    data
+        A table read from an artifact.
+    spec
+        The description of the conversion stored with the table.
+
+    Returns
+    -------
+        The table with its original dtypes.
+
+    """
+    data = data.astype({column: np.float64 for column in spec["float32"] if column in data})
+    if not spec["index_dtypes"]:
+        return data
+
+    levels = []
+    for i, name in enumerate(data.index.names):
+        level = data.index.get_level_values(i)
+        if name in spec["ages"]:
+            ages = np.array(spec["ages"][name])
+            codes = np.searchsorted(ages.astype(np.float32), level.to_numpy())
+            level = pd.Index(ages[codes], name=name)
+        if name in spec["index_dtypes"]:
+            level = level.astype(spec["index_dtypes"][name])
+        levels.append(level)
+    data.index = _from_levels(levels)
+    return data
+
+
+def _from_levels(levels: list[pd.Index]) -> pd.Index:
+    if len(levels) == 1:
+        return levels[0]
+    return pd.MultiIndex.from_arrays(levels, names=[level.name for level in levels])
+
+
+def read_spec(path: str, key: str) -> dict | None:
+    """Returns how a key was compacted, or ``None`` if it wasn't."""
+    from vivarium.framework.artifact import EntityKey
+
+    with pd.HDFStore(path, mode="r") as store:
+        storer = store.get_storer(EntityKey(key).path)
+        attrs = getattr(storer.attrs, "metadata", None) or {}
+    return attrs.get("compact")
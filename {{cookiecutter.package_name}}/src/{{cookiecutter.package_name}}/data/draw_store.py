@@ -0,0 +1,182 @@
+"""Draw-partitioned storage for very large keys.
+
+Some keys, like Low Birthweight Short Gestation (LBWSG) exposure, are too
+large to load in full in every simulation. These keys are stored next to
+the artifact in a directory named after it (``pakistan.hdf`` stores its
+draws in ``pakistan.draws``), one sub-directory per key::
+
+    pakistan.draws/risk_factor/low_birth_weight_and_short_gestation/exposure/
+        meta.json   # draw columns, index names and index levels
+        codes.npy   # index codes, one row per index level
+        draws.bin   # raw draw values, one contiguous block per draw
+
+The HDF file only holds a small json stub for each of these keys, which
+points readers of the artifact to the draw store (see :func:`get_pointer`).
+The stub registers the key in the keyspace of the artifact, so builds treat
+it like any other key. The draw store directory must be copied along with
+the artifact file.
+
+The index is stored once as integer codes. Each draw is a contiguous block
+of a memory-mapped file, so reading a single draw (or a contiguous range of
+draws) creates a view of the file rather than a copy. Reshaping the draw,
+as :func:`{{cookiecutter.package_name}}.utilities.read_data_by_draw` does for
+simulations, copies it.
+
+"""
+import json
+import shutil
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def get_draw_store_root(artifact_path: str | Path) -> Path:
+    """Returns the directory holding the draw-partitioned keys of an artifact."""
+    return Path(artifact_path).with_suffix(".draws")
+
+
+def get_key_dir(root: Path, key: str) -> Path:
+    """Returns the directory holding the data for a single key."""
+    return Path(root).joinpath(*str(key).split("."))
+
+
+def get_pointer(key: str) -> dict[str, str]:
+    """Returns the stub stored in the artifact file for a key in the draw store.
+
+    The stub holds the directory of the key within the draw store of the
+    artifact, so it still points to the data when the artifact is renamed
+    or merged into another.
+
+    """
+    return {"draw_store": get_key_dir(Path(), key).as_posix()}
+
+
+def has_key(root: Path, key: str) -> bool:
+    """Returns whether draw-partitioned data exists for a key."""
+    return (get_key_dir(root, key) / "meta.json").exists()
+
+
+def get_shape(root: Path, key: str) -> tuple[int, int]:
+    """Returns the number of rows and draw columns stored for a key."""
+    with (get_key_dir(root, key) / "meta.json").open() as f:
+        meta = json.load(f)
+    return meta["n_rows"], len(meta["columns"])
+
+
+def remove_draws(root: Path, key: str) -> None:
+    """Removes the data for a key from the store, if there is any."""
+    shutil.rmtree(get_key_dir(root, key), ignore_errors=True)
+
+
+def write_draws(root: Path, key: str, data: pd.DataFrame | Iterator[pd.DataFrame]) -> None:
+    """Writes a wide table of draws to the store, replacing existing data.
+
+    Parameters
+    ----------
+    root
+        The root directory of the draw store.
+    key
+        The entity key associated with the data to write.
+    data
+        The data to write, with one column per draw, or an iterator of
+        blocks of its draw columns. Every block must have the same index.
+        Blocks are written as they are produced, so only one is held in
+        memory at a time.
+
+    Raises
+    ------
+    ValueError
+        If the blocks don't all have the same index or there are none.
+
+    """
+    key_dir = get_key_dir(root, key)
+    if key_dir.exists():
+        shutil.rmtree(key_dir)
+    key_dir.mkdir(parents=True)
+
+    blocks = [data] if isinstance(data, pd.DataFrame) else data
+    index, columns = None, []
+    with (key_dir / "draws.bin").open("wb") as f:
+        for block in blocks:
+            if index is None:
+                index = block.index
+            elif not block.index.equals(index):
+                raise ValueError(f"Draw blocks for {key} do not all have the same index.")
+            for column in block.columns:
+                f.write(np.ascontiguousarray(block[column].to_numpy(np.float64)).tobytes())
+            columns.extend(str(c) for c in block.columns)
+    if index is None:
+        raise ValueError(f"No draws were given for {key}.")
+
+    n_rows = len(index)
+    if not isinstance(index, pd.MultiIndex):
+        index = pd.MultiIndex.from_arrays([index])
+    np.save(key_dir / "codes.npy", np.stack([c.astype(np.int32) for c in index.codes]))
+
+    meta = {
+        "columns": columns,
+        "index_names": list(index.names),
+        "index_levels": [level.tolist() for level in index.levels],
+        "n_rows": n_rows,
+        "dtype": "float64",
+    }
+    with (key_dir / "meta.json").open("w") as f:
+        json.dump(meta, f)
+
+
+def read_draws(root: Path, key: str, draws: int | list[int] | None = None) -> pd.DataFrame:
+    """Reads draws for a key from the store.
+
+    A single draw or a contiguous range of draws is returned as a read-only
+    view of the memory-mapped draw file. Any other selection is copied.
+
+    Parameters
+    ----------
+    root
+        The root directory of the draw store.
+    key
+        The entity key associated with the data to read.
+    draws
+        The draw number or numbers to read. Reads every draw if not given.
+
+    Returns
+    -------
+        A table indexed like the written data with one column per draw.
+
+    """
+    key_dir = get_key_dir(root, key)
+    with (key_dir / "meta.json").open() as f:
+        meta = json.load(f)
+
+    columns = meta["columns"]
+    values = np.memmap(
+        key_dir / "draws.bin",
+        dtype=meta["dtype"],
+        mode="r",
+        shape=(len(columns), meta["n_rows"]),
+    )
+    index = pd.MultiIndex(
+        levels=meta["index_levels"],
+        codes=np.load(key_dir / "codes.npy"),
+        names=meta["index_names"],
+    )
+    if index.nlevels == 1:
+        index = index.get_level_values(0)
+
+    if draws is None:
+        selection = slice(None)
+    else:
+        positions = [
+            columns.index(f"draw_{d}") for d in ([draws] if isinstance(draws, int) else draws)
+        ]
+        start = positions[0] if positions else 0
+        if positions and positions == list(range(start, start + len(positions))):
+            selection = slice(positions[0], positions[0] + len(positions))
+        else:
+            selection = positions
+
+    return pd.DataFrame(
+        values[selection].T, index=index, columns=pd.Index(columns)[selection], copy=False
+    )
@@ -0,0 +1,105 @@
+"""A completion journal for crash-safe artifact builds.
+
+HDF writes are not atomic, so a build that dies part way through writing a
+key (out of memory, preemption, timeout) can leave that key half-written.
+Every build records when it starts and finishes writing each key in a
+journal next to the artifact (``pakistan.hdf`` journals to
+``pakistan.journal``), one JSON record per line. Each record is flushed to
+disk before the build moves on.
+
+When a build is restarted, keys that were started but never completed are
+rolled back and rebuilt, and every completed key is kept. The journal is
+removed once the build finishes, so its presence marks an interrupted
+build.
+
+.. admonition::
+
+   Logging in this module should be done at the ``debug`` level.
+
+"""
+import json
+import os
+from pathlib import Path
+
+from loguru import logger
+
+STARTED = "started"
+COMPLETE = "complete"
+
+
+def get_journal_path(artifact_path: str | Path) -> Path:
+    """Returns the path of the build journal for an artifact."""
+    return Path(artifact_path).with_suffix(".journal")
+
+
+def is_interrupted(artifact_path: str | Path) -> bool:
+    """Returns whether the last build of an artifact did not finish."""
+    return get_journal_path(artifact_path).exists()
+
+
+class BuildJournal:
+    """Records the progress of an artifact build key by key.
+
+    Parameters
+    ----------
+    artifact_path
+        The path of the artifact being built.
+
+    """
+
+    def __init__(self, artifact_path: str | Path):
+        self.path = get_journal_path(artifact_path)
+        self._status = {}
+        if self.path.exists():
+            torn = False
+            with self.path.open() as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # The last record may be cut off if the build died
+                        # while writing it.
+                        torn = True
+                        continue
+                    self._status[record["key"]] = record["status"]
+            if torn:
+                self._rewrite()
+
+    def start(self, key: str) -> None:
+        """Records that a key is about to be written."""
+        self._record(key, STARTED)
+
+    def complete(self, key: str) -> None:
+        """Records that a key has been fully written."""
+        self._record(key, COMPLETE)
+
+    def get_incomplete(self) -> list[str]:
+        """Returns the keys that were started but never completed."""
+        return [key for key, status in self._status.items() if status == STARTED]
+
+    def get_complete(self) -> list[str]:
+        """Returns the keys that were fully written."""
+        return [key for key, status in self._status.items() if status == COMPLETE]
+
+    def finish(self) -> None:
+        """Removes the journal once the build has finished."""
+        logger.debug(f"Removing build journal at {str(self.path)}.")
+        self.path.unlink(missing_ok=True)
+        self._status = {}
+
+    def _rewrite(self) -> None:
+        logger.debug(f"Rewriting build journal at {str(self.path)}.")
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with tmp_path.open("w") as f:
+            for key, status in self._status.items():
+                f.write(json.dumps({"key": key, "status": status}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _record(self, key: str, status: str) -> None:
+        self._status[str(key)] = status
+        with self.path.open("a") as f:
+            f.write(json.dumps({"key": str(key), "status": status}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
@@ -16,7 +16,6 @@ import numpy as np
 import pandas as pd
 from gbd_mapping import causes, covariates, risk_factors
 from vivarium.framework.artifact import EntityKey
-from vivarium_gbd_access import gbd
 from vivarium_inputs import globals as vi_globals
 from vivarium_inputs import interface
 from vivarium_inputs import utilities as vi_utils
@@ -24,6 +23,7 @@ from vivarium_inputs import utility_data
 from vivarium_inputs.mapping_extension import alternative_risk_factors
 
 from {{cookiecutter.package_name}}.constants import data_keys
+from {{cookiecutter.package_name}}.data import cache, paf, preview, staging
 
 
 def get_data(
@@ -41,7 +41,21 @@ def get_data(
 
     Returns
     -------
-        The requested data.
+        The requested data. Loaders for keys too large to hold in memory may
+        instead return an iterator of consecutive blocks of rows (e.g. one per
+        year or per category), which the builder appends to the artifact one
+        at a time.
+
+    Notes
+    -----
+        Inputs held in memory for the current build and, if a data cache is
+        active, cached extracts (see :mod:`{{cookiecutter.package_name}}.data.cache`)
+        are returned instead of pulling the data again. Chunked data is never
+        cached.
+
+        In a preview build (see :mod:`{{cookiecutter.package_name}}.data.preview`)
+        only the kept draws are returned. A cached full extract serves preview
+        builds too.
 
     """
     mapping = {
@@ -60,7 +74,30 @@ def get_data(
         # data_keys.DIARRHEA.DISABILITY_WEIGHT: load_standard_data,
         # data_keys.DIARRHEA.RESTRICTIONS: load_metadata,
     }
-    return mapping[lookup_key](lookup_key, location, years)
+    shared_inputs = cache.get_shared_inputs()
+    if shared_inputs is not None:
+        data = shared_inputs.get(lookup_key, location, years)
+        if data is not None:
+            return data
+
+    draw_count = preview.get_draw_count()
+    data_cache = cache.get_active_cache()
+    if data_cache is not None:
+        data = data_cache.load(lookup_key, location, years)
+        if data is None and draw_count is not None:
+            data = data_cache.load(lookup_key, location, years, draw_count)
+        if data is not None:
+            return preview.subset_draws(data)
+
+    data = preview.subset_draws(mapping[lookup_key](lookup_key, location, years))
+    if data_cache is not None:
+        data_cache.save(lookup_key, location, years, data, draw_count)
+    return data
+
+
+def get_estimation_years() -> list[int]:
+    """Returns the GBD estimation years, the years data can be pulled for one at a time."""
+    return sorted(int(year) for year in utility_data.get_estimation_years())
 
 
 def load_population_location(
@@ -114,7 +151,7 @@ def load_categorical_paf(key: str, location: str, years: int | str | list[int] |
     except KeyError:
         raise ValueError(f"Unrecognized key {key}")
 
-    distribution_type = get_data(risk.DISTRIBUTION, location)
+    distribution_type = get_data(risk.DISTRIBUTION, location, years)
 
     if distribution_type != "dichotomous" and "polytomous" not in distribution_type:
         raise NotImplementedError(
@@ -122,32 +159,136 @@ def load_categorical_paf(key: str, location: str, years: int | str | list[int] |
             f"polytomous are recognized categorical distributions."
         )
 
-    exp = get_data(risk.EXPOSURE, location)
-    rr = get_data(risk.RELATIVE_RISK, location)
-
-    # paf = (sum_categories(exp * rr) - 1) / sum_categories(exp * rr)
-    sum_exp_x_rr = (
-        (exp * rr)
-        .groupby(list(set(rr.index.names) - {"parameter"}))
-        .sum()
-        .reset_index()
-        .set_index(rr.index.names[:-1])
-    )
-    paf = (sum_exp_x_rr - 1) / sum_exp_x_rr
-    return paf
+    exp = get_data(risk.EXPOSURE, location, years)
+    rr = get_data(risk.RELATIVE_RISK, location, years)
+    return paf.compute_categorical_paf(exp, rr)
 
 
 def _load_em_from_meid(location, meid, measure):
+    # Draws pulled for all locations at once (see data/staging.py)
+    data = staging.load_staged(meid, measure, location)
+    if data is not None:
+        return data
+    # Local import so the transforms here can be used without GBD access
+    from vivarium_gbd_access import gbd
+
     location_id = utility_data.get_location_id(location)
     data = gbd.get_modelable_entity_draws(meid, location_id)
-    data = data[data.measure_id == vi_globals.MEASURES[measure]]
-    data = vi_utils.normalize(data, fill_value=0)
-    data = data.filter(vi_globals.DEMOGRAPHIC_COLUMNS + vi_globals.DRAW_COLUMNS)
-    data = vi_utils.reshape(data)
-    data = vi_utils.scrub_gbd_conventions(data, location)
-    data = vi_utils.split_interval(data, interval_column="age", split_column_prefix="age")
-    data = vi_utils.split_interval(data, interval_column="year", split_column_prefix="year")
-    return vi_utils.sort_hierarchical_data(data).droplevel("location")
+    return transform_gbd_draws(data, measure, [location]).droplevel("location")
+
+
+def transform_gbd_draws(
+    data: pd.DataFrame, measure: str, locations: list[str]
+) -> pd.DataFrame:
+    """Transforms raw GBD draws of a measure into artifact format.
+
+    Produces the same table as running the draws through ``vi_utils.normalize``,
+    ``reshape``, ``scrub_gbd_conventions``, ``split_interval`` for ages and years
+    and ``sort_hierarchical_data``, but plans the steps together so the draws
+    are copied once. The rows to keep are selected and put in sorted order by a
+    single take, and the index is built by looking up each distinct location,
+    sex, age group and year once rather than mapping every row. Draws that
+    need filling over sexes, years or ages are normalized by
+    ``vi_utils.normalize`` first. Preview builds only take the draws they
+    keep.
+
+    Parameters
+    ----------
+    data
+        Raw draws for one or more locations.
+    measure
+        The measure to keep.
+    locations
+        The names of the locations in ``data``.
+
+    Returns
+    -------
+        The draws of the measure indexed by location, sex, age_start,
+        age_end, year_start and year_end.
+
+    """
+    measure_rows = data["measure_id"].to_numpy() == vi_globals.MEASURES[measure]
+    rows = _get_normalized_rows(data, measure_rows)
+    if rows is None:
+        data = vi_utils.normalize(
+            data[data["measure_id"] == vi_globals.MEASURES[measure]],
+            cols_to_fill=vi_globals.DRAW_COLUMNS,
+            fill_value=0,
+        )
+        rows = np.ones(len(data), dtype=bool)
+    rows = np.flatnonzero(rows)
+
+    location_names = {
+        utility_data.get_location_id(location): location for location in locations
+    }
+    sex_names = {vi_globals.SEXES["Male"]: "Male", vi_globals.SEXES["Female"]: "Female"}
+    age_bins = utility_data.get_age_bins().set_index("age_group_id")
+    location_ids = data["location_id"].to_numpy()[rows]
+    age_group_ids = data["age_group_id"].to_numpy()[rows]
+    year_ids = data["year_id"].to_numpy(np.int64)[rows]
+    levels = {
+        "location": _lookup_level(location_ids, lambda ids: ids.map(location_names)),
+        "sex": _lookup_level(
+            data["sex_id"].to_numpy()[rows],
+            lambda ids: ids.map(lambda x: sex_names.get(x, x)),
+        ),
+        "age_start": _lookup_level(age_group_ids, lambda ids: age_bins["age_start"][ids]),
+        "age_end": _lookup_level(age_group_ids, lambda ids: age_bins["age_end"][ids]),
+        "year_start": _lookup_level(year_ids, lambda ids: ids),
+        "year_end": _lookup_level(year_ids, lambda ids: ids + 1),
+    }
+    index = pd.MultiIndex(
+        levels=[level for _, level in levels.values()],
+        codes=[codes for codes, _ in levels.values()],
+        names=list(levels),
+        verify_integrity=False,
+    )
+    order = index.argsort()
+
+    draw_columns = preview.get_draw_columns(pd.Index(vi_globals.DRAW_COLUMNS))
+    draw_columns = draw_columns[draw_columns.isin(data.columns)]
+    transformed = data.iloc[rows[order], data.columns.get_indexer(draw_columns)]
+    transformed.index = index.take(order)
+    return transformed
+
+
+def _get_normalized_rows(data: pd.DataFrame, rows: np.ndarray) -> np.ndarray | None:
+    """Returns the rows ``vi_utils.normalize`` would keep.
+
+    Returns ``None`` if ``vi_utils.normalize`` would fill in any rows.
+
+    """
+    if not {"sex_id", "year_id", "age_group_id"}.issubset(data.columns):
+        return None
+
+    sex_ids = data["sex_id"].to_numpy()
+    sexes = set(np.unique(sex_ids[rows]))
+    male_female = {vi_globals.SEXES["Male"], vi_globals.SEXES["Female"]}
+    if sexes == set(vi_globals.SEXES.values()):
+        rows = rows & np.isin(sex_ids, list(male_female))
+    elif sexes != male_female:
+        return None
+
+    estimation_years = utility_data.get_estimation_years()
+    year_ids = data["year_id"].to_numpy()
+    if set(np.unique(year_ids[rows])) == set(estimation_years):
+        # Binned years are interpolated
+        return None
+    years = np.arange(min(estimation_years), max(estimation_years) + 1)
+    rows = rows & np.isin(year_ids, years)
+
+    ages = set(np.unique(data["age_group_id"].to_numpy()[rows]))
+    gbd_ages = set(utility_data.get_age_group_ids())
+    if ages == {vi_globals.SPECIAL_AGES["all_ages"]} or ages < gbd_ages:
+        return None
+    return rows
+
+
+def _lookup_level(ids: np.ndarray, lookup) -> tuple[np.ndarray, pd.Index]:
+    """Returns the codes and level of an index level, looking up each distinct id once."""
+    id_codes, unique_ids = pd.factorize(ids)
+    level_codes, level = pd.factorize(pd.Index(lookup(pd.Index(unique_ids))))
+    return level_codes[id_codes], pd.Index(level)
 
 
 # TODO - add project-specific data functions here
@@ -0,0 +1,244 @@
+"""An index of the artifacts in an output directory.
+
+Every artifact build records what it wrote in a manifest kept in the
+``.manifest`` directory of the output directory, one small JSON file per
+artifact (``pakistan.hdf`` is indexed by ``.manifest/pakistan.json``). For
+each key the manifest records its shape, a hash of its content, the write
+profile it was stored with, the versions of the upstream data packages it
+was pulled with and when it was written. Keys written by year-partitioned
+builds also record the years they hold, so that later builds only add the
+years that are missing.
+
+The manifest answers what is built and what is stale without opening any
+HDF file. It also records the size and modification time of the artifact
+when the manifest was last saved, so an artifact changed outside of a build
+is detected and the HDF file is consulted instead.
+
+.. admonition::
+
+   Logging in this module should be done at the ``debug`` level.
+
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from {{cookiecutter.package_name}}.constants import metadata
+from {{cookiecutter.package_name}}.data.cache import get_upstream_versions
+
+MANIFEST_DIR = ".manifest"
+
+
+def get_manifest_path(artifact_path: str | Path) -> Path:
+    """Returns the path of the manifest for an artifact."""
+    artifact_path = Path(artifact_path)
+    return artifact_path.parent / MANIFEST_DIR / f"{artifact_path.stem}.json"
+
+
+def hash_data(data) -> str:
+    """Returns a hash of the content of loaded data.
+
+    Data frames and series are hashed by value, including their index.
+    Anything else is hashed through its JSON representation.
+
+    """
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        hasher = TableHasher()
+        hasher.update(data)
+        return hasher.hexdigest()
+    digest = hashlib.sha256()
+    digest.update(json.dumps(data, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class TableHasher:
+    """Hashes a table one block of rows at a time.
+
+    Rows are hashed individually, so hashing a table in consecutive blocks
+    of rows gives the same hash as :func:`hash_data` of the whole table.
+
+    """
+
+    def __init__(self):
+        self._digest = hashlib.sha256()
+        self._columns = []
+
+    def update(self, data: pd.DataFrame | pd.Series) -> None:
+        """Adds the next block of rows of the table to the hash."""
+        self._digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        self._columns = [str(c) for c in getattr(data, "columns", [])]
+
+    def hexdigest(self) -> str:
+        """Returns the hash of the rows added so far."""
+        digest = self._digest.copy()
+        digest.update(json.dumps(self._columns).encode())
+        return digest.hexdigest()
+
+
+def get_shape(data) -> list[int]:
+    """Returns the shape of loaded data, or ``[len(data)]`` for containers."""
+    if hasattr(data, "shape"):
+        return list(data.shape)
+    return [len(data)] if hasattr(data, "__len__") else []
+
+
+class ArtifactManifest:
+    """The manifest entry for a single artifact.
+
+    Parameters
+    ----------
+    artifact_path
+        The path of the artifact.
+
+    """
+
+    def __init__(self, artifact_path: str | Path):
+        self.artifact_path = Path(artifact_path)
+        self.path = get_manifest_path(artifact_path)
+        self.location = None
+        self.keys: dict[str, dict] = {}
+        self._artifact_stat = None
+        if self.path.exists():
+            with self.path.open() as f:
+                manifest = json.load(f)
+            self.location = manifest["location"]
+            self.keys = manifest["keys"]
+            self._artifact_stat = manifest["artifact_stat"]
+
+    def is_current(self) -> bool:
+        """Returns whether the manifest matches the artifact on disk."""
+        if not self.artifact_path.exists():
+            return not self.keys
+        stat = self.artifact_path.stat()
+        return self._artifact_stat == [stat.st_size, stat.st_mtime_ns]
+
+    def __contains__(self, key: str) -> bool:
+        return str(key) in self.keys
+
+    def has_hash(self, key: str, content_hash: str) -> bool:
+        """Returns whether a key was recorded with the given content hash."""
+        return self.keys.get(str(key), {}).get("hash") == content_hash
+
+    def has_profile(self, key: str, profile: metadata.WriteProfile) -> bool:
+        """Returns whether a key was recorded as stored with the given write profile."""
+        return self.keys.get(str(key), {}).get("profile") == profile._asdict()
+
+    def get_years(self, key: str) -> list[int] | None:
+        """Returns the years recorded for a key written by year, if any."""
+        return self.keys.get(str(key), {}).get("years")
+
+    def record(
+        self,
+        key: str,
+        data=None,
+        shape: list[int] | None = None,
+        content_hash: str | None = None,
+        years: list[int] | None = None,
+        profile: metadata.WriteProfile | None = None,
+    ) -> None:
+        """Records that data was written to a key of the artifact.
+
+        Parameters
+        ----------
+        key
+            The key that was written.
+        data
+            The data that was written.
+        shape
+            The shape of the written data, if ``data`` isn't given.
+        content_hash
+            The hash of the written data, if ``data`` isn't given.
+        years
+            The years the written data holds, if it was written by year.
+        profile
+            The write profile the data was stored with.
+
+        """
+        self.keys[str(key)] = {
+            "shape": get_shape(data) if shape is None else list(shape),
+            "hash": hash_data(data) if content_hash is None else content_hash,
+            "years": None if years is None else sorted(years),
+            "profile": None if profile is None else profile._asdict(),
+            "versions": get_upstream_versions(),
+            "built": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def extend(self, key: str, shape: list[int], content_hash: str, years: list[int]) -> None:
+        """Records that years were appended to a key written by year.
+
+        Parameters
+        ----------
+        key
+            The key that was appended to.
+        shape
+            The shape of the whole table after appending.
+        content_hash
+            The hash of the appended data. It is combined with the recorded
+            hash, so the hash still changes whenever any year does.
+        years
+            The years that were appended.
+
+        """
+        record = self.keys[str(key)]
+        digest = hashlib.sha256(f"{record['hash']}{content_hash}".encode())
+        record.update(
+            shape=list(shape),
+            hash=digest.hexdigest(),
+            years=sorted(set(record["years"]) | set(years)),
+            versions=get_upstream_versions(),
+            built=datetime.now().isoformat(timespec="seconds"),
+        )
+
+    def refresh(self, key: str) -> None:
+        """Records that a key was pulled again and its data was unchanged."""
+        self.keys[str(key)].update(
+            versions=get_upstream_versions(),
+            built=datetime.now().isoformat(timespec="seconds"),
+        )
+
+    def remove(self, key: str) -> None:
+        """Records that a key was removed from the artifact."""
+        self.keys.pop(str(key), None)
+
+    def get_stale_keys(self) -> list[str]:
+        """Returns the keys pulled with different upstream package versions."""
+        versions = get_upstream_versions()
+        return [key for key, record in self.keys.items() if record["versions"] != versions]
+
+    def save(self, location: str) -> None:
+        """Writes the manifest, recording the current state of the artifact.
+
+        Parameters
+        ----------
+        location
+            The location the artifact is built for.
+
+        """
+        self.location = location
+        stat = self.artifact_path.stat()
+        self._artifact_stat = [stat.st_size, stat.st_mtime_ns]
+        self.path.parent.mkdir(exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("w") as f:
+            json.dump(
+                {
+                    "location": self.location,
+                    "artifact": self.artifact_path.name,
+                    "artifact_stat": self._artifact_stat,
+                    "keys": self.keys,
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
+        logger.debug(f"Updated manifest for {str(self.artifact_path)}.")
+
+    def delete(self) -> None:
+        """Removes the manifest along with its artifact."""
+        self.path.unlink(missing_ok=True)
+        self.keys = {}
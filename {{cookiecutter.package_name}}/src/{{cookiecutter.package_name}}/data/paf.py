@@ -0,0 +1,110 @@
+"""Population attributable fractions of categorical risks.
+
+For a categorical risk the PAF of each affected entity is::
+
+    paf = (sum_categories(exp * rr) - 1) / sum_categories(exp * rr)
+
+Relative risks are usually the largest tables in an artifact build, with
+one row per affected entity, affected measure, demographic cell and risk
+category. Instead of aligning exposure and relative risk as data frames and
+grouping the product, the exposure rows matching each relative risk row are
+looked up once, the products are computed on the raw draw arrays and the
+categories of each affected entity and demographic cell are summed in one
+vectorized pass.
+
+.. admonition::
+
+   Logging in this module should be done at the ``debug`` level.
+
+"""
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+CATEGORY_COLUMN = "parameter"
+
+
+def compute_categorical_paf(
+    exposure: pd.DataFrame, relative_risk: pd.DataFrame
+) -> pd.DataFrame:
+    """Computes the PAF of a categorical risk for every affected entity at once.
+
+    Parameters
+    ----------
+    exposure
+        Exposure draws indexed by demographic cell and risk category
+        (``parameter``).
+    relative_risk
+        Relative risk draws indexed like ``exposure`` plus any number of
+        further levels, usually the affected entity and measure. Relative
+        risk rows without a matching exposure row contribute nothing to the
+        sum over categories.
+
+    Returns
+    -------
+        PAF draws indexed by every level of ``relative_risk`` except the
+        risk category, in the order of ``relative_risk``, sorted by index.
+
+    Raises
+    ------
+    ValueError
+        If the exposure is indexed by levels the relative risk doesn't have
+        or the two tables don't have the same draw columns.
+
+    """
+    exposure_levels = list(exposure.index.names)
+    missing_levels = set(exposure_levels) - set(relative_risk.index.names)
+    if missing_levels:
+        raise ValueError(f"Relative risk is missing exposure index levels {missing_levels}.")
+    if not exposure.columns.equals(relative_risk.columns):
+        raise ValueError("Exposure and relative risk must have the same draw columns.")
+
+    # Align once: the exposure row for each relative risk row
+    rr_index = relative_risk.index
+    exposure_rows = exposure.index.get_indexer(
+        pd.MultiIndex.from_arrays(
+            [rr_index.get_level_values(level) for level in exposure_levels],
+            names=exposure_levels,
+        )
+    )
+    groups = rr_index.droplevel(CATEGORY_COLUMN)
+    group_codes, group_index = groups.factorize()
+    group_index = group_index.set_names(groups.names)
+    n_groups = len(group_index)
+
+    # Draw-major arrays, so that every pass below reads contiguous memory.
+    # Frames holding a single block of floats are transposed without a copy.
+    rr_values = np.ascontiguousarray(relative_risk.to_numpy(np.float64).T)
+    exposure_values = np.ascontiguousarray(exposure.to_numpy(np.float64).T)
+    products = np.take(exposure_values, exposure_rows, axis=1)
+    products *= rr_values
+    del rr_values
+    # Like the sum of a groupby, skip missing products
+    products[:, exposure_rows < 0] = 0
+    products[np.isnan(products)] = 0
+
+    sizes = np.bincount(group_codes, minlength=n_groups)
+    n_categories = sizes.max()
+    regular = (sizes == n_categories).all() and (
+        group_codes == np.repeat(np.arange(n_groups), n_categories)
+    ).all()
+    if regular:
+        # Every group is a contiguous run of rows, as in sorted relative
+        # risk, so the products already form a (draw, group, category) array.
+        dense = products.reshape(len(products), n_groups, n_categories)
+    else:
+        order = np.argsort(group_codes, kind="stable")
+        position = np.arange(len(order)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        dense = np.zeros((len(products), n_groups, n_categories))
+        dense[:, group_codes[order], position] = products[:, order]
+    del products
+    # Faster than summing over the short category axis with dense.sum
+    sum_exp_x_rr = np.einsum("dgk->dg", dense)
+    logger.debug(f"Summed {len(relative_risk)} relative risk rows into {n_groups} PAF rows.")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        paf = (sum_exp_x_rr - 1) / sum_exp_x_rr
+    # Factorized codes number the groups in order of appearance, which is
+    # already sorted for sorted relative risk
+    paf = pd.DataFrame(paf.T, index=group_index, columns=relative_risk.columns)
+    return paf if group_index.is_monotonic_increasing else paf.sort_index()
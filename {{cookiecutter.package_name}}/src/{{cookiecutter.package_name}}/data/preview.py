@@ -0,0 +1,103 @@
+"""Preview builds with a subset of the draws.
+
+Full artifacts carry all ``metadata.DRAW_COUNT`` draws, but development runs
+only ever read a handful of them. A preview build keeps only the first
+``draw_count`` draws (``draw_0`` through ``draw_<draw_count - 1>``) of every
+key and writes its artifacts to their own directory in the output
+directory::
+
+    preview_<draw_count>_draws/<location>.hdf
+
+The subset is the same for every key and every build, and the draw columns
+keep their names, so a simulation whose input draw is one of the kept draws
+reads a preview artifact exactly like a full one.
+
+The subset is applied in :func:`loader.get_data` as soon as data is loaded,
+and raw GBD draws are subset before they are transformed, so preview builds
+save extraction, transform and write time as well as disk space.
+
+.. admonition::
+
+   Logging in this module should be done at the ``debug`` level.
+
+"""
+from collections.abc import Iterator
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from {{cookiecutter.package_name}}.constants import metadata
+
+
+def get_preview_dir(output_dir: str | Path, draw_count: int) -> Path:
+    """Returns the directory preview artifacts with ``draw_count`` draws are built in."""
+    return Path(output_dir) / f"preview_{draw_count}_draws"
+
+
+def get_preview_draws(draw_count: int) -> pd.Index:
+    """Returns the draw columns kept by a preview build.
+
+    Raises
+    ------
+    ValueError
+        If ``draw_count`` isn't between 1 and ``metadata.DRAW_COUNT``.
+
+    """
+    if not 1 <= draw_count <= metadata.DRAW_COUNT:
+        raise ValueError(
+            f"Preview builds must keep between 1 and {metadata.DRAW_COUNT} draws. "
+            f"You specified {draw_count}."
+        )
+    return metadata.ARTIFACT_COLUMNS[:draw_count]
+
+
+_PREVIEW_DRAWS: pd.Index | None = None
+
+
+def enable_preview(draw_count: int) -> None:
+    """Makes :func:`loader.get_data` keep only the first ``draw_count`` draws."""
+    global _PREVIEW_DRAWS
+    _PREVIEW_DRAWS = get_preview_draws(draw_count)
+
+
+def disable_preview() -> None:
+    """Makes :func:`loader.get_data` keep every draw."""
+    global _PREVIEW_DRAWS
+    _PREVIEW_DRAWS = None
+
+
+def get_draw_count() -> int | None:
+    """Returns the number of draws kept, or ``None`` if every draw is kept."""
+    return None if _PREVIEW_DRAWS is None else len(_PREVIEW_DRAWS)
+
+
+def get_draw_columns(columns: pd.Index) -> pd.Index:
+    """Returns the draw columns of ``columns`` that are kept, in order."""
+    if _PREVIEW_DRAWS is None:
+        return columns
+    return columns[columns.isin(_PREVIEW_DRAWS)]
+
+
+def subset_draws(data):
+    """Drops the draws a preview build doesn't keep.
+
+    Data frames with draw columns lose every draw column that isn't kept.
+    Data loaded in chunks is subset one chunk at a time. Everything else is
+    returned as is.
+
+    """
+    if _PREVIEW_DRAWS is None:
+        return data
+    if isinstance(data, Iterator):
+        return (subset_draws(chunk) for chunk in data)
+    if not isinstance(data, pd.DataFrame):
+        return data
+
+    dropped = data.columns.isin(metadata.ARTIFACT_COLUMNS) & ~data.columns.isin(
+        _PREVIEW_DRAWS
+    )
+    if not dropped.any():
+        return data
+    logger.debug(f"Dropping {dropped.sum()} draws not kept by the preview build.")
+    return data.loc[:, ~dropped]
@@ -0,0 +1,126 @@
+"""Batched pulls of modelable entity draws shared by every location.
+
+Pulling modelable entity draws one location at a time makes every location
+build issue its own heavy query for the same modelable entity and repeat
+the same transformation. When building all locations, the modelable
+entities in ``metadata.STAGED_MODELABLE_ENTITIES`` are instead pulled once
+for every location, transformed once and split into one file per location
+in a staging directory in the output directory::
+
+    .staging/<modelable entity id>/<measure>/<location>.parquet
+
+Each location build reads its own files from the staging directory and
+falls back to pulling the data itself for anything that isn't staged.
+
+.. admonition::
+
+   Logging in this module should be done at the ``debug`` level.
+
+"""
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from {{cookiecutter.package_name}}.constants import metadata
+from {{cookiecutter.package_name}}.utilities import sanitize_location
+
+STAGING_DIR = ".staging"
+
+
+def get_staging_dir(output_dir: str | Path) -> Path:
+    """Returns the staging directory of an output directory."""
+    return Path(output_dir) / STAGING_DIR
+
+
+def get_staged_path(staging_dir: Path, meid: int, measure: str, location: str) -> Path:
+    """Returns the path of the staged draws of a modelable entity for a location."""
+    return Path(staging_dir) / str(meid) / measure / f"{sanitize_location(location)}.parquet"
+
+
+def stage_modelable_entities(
+    staging_dir: Path,
+    locations: list[str],
+    modelable_entities: dict[int, list[str]] | None = None,
+    gbd=None,
+    transform: Callable[[pd.DataFrame, str, list[str]], pd.DataFrame] | None = None,
+) -> None:
+    """Pulls modelable entity draws for every location at once and stages them.
+
+    Parameters
+    ----------
+    staging_dir
+        The directory to stage the draws in.
+    locations
+        The names of the locations to pull draws for.
+    modelable_entities
+        The measures to stage for each modelable entity id. Defaults to
+        ``metadata.STAGED_MODELABLE_ENTITIES``.
+    gbd
+        The module to pull draws through. Defaults to
+        :mod:`vivarium_gbd_access.gbd`.
+    transform
+        Transforms the draws of a measure for all locations at once into
+        a table indexed by location. Defaults to
+        :func:`{{cookiecutter.package_name}}.data.loader.transform_gbd_draws`.
+
+    """
+    if gbd is None:
+        from vivarium_gbd_access import gbd
+    if transform is None:
+        from {{cookiecutter.package_name}}.data.loader import (
+            transform_gbd_draws as transform,
+        )
+
+    if modelable_entities is None:
+        modelable_entities = metadata.STAGED_MODELABLE_ENTITIES
+    location_ids = gbd.get_location_ids().set_index("location_name")["location_id"]
+    location_ids = [int(location_ids[location]) for location in locations]
+    for meid, measures in modelable_entities.items():
+        logger.debug(
+            f"Pulling draws for modelable entity {meid} for {len(locations)} locations."
+        )
+        data = gbd.get_modelable_entity_draws(meid, location_ids)
+        for measure in measures:
+            transformed = transform(data, measure, locations)
+            for location, location_data in transformed.groupby(level="location"):
+                path = get_staged_path(staging_dir, meid, measure, location)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Location builds may already be reading, so move complete
+                # files into place.
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                location_data.droplevel("location").to_parquet(tmp_path)
+                os.replace(tmp_path, path)
+            logger.debug(f"Staged {measure} draws for modelable entity {meid}.")
+
+
+_STAGING_DIR: Path | None = None
+
+
+def enable_staging(staging_dir: Path) -> None:
+    """Makes :func:`load_staged` read from a staging directory."""
+    global _STAGING_DIR
+    _STAGING_DIR = Path(staging_dir)
+
+
+def disable_staging() -> None:
+    """Turns off reading staged draws."""
+    global _STAGING_DIR
+    _STAGING_DIR = None
+
+
+def load_staged(meid: int, measure: str, location: str) -> pd.DataFrame | None:
+    """Returns the staged draws of a modelable entity for a location.
+
+    Returns ``None`` if staging is disabled or the draws aren't staged.
+
+    """
+    if _STAGING_DIR is None:
+        return None
+    path = get_staged_path(_STAGING_DIR, meid, measure, location)
+    if not path.exists():
+        return None
+    logger.debug(f"Reading staged {measure} draws for modelable entity {meid}.")
+    return pd.read_parquet(path)
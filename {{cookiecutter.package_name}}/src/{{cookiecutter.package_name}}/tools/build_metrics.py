@@ -0,0 +1,132 @@
+"""Per-key resource metrics for artifact builds.
+
+Each key loaded during a build records how long it took to load and write,
+how big it is, how much space its data takes up in the artifact file and
+the peak resident set size (RSS) of the build once it was written. The records are
+logged as they come in, with the raw values attached to the log record under
+``extra["key_metrics"]`` for serialized sinks, and are written to a JSON
+report at the end of the build together with a summary table.
+
+The peak RSS is sampled with :func:`resource.getrusage` after each key,
+so it includes the memory allocated by HDF5 and the compression libraries
+and costs nothing while the key is loaded. It is the peak of the whole
+build up to that key, so a key raised it if it is higher than for the key
+before. With a single worker, keys are built strictly one at a time, so
+that key is the only one that can have raised it.
+
+.. admonition::
+
+   Logging in this module should typically be done at the ``info`` level.
+   Use your best judgement.
+
+"""
+import json
+import resource
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from loguru import logger
+
+
+class KeyMetrics(NamedTuple):
+    key: str
+    load_time: float  # seconds
+    write_time: float  # seconds
+    rows: int
+    columns: int
+    bytes_on_disk: int  # of the key's data in the artifact file
+    peak_memory: float  # MB, peak RSS of the build once the key was written
+
+
+def get_peak_rss() -> float:
+    """Returns the peak resident set size of this process in MB."""
+    # ru_maxrss is reported in KB on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def get_shape(data) -> tuple[int, int]:
+    """Returns the number of rows and columns of loaded data."""
+    shape = getattr(data, "shape", (0, 0))
+    return shape if len(shape) == 2 else (shape[0], 1)
+
+
+def get_key_size(artifact_path: Path, key: str) -> int:
+    """Returns the bytes the data of a key takes up in an HDF file, or 0 if it has none."""
+    import tables
+    from vivarium.framework.artifact import EntityKey
+
+    with tables.open_file(str(artifact_path), mode="r") as file:
+        try:
+            node = file.get_node(EntityKey(key).path)
+        except tables.NoSuchNodeError:
+            return 0
+        # Keys stored as JSON (e.g. metadata) are a single leaf
+        leaves = file.walk_nodes(node, "Leaf") if isinstance(node, tables.Group) else [node]
+        return sum(leaf.size_on_disk for leaf in leaves)
+
+
+class BuildMetrics:
+    """Collects the metrics for every key in a single location build.
+
+    Parameters
+    ----------
+    location
+        The location the artifact is built for.
+
+    """
+
+    def __init__(self, location: str):
+        self.location = location
+        self.keys: list[KeyMetrics] = []
+        self._start = time.time()
+
+    def record(self, metrics: KeyMetrics) -> None:
+        """Stores and logs the metrics for one key."""
+        self.keys.append(metrics)
+        logger.bind(key_metrics=metrics._asdict()).info(
+            f"   - {metrics.key}: loaded in {metrics.load_time:.1f}s, "
+            f"written in {metrics.write_time:.1f}s, "
+            f"{metrics.rows} x {metrics.columns}, "
+            f"{metrics.bytes_on_disk / 1024**2:.1f} MB on disk, "
+            f"peak RSS {metrics.peak_memory:.0f} MB"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "location": self.location,
+            "total_time": time.time() - self._start,
+            "peak_rss": get_peak_rss(),
+            "keys": [metrics._asdict() for metrics in self.keys],
+        }
+
+    def write_report(self, path: Path) -> None:
+        """Writes the metrics for the build to a JSON file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        logger.info(f"Wrote build metrics to {str(path)}.")
+
+    def log_summary(self) -> None:
+        """Logs a table of the recorded keys, slowest first."""
+        key_width = max([len(m.key) for m in self.keys] + [3])
+        logger.info(
+            f"{'key':<{key_width}} | {'load (s)':>9} | {'write (s)':>9} | "
+            f"{'rows':>9} | {'cols':>5} | {'disk (MB)':>9} | {'RSS (MB)':>9}"
+        )
+        for m in sorted(self.keys, key=lambda m: m.load_time + m.write_time, reverse=True):
+            logger.info(
+                f"{m.key:<{key_width}} | {m.load_time:>9.1f} | {m.write_time:>9.1f} | "
+                f"{m.rows:>9} | {m.columns:>5} | {m.bytes_on_disk / 1024**2:>9.1f} | "
+                f"{m.peak_memory:>9.0f}"
+            )
+        summary = self.to_dict()
+        logger.info(
+            f"Built {len(self.keys)} keys for {self.location} in "
+            f"{summary['total_time']:.1f}s with a peak RSS of {summary['peak_rss']:.0f} MB"
+        )
+
+
+def get_report_path(artifact_path: Path) -> Path:
+    """Returns the path of the metrics report for an artifact."""
+    return artifact_path.parent / "logs" / f"{artifact_path.stem}_metrics.json"
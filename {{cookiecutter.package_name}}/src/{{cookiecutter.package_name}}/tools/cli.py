@@ -1,6 +1,5 @@
 import click
 from loguru import logger
-from vivarium.framework.utilities import handle_exceptions
 
 from {{cookiecutter.package_name}}.constants import metadata, paths
 from {{cookiecutter.package_name}}.tools import (
@@ -25,7 +24,8 @@ from {{cookiecutter.package_name}}.tools import (
     "--years",
     default=None,
     help=(
-        "Years for which to make an artifact. Can be a single year or 'all'. \n"
+        "Years for which to make an artifact. Can be a single year, 'all' or "
+        "'estimation' for the GBD estimation years only. \n"
         "If not specified, make for most recent year."
     ),
 )
@@ -41,6 +41,65 @@ from {{cookiecutter.package_name}}.tools import (
     "-a", "--append", is_flag=True, help="Append to the artifact instead of overwriting."
 )
 @click.option("-r", "--replace-keys", multiple=True, help="Specify keys to overwrite")
+@click.option(
+    "-w",
+    "--workers",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of threads used to load data for independent keys concurrently.",
+)
+@click.option(
+    "-p",
+    "--processes",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of locations to build at once when building all locations off the cluster.",
+)
+@click.option(
+    "--memory-budget",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Memory in GB parallel local builds may use. Defaults to the machine's memory.",
+)
+@click.option(
+    "--verify",
+    is_flag=True,
+    help="Check the shape of each key after it is written to the artifact.",
+)
+@click.option(
+    "--no-cache",
+    "use_cache",
+    is_flag=True,
+    flag_value=False,
+    default=True,
+    help="Pull all data from scratch instead of reusing locally cached extracts.",
+)
+@click.option(
+    "--clear-cache", is_flag=True, help="Empty the local data cache before building."
+)
+@click.option(
+    "--fan-out",
+    is_flag=True,
+    help="On a cluster, build each key group of an artifact in its own job.",
+)
+@click.option(
+    "--draws",
+    type=click.IntRange(min=1, max=metadata.DRAW_COUNT),
+    help=(
+        "Build preview artifacts with only the first N draws of every key in "
+        "OUTPUT_DIR/preview_<N>_draws."
+    ),
+)
+@click.option(
+    "--by-year",
+    is_flag=True,
+    help=(
+        "With --years estimation, load and write each GBD estimation year separately. "
+        "Years between estimation years are not built. With --append, only add the "
+        "years missing from each key."
+    ),
+)
 @click.option("-v", "verbose", count=True, help="Configure logging verbosity.")
 @click.option(
     "--pdb",
@@ -54,9 +113,137 @@ def make_artifacts(
     output_dir: str,
     append: bool,
     replace_keys: tuple[str, ...],
+    workers: int,
+    processes: int,
+    memory_budget: float | None,
+    verify: bool,
+    use_cache: bool,
+    clear_cache: bool,
+    fan_out: bool,
+    draws: int | None,
+    by_year: bool,
     verbose: int,
     with_debugger: bool,
 ) -> None:
     configure_logging_to_terminal(verbose)
+    # Local import since vivarium is slow to import and --help doesn't need it
+    from vivarium.framework.utilities import handle_exceptions
+
     main = handle_exceptions(build_artifacts, logger, with_debugger=with_debugger)
-    main(location, years, output_dir, append or replace_keys, replace_keys, verbose)
+    failed_locations = main(
+        location,
+        years,
+        output_dir,
+        append or replace_keys,
+        replace_keys,
+        verbose,
+        workers,
+        verify,
+        use_cache,
+        clear_cache,
+        fan_out,
+        processes,
+        memory_budget,
+        draws,
+        by_year,
+    )
+    if failed_locations:
+        raise click.ClickException(
+            f"Artifact builds failed for {len(failed_locations)} locations: "
+            f"{', '.join(failed_locations)}."
+        )
+
+
+@click.command()
+@click.option(
+    "-o",
+    "--output-dir",
+    default=str(paths.ARTIFACT_ROOT),
+    show_default=True,
+    type=click.Path(),
+    help="The directory containing the artifacts.",
+)
+def artifact_status(output_dir: str) -> None:
+    """Shows which artifacts are built and which are stale.
+
+    Only the manifest of the output directory is read. No artifact is opened.
+
+    """
+    from pathlib import Path
+
+    from {{cookiecutter.package_name}}.constants import data_keys
+    from {{cookiecutter.package_name}}.data.journal import is_interrupted
+    from {{cookiecutter.package_name}}.data.manifest import ArtifactManifest
+    from {{cookiecutter.package_name}}.utilities import sanitize_location
+
+    expected_keys = [
+        str(key) for key_group in data_keys.MAKE_ARTIFACT_KEY_GROUPS for key in key_group
+    ]
+    click.echo(f"{'location':<30} {'keys':>9} {'stale':>6} {'last built':>20}  status")
+    for location in metadata.LOCATIONS:
+        path = Path(output_dir) / f"{sanitize_location(location)}.hdf"
+        manifest = ArtifactManifest(path)
+        missing = [key for key in expected_keys if key not in manifest]
+        stale = manifest.get_stale_keys()
+        if not path.exists():
+            status = "not built"
+        elif is_interrupted(path):
+            status = "interrupted"
+        elif not manifest.path.exists():
+            status = "not in manifest"
+        elif not manifest.is_current():
+            status = "changed outside of a build"
+        elif missing:
+            status = f"missing {len(missing)} keys"
+        elif stale:
+            status = "stale"
+        else:
+            status = "up to date"
+        built = max((record["built"] for record in manifest.keys.values()), default="")
+        click.echo(
+            f"{location:<30} {len(expected_keys) - len(missing):>4}/{len(expected_keys):<4} "
+            f"{len(stale):>6} {built:>20}  {status}"
+        )
+
+
+@click.command()
+@click.argument("artifact_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-k", "--key", "keys", multiple=True, help="Keys to benchmark. Defaults to all."
+)
+@click.option(
+    "-p",
+    "--profile",
+    "profile_names",
+    multiple=True,
+    type=click.Choice(list(metadata.WRITE_PROFILES)),
+    help="Write profiles to compare. Defaults to all.",
+)
+@click.option(
+    "--include-fixed",
+    is_flag=True,
+    help="Also compare each profile in fixed format. Artifacts can't read fixed format.",
+)
+def benchmark_write_profiles(
+    artifact_path: str,
+    keys: tuple[str, ...],
+    profile_names: tuple[str, ...],
+    include_fixed: bool,
+) -> None:
+    """Reports write time, read time and size of an artifact's keys per write profile."""
+    from {{cookiecutter.package_name}}.tools import write_benchmark
+
+    configure_logging_to_terminal(1)
+    profiles = {
+        name: metadata.WRITE_PROFILES[name]
+        for name in (profile_names or metadata.WRITE_PROFILES)
+    }
+    if include_fixed:
+        profiles.update(
+            {f"{name} (fixed)": p._replace(format="fixed") for name, p in profiles.items()}
+        )
+    results = write_benchmark.benchmark_write_profiles(
+        artifact_path, list(keys) or None, profiles
+    )
+    for row in write_benchmark.format_results(results):
+        click.echo(row)
@@ -0,0 +1,146 @@
+"""Sizing of the cluster jobs that build artifacts.
+
+Each location job is sized from the metrics report of the last complete
+build of that location (see :mod:`{{cookiecutter.package_name}}.tools.build_metrics`).
+Locations without a usable report fall back to the defaults in
+:mod:`{{cookiecutter.package_name}}.constants.metadata`. Jobs that are killed
+for running out of memory or time are resubmitted with escalated limits.
+
+"""
+import json
+import math
+import signal
+from pathlib import Path
+from typing import NamedTuple
+
+from loguru import logger
+
+from {{cookiecutter.package_name}}.constants import metadata
+from {{cookiecutter.package_name}}.tools.build_metrics import get_report_path
+
+MEMORY_HEADROOM = 1.5
+RUNTIME_HEADROOM = 2.0
+MIN_RUNTIME = 30 * 60  # seconds
+# The signals the scheduler stops jobs that go over their memory (SIGKILL) or
+# runtime (SIGXCPU) limits with. Jobs cancelled by a user get SIGTERM.
+RESOURCE_SIGNALS = ("SIGKILL", "SIGXCPU")
+# 128 + SIGKILL, the exit status of jobs the scheduler killed for their memory
+KILLED_EXIT_STATUS = 128 + signal.SIGKILL
+RESOURCE_EXIT_STATUSES = {128 + signal.Signals[name] for name in RESOURCE_SIGNALS}
+
+
+class JobResources(NamedTuple):
+    memory: int  # GB
+    cpu: int
+    runtime: str  # H:MM:SS
+
+
+def parse_runtime(runtime: str) -> int:
+    """Converts a runtime of the form H:MM:SS to seconds."""
+    hours, minutes, seconds = (int(part) for part in runtime.split(":"))
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def format_runtime(seconds: float) -> str:
+    """Converts seconds to a runtime of the form H:MM:SS."""
+    seconds = int(math.ceil(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def get_default_resources(workers: int = 1) -> JobResources:
+    """Returns the resources requested when there is no build history."""
+    return JobResources(
+        metadata.MAKE_ARTIFACT_MEM,
+        max(metadata.MAKE_ARTIFACT_CPU, workers),
+        metadata.MAKE_ARTIFACT_RUNTIME,
+    )
+
+
+def estimate_resources(
+    artifact_path: Path, workers: int = 1, key_groups: list | None = None
+) -> JobResources:
+    """Estimates the resources needed to build an artifact from its history.
+
+    Parameters
+    ----------
+    artifact_path
+        The path of the artifact (or artifact shard) to build.
+    workers
+        The number of threads the job uses to load data.
+    key_groups
+        The key groups the job builds. Defaults to all of them.
+
+    Returns
+    -------
+        The peak memory and runtime of the last complete build of the
+        artifact with some headroom, or the defaults if there isn't one.
+
+    """
+    # Local import since the key definitions pull in vivarium_public_health
+    from {{cookiecutter.package_name}}.constants import data_keys
+
+    default = get_default_resources(workers)
+    report_path = get_report_path(artifact_path)
+    if not report_path.exists():
+        return default
+
+    with report_path.open() as f:
+        report = json.load(f)
+    key_groups = data_keys.MAKE_ARTIFACT_KEY_GROUPS if key_groups is None else key_groups
+    key_count = sum(len(key_group) for key_group in key_groups)
+    if len(report["keys"]) < key_count:
+        # A partial rebuild says little about what a full build needs.
+        return default
+
+    memory = min(
+        max(1, math.ceil(report["peak_rss"] / 1024 * MEMORY_HEADROOM)),
+        metadata.MAKE_ARTIFACT_MAX_MEM,
+    )
+    runtime = min(
+        max(MIN_RUNTIME, report["total_time"] * RUNTIME_HEADROOM),
+        parse_runtime(metadata.MAKE_ARTIFACT_MAX_RUNTIME),
+    )
+    return JobResources(memory, default.cpu, format_runtime(runtime))
+
+
+def escalate(resources: JobResources) -> JobResources:
+    """Returns larger resources for a job that ran out of memory or time."""
+    runtime = min(
+        parse_runtime(resources.runtime) * 2,
+        parse_runtime(metadata.MAKE_ARTIFACT_MAX_RUNTIME),
+    )
+    return JobResources(
+        min(resources.memory * 2, metadata.MAKE_ARTIFACT_MAX_MEM),
+        resources.cpu,
+        format_runtime(runtime),
+    )
+
+
+def was_killed_for_resources(job_info) -> bool:
+    """Returns whether a finished job was killed for going over its memory or runtime.
+
+    Jobs killed by any other signal, such as a user cancelling them, were
+    not killed for their resources.
+
+    Parameters
+    ----------
+    job_info
+        The :class:`drmaa.JobInfo` returned when waiting on the job.
+
+    """
+    if job_info.hasSignal:
+        logger.debug(f"Job {job_info.jobId} was killed by {job_info.terminatedSignal}.")
+        return _get_signal_name(job_info.terminatedSignal) in RESOURCE_SIGNALS
+    return job_info.hasExited and job_info.exitStatus in RESOURCE_EXIT_STATUSES
+
+
+def _get_signal_name(terminated_signal) -> str | None:
+    # Schedulers report the signal by name, with or without the SIG prefix,
+    # or by number
+    name = str(terminated_signal).upper()
+    if not name.isdigit():
+        return f"SIG{name.removeprefix('SIG')}"
+    try:
+        return signal.Signals(int(name)).name
+    except ValueError:
+        return None
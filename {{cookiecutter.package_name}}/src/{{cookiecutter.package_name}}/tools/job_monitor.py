@@ -0,0 +1,164 @@
+"""Event-driven monitoring of artifact cluster jobs.
+
+The monitor blocks in a single ``session.wait`` on whichever job of the
+session finishes next, so the scheduler is asked about finished jobs as
+they finish rather than polled for every job. Each cycle makes one wait
+call of up to ``metadata.MAKE_ARTIFACT_SLEEP`` seconds. When verbose, the
+status of at most ``metadata.MAKE_ARTIFACT_MAX_STATUS_QUERIES`` running
+jobs is also queried each time the wait times out, taking turns between
+jobs, and only status changes are logged. Finished jobs are dropped from
+the watch set.
+
+Jobs killed for running out of memory or time are resubmitted with
+escalated limits (see :mod:`{{cookiecutter.package_name}}.tools.cluster_resources`).
+
+.. admonition::
+
+   Logging in this module should typically be done at the ``info`` level.
+   Use your best judgement.
+
+"""
+from collections import deque
+from typing import Callable, NamedTuple
+
+from loguru import logger
+
+from {{cookiecutter.package_name}}.constants import metadata
+from {{cookiecutter.package_name}}.tools import cluster_resources
+from {{cookiecutter.package_name}}.tools.app_logging import decode_status
+
+
+class JobFailure(NamedTuple):
+    name: str
+    location: str
+    job_id: str
+    reason: str
+
+
+class JobMonitor:
+    """Watches artifact jobs until every one of them has finished.
+
+    Parameters
+    ----------
+    session
+        The active :class:`drmaa.Session` the jobs were submitted with.
+    drmaa
+        The drmaa module.
+    submit
+        Submits a job and returns its id. Used to resubmit killed jobs.
+    verbose
+        Whether to log every status change, rather than only finished jobs.
+    max_status_queries
+        The maximum number of job statuses to query each cycle when verbose.
+
+    """
+
+    def __init__(
+        self,
+        session,
+        drmaa,
+        submit: Callable[[NamedTuple], str],
+        verbose: int = 0,
+        max_status_queries: int = metadata.MAKE_ARTIFACT_MAX_STATUS_QUERIES,
+    ):
+        self._session = session
+        self._drmaa = drmaa
+        self._submit = submit
+        self._verbose = verbose
+        self._max_status_queries = max_status_queries
+        self._statuses = {}
+        self._status_queue: deque[str] = deque()
+        self.failures: list[JobFailure] = []
+
+    def run(self, jobs: dict[str, NamedTuple]) -> list[JobFailure]:
+        """Watches jobs until they finish.
+
+        Parameters
+        ----------
+        jobs
+            A mapping from job id to the artifact job it is running.
+
+        Returns
+        -------
+            The jobs that failed and were not successfully resubmitted.
+
+        """
+        logger.info(f"Monitoring {len(jobs)} jobs.")
+        jobs = dict(jobs)
+        self._status_queue.extend(jobs)
+        while jobs:
+            job_info = self._wait_any()
+            if job_info is None:
+                if self._verbose:
+                    self._log_status_changes(jobs)
+                continue
+            # Other jobs of the session aren't ours to watch
+            job = jobs.pop(job_info.jobId, None)
+            if job is not None:
+                self._finish(job_info, job, jobs)
+        return self.failures
+
+    def _wait_any(self):
+        try:
+            return self._session.wait(
+                self._drmaa.Session.JOB_IDS_SESSION_ANY, metadata.MAKE_ARTIFACT_SLEEP
+            )
+        except self._drmaa.ExitTimeoutException:
+            return None
+
+    def _log_status_changes(self, jobs: dict[str, NamedTuple]) -> None:
+        # Finished jobs are dropped from the queue as they come up
+        self._status_queue = deque(job_id for job_id in self._status_queue if job_id in jobs)
+        for _ in range(min(len(self._status_queue), self._max_status_queries)):
+            job_id = self._status_queue.popleft()
+            status = self._session.jobStatus(job_id)
+            if status != self._statuses.get(job_id):
+                status_name = decode_status(self._drmaa, status)
+                logger.info(f"{jobs[job_id].name:<35}: {status_name:>15}")
+                self._statuses[job_id] = status
+            self._status_queue.append(job_id)
+
+    def _finish(self, job_info, job, jobs: dict[str, NamedTuple]) -> None:
+        job_id = job_info.jobId
+        self._statuses.pop(job_id, None)
+        if job_info.hasExited and job_info.exitStatus == 0:
+            logger.info(f"{job.name:<35}: {'done':>15}")
+            return
+
+        if (
+            cluster_resources.was_killed_for_resources(job_info)
+            and job.retries < metadata.MAKE_ARTIFACT_MAX_RETRIES
+        ):
+            resources = cluster_resources.escalate(job.resources)
+            logger.info(
+                f"Job {job_id} for {job.name} was killed. Resubmitting with "
+                f"{resources.memory}GB of memory and a runtime of {resources.runtime}."
+            )
+            job = job._replace(resources=resources, retries=job.retries + 1)
+            new_job_id = self._submit(job)
+            jobs[new_job_id] = job
+            self._status_queue.append(new_job_id)
+            return
+
+        failure = JobFailure(job.name, job.location, job_id, get_failure_reason(job_info))
+        logger.error(f"{job.name:<35}: {'failed':>15} ({failure.reason})")
+        self.failures.append(failure)
+
+
+def get_failure_reason(job_info) -> str:
+    """Describes why a finished job did not succeed."""
+    if job_info.hasSignal:
+        return f"killed by {job_info.terminatedSignal}"
+    if job_info.hasExited:
+        return f"exit status {job_info.exitStatus}"
+    if job_info.wasAborted:
+        return "aborted before it ran"
+    return "unknown"
+
+
+def log_failure_summary(failures: list[JobFailure]) -> None:
+    """Logs a table of the failed jobs, grouped by location."""
+    locations = sorted({failure.location for failure in failures})
+    logger.error(f"{len(failures)} jobs failed for {len(locations)} locations:")
+    for failure in sorted(failures):
+        logger.error(f"   - {failure.name} (job {failure.job_id}): {failure.reason}")
@@ -0,0 +1,202 @@
+"""Parallel artifact builds on a single machine.
+
+Off the cluster, artifacts for every location are built in a pool of
+processes, one location per process. A location only starts once the
+memory its build is expected to need (see
+:func:`cluster_resources.estimate_resources`) fits in the memory budget
+alongside the builds already running, and the locations expected to need
+the most memory start first. Each build logs to its own file, and a failed
+location doesn't stop the others.
+
+.. admonition::
+
+   Logging in this module should typically be done at the ``info`` level.
+   Use your best judgement.
+
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from loguru import logger
+
+from {{cookiecutter.package_name}}.tools import cluster_resources
+from {{cookiecutter.package_name}}.utilities import sanitize_location
+
+
+def get_physical_memory() -> float:
+    """Returns the physical memory of this machine in GB."""
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024**3
+
+
+def build_locations(
+    locations: list[str],
+    output_dir: Path,
+    years: str | None,
+    replace_keys: tuple,
+    processes: int,
+    memory_budget: float | None = None,
+    workers: int = 1,
+    verify: bool = False,
+    use_cache: bool = True,
+    staging_dir: Path | None = None,
+    draws: int | None = None,
+    by_year: bool = False,
+) -> list[str]:
+    """Builds artifacts for several locations in parallel processes.
+
+    Parameters
+    ----------
+    locations
+        The locations to build artifacts for.
+    output_dir
+        The directory where the artifacts will be built.
+    years
+        Years for which to make an artifact. Can be a single year or 'all'.
+        If not specified, make for most recent year.
+    replace_keys
+        A list of keys to replace in the artifacts.
+    processes
+        The maximum number of locations to build at the same time.
+    memory_budget
+        The total memory in GB the builds may use at the same time.
+        Defaults to the physical memory of the machine.
+    workers
+        The number of threads each build uses to load data.
+    verify
+        Whether each build checks the shape of each written key.
+    use_cache
+        Whether each build reuses locally cached extracts.
+    staging_dir
+        The directory holding draws staged for all locations, if any.
+    draws
+        The number of draws each build keeps for a preview build, if any.
+    by_year
+        Whether each build loads and writes keys one year at a time.
+
+    Returns
+    -------
+        The locations whose build failed.
+
+    """
+    memory_budget = get_physical_memory() if memory_budget is None else memory_budget
+    memory = {
+        location: cluster_resources.estimate_resources(
+            output_dir / f"{sanitize_location(location)}.hdf", workers
+        ).memory
+        for location in locations
+    }
+    queue = sorted(locations, key=lambda location: memory[location], reverse=True)
+    logger.info(
+        f"Building {len(queue)} artifacts with up to {processes} processes "
+        f"and a memory budget of {memory_budget:.0f}GB."
+    )
+
+    running = {}
+    failed = []
+    executor = ProcessPoolExecutor(max_workers=processes)
+    try:
+        while queue or running:
+            in_use = sum(memory[location] for location in running.values())
+            while queue and len(running) < processes:
+                # Always let one build run, even if it is expected to need
+                # more than the whole budget.
+                fits = [
+                    location
+                    for location in queue
+                    if not running or in_use + memory[location] <= memory_budget
+                ]
+                if not fits:
+                    break
+                location = fits[0]
+                queue.remove(location)
+                in_use += memory[location]
+                path = output_dir / f"{sanitize_location(location)}.hdf"
+                future = executor.submit(
+                    _build_location,
+                    path,
+                    location,
+                    years,
+                    replace_keys,
+                    workers,
+                    verify,
+                    use_cache,
+                    staging_dir,
+                    draws,
+                    by_year,
+                )
+                running[future] = location
+                logger.info(f"Started building {location} (~{memory[location]}GB).")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                location = running.pop(future)
+                try:
+                    future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    logger.error(
+                        f"Building {location} failed: a build process died, "
+                        "most likely because the machine ran out of memory."
+                    )
+                    failed.append(location)
+                except Exception as e:
+                    logger.error(f"Building {location} failed: {e!r}")
+                    failed.append(location)
+                else:
+                    logger.info(f"Finished building {location}.")
+
+            if broken:
+                # Every build in a broken pool fails, so start a new one for
+                # the locations still queued.
+                executor.shutdown(wait=False)
+                executor = ProcessPoolExecutor(max_workers=processes)
+    finally:
+        executor.shutdown(wait=True)
+
+    if failed:
+        logger.error(f"Artifact builds failed for {len(failed)} locations:")
+        for location in failed:
+            log_file = output_dir / "logs" / f"{sanitize_location(location)}.log"
+            logger.error(f"   - {location}: see {str(log_file)}")
+    return failed
+
+
+def _build_location(
+    path: Path,
+    location: str,
+    years: str | None,
+    replace_keys: tuple,
+    workers: int,
+    verify: bool,
+    use_cache: bool,
+    staging_dir: Path | None,
+    draws: int | None,
+    by_year: bool,
+) -> None:
+    from {{cookiecutter.package_name}}.tools.make_artifacts import (
+        build_single_location_artifact,
+    )
+
+    # Worker processes are reused, so drop the terminal sink and the log
+    # file of the previous location before logging to this one's file.
+    logger.remove()
+    try:
+        build_single_location_artifact(
+            path,
+            location,
+            years,
+            replace_keys,
+            log_to_file=True,
+            workers=workers,
+            verify=verify,
+            use_cache=use_cache,
+            staging_dir=staging_dir,
+            draws=draws,
+            by_year=by_year,
+        )
+    except Exception:
+        logger.exception(f"Building {location} failed.")
+        raise
@@ -6,20 +6,17 @@
    Use your best judgement.
 
 """
+import argparse
 import shutil
-import sys
-import time
 from pathlib import Path
+from typing import NamedTuple
 
 import click
 from loguru import logger
 
-from {{cookiecutter.package_name}}.constants import data_keys, metadata
-from {{cookiecutter.package_name}}.tools.app_logging import (
-    add_logging_sink,
-    decode_status
-)
-from {{cookiecutter.package_name}}.utilities import sanitize_location
+from {{cookiecutter.package_name}}.constants import metadata, paths
+from {{cookiecutter.package_name}}.tools import build_metrics, cluster_resources, job_monitor
+from {{cookiecutter.package_name}}.tools.app_logging import add_logging_sink
 
 
 def running_from_cluster() -> bool:
@@ -31,19 +28,27 @@ def running_from_cluster() -> bool:
 def check_for_existing(
     output_dir: Path, location: str, append: bool, replace_keys: tuple
 ) -> None:
-    existing_artifacts = set(
-        [
-            item.stem
-            for item in output_dir.iterdir()
-            if item.is_file() and item.suffix == ".hdf"
-        ]
-    )
-    location = sanitize_location(location)
-    if location == "all":
-        locations = set([sanitize_location(loc) for loc in metadata.LOCATIONS])
-        existing = locations.intersection(existing_artifacts)
-    else:
-        existing = [location] if location in existing_artifacts else None
+    # Local import to avoid data dependencies
+    from {{cookiecutter.package_name}}.data import draw_store
+    from {{cookiecutter.package_name}}.data.journal import get_journal_path, is_interrupted
+    from {{cookiecutter.package_name}}.data.manifest import ArtifactManifest
+    from {{cookiecutter.package_name}}.utilities import sanitize_location
+
+    # Only look up the artifacts we might build rather than listing the
+    # whole output directory, which is slow on network storage.
+    locations = metadata.LOCATIONS if location == "all" else [location]
+    existing = [
+        sanitize_location(loc)
+        for loc in locations
+        if (output_dir / f"{sanitize_location(loc)}.hdf").exists()
+    ]
+
+    if existing and not append:
+        interrupted = [loc for loc in existing if is_interrupted(output_dir / f"{loc}.hdf")]
+        if interrupted and click.confirm(
+            f"Interrupted builds found for {interrupted}. Do you want to resume them?"
+        ):
+            existing = [loc for loc in existing if loc not in interrupted]
 
     if existing:
         if not append:
@@ -55,6 +60,9 @@ def check_for_existing(
                 path = output_dir / f"{loc}.hdf"
                 logger.info(f"Deleting artifact at {str(path)}.")
                 path.unlink(missing_ok=True)
+                shutil.rmtree(draw_store.get_draw_store_root(path), ignore_errors=True)
+                get_journal_path(path).unlink(missing_ok=True)
+                ArtifactManifest(path).delete()
         elif replace_keys:
             click.confirm(
                 f"Existing artifacts found for {existing}. If the listed keys {replace_keys} "
@@ -65,10 +73,32 @@ def check_for_existing(
 
 
 def build_single(
-    location: str, years: str | None, output_dir: str, replace_keys: tuple
+    location: str,
+    years: str | None,
+    output_dir: str,
+    replace_keys: tuple,
+    workers: int = 1,
+    verify: bool = False,
+    use_cache: bool = True,
+    staging_dir: Path | None = None,
+    draws: int | None = None,
+    by_year: bool = False,
 ) -> None:
+    from {{cookiecutter.package_name}}.utilities import sanitize_location
+
     path = Path(output_dir) / f"{sanitize_location(location)}.hdf"
-    build_single_location_artifact(path, location, years, replace_keys)
+    build_single_location_artifact(
+        path,
+        location,
+        years,
+        replace_keys,
+        workers=workers,
+        verify=verify,
+        use_cache=use_cache,
+        staging_dir=staging_dir,
+        draws=draws,
+        by_year=by_year,
+    )
 
 
 def build_artifacts(
@@ -78,7 +108,16 @@ def build_artifacts(
     append: bool,
     replace_keys: tuple,
     verbose: int,
-) -> None:
+    workers: int = 1,
+    verify: bool = False,
+    use_cache: bool = True,
+    clear_cache: bool = False,
+    fan_out: bool = False,
+    processes: int = 1,
+    memory_budget: float | None = None,
+    draws: int | None = None,
+    by_year: bool = False,
+) -> list[str]:
     """Main application function for building artifacts.
     Parameters
     ----------
@@ -88,8 +127,10 @@ def build_artifacts(
         If the latter, this application will build all artifacts in
         parallel.
      years
-        Years for which to make an artifact. Can be a single year or 'all'.
-        If not specified, make for most recent year.
+        Years for which to make an artifact. Can be a single year, 'all' for
+        every year from the first to the last GBD estimation year or
+        'estimation' for the GBD estimation years only. If not specified,
+        make for most recent year.
     output_dir
         The path where the artifact files will be built. The directory
         will be created if it doesn't exist
@@ -101,32 +142,291 @@ def build_artifacts(
         False or if there is no existing artifact at the output location
     verbose
         How noisy the logger should be.
+    workers
+        The number of threads used to load data for independent keys
+        concurrently within a single location build.
+    verify
+        Whether to check the shape of each key after it is written.
+    use_cache
+        Whether to reuse locally cached extracts instead of pulling all
+        data from scratch.
+    clear_cache
+        Whether to empty the local data cache before building.
+    fan_out
+        Whether to build each key group of each artifact in its own cluster
+        job and merge the results. Only has an effect on a cluster.
+    processes
+        The number of locations to build at the same time when building
+        all locations off the cluster.
+    memory_budget
+        The total memory in GB that parallel local builds may use.
+        Defaults to the physical memory of the machine.
+    draws
+        If given, build preview artifacts with only the first ``draws``
+        draws of every key in ``output_dir/preview_<draws>_draws`` (see
+        :mod:`{{cookiecutter.package_name}}.data.preview`).
+    by_year
+        Whether to load and write keys indexed by year one GBD estimation
+        year at a time. Years between estimation years can't be pulled on
+        their own, so this requires ``years`` to be "estimation". When
+        appending to artifacts built by year, only the years missing from
+        each key are loaded and appended.
+
+    Returns
+    -------
+        The locations whose builds failed. Serial local builds raise on
+        failure instead.
     """
+    if by_year and years != "estimation":
+        raise ValueError(
+            "Building by year only loads the GBD estimation years, so requires years "
+            f'"estimation". You specified {years}.'
+        )
+
     import vivarium_cluster_tools as vct
 
+    # Local import to avoid data dependencies
+    from {{cookiecutter.package_name}}.data import preview
+    from {{cookiecutter.package_name}}.tools import local_builder
+
     output_dir = Path(output_dir)
+    if draws is not None:
+        preview.enable_preview(draws)
+        output_dir = preview.get_preview_dir(output_dir, draws)
+        logger.info(f"Building preview artifacts with {draws} draws in {str(output_dir)}.")
+    else:
+        preview.disable_preview()
     vct.mkdir(output_dir, parents=True, exists_ok=True)
 
+    if clear_cache:
+        from {{cookiecutter.package_name}}.data import cache
+
+        logger.info("Clearing the local data cache.")
+        cache.DataCache(paths.DATA_CACHE_ROOT, metadata.DATA_CACHE_MAX_SIZE).clear()
+
     check_for_existing(output_dir, location, append, replace_keys)
 
+    if fan_out and not running_from_cluster():
+        logger.warning("Fanning out key groups requires a cluster. Building locally.")
+        fan_out = False
+    if fan_out and by_year:
+        # Merging shards replaces whole keys, which would drop appended years
+        logger.warning("Key groups can't be fanned out when building by year.")
+        fan_out = False
+
     if location in metadata.LOCATIONS:
-        build_single(location, years, output_dir, replace_keys)
-    elif location == "all":
-        if running_from_cluster():
-            # parallel build when on cluster
-            build_all_artifacts(output_dir, years, verbose)
+        if fan_out:
+            return build_all_artifacts(
+                output_dir,
+                years,
+                verbose,
+                workers,
+                verify,
+                use_cache,
+                [location],
+                fan_out,
+                draws=draws,
+                by_year=by_year,
+                replace_keys=replace_keys,
+            )
         else:
-            # serial build when not on cluster
-            for loc in metadata.LOCATIONS:
-                build_single(loc, years, output_dir, replace_keys)
+            build_single(
+                location,
+                years,
+                output_dir,
+                replace_keys,
+                workers,
+                verify,
+                use_cache,
+                draws=draws,
+                by_year=by_year,
+            )
+    elif location == "all":
+        staging_dir = stage_modelable_entities(output_dir, replace_keys, by_year)
+        try:
+            if running_from_cluster():
+                # parallel build when on cluster
+                return build_all_artifacts(
+                    output_dir,
+                    years,
+                    verbose,
+                    workers,
+                    verify,
+                    use_cache,
+                    fan_out=fan_out,
+                    staging_dir=staging_dir,
+                    draws=draws,
+                    by_year=by_year,
+                    replace_keys=replace_keys,
+                )
+            elif processes > 1:
+                # parallel build on a single machine
+                return local_builder.build_locations(
+                    metadata.LOCATIONS,
+                    output_dir,
+                    years,
+                    replace_keys,
+                    processes,
+                    memory_budget,
+                    workers,
+                    verify,
+                    use_cache,
+                    staging_dir,
+                    draws,
+                    by_year,
+                )
+            else:
+                # serial build when not on cluster
+                for loc in metadata.LOCATIONS:
+                    build_single(
+                        loc,
+                        years,
+                        output_dir,
+                        replace_keys,
+                        workers,
+                        verify,
+                        use_cache,
+                        staging_dir,
+                        draws,
+                        by_year,
+                    )
+        finally:
+            if staging_dir is not None:
+                shutil.rmtree(staging_dir, ignore_errors=True)
     else:
         raise ValueError(
             f'Location must be one of {metadata.LOCATIONS} or the string "all". '
             f"You specified {location}."
         )
+    return []
+
+
+def stage_modelable_entities(
+    output_dir: Path, replace_keys: tuple = (), by_year: bool = False
+) -> Path | None:
+    """Pulls the modelable entities shared by all locations once for every location.
+
+    Only locations whose artifacts are not up to date are staged (see
+    :func:`is_up_to_date`).
+
+    Parameters
+    ----------
+    output_dir
+        The directory where the artifacts will be built.
+    replace_keys
+        The keys that will be replaced in every artifact.
+    by_year
+        Whether the artifacts will be built by year.
+
+    Returns
+    -------
+        The staging directory location builds should read from, or ``None``
+        if ``metadata.STAGED_MODELABLE_ENTITIES`` is empty or every artifact
+        is up to date.
+
+    """
+    if not metadata.STAGED_MODELABLE_ENTITIES:
+        return None
+
+    from {{cookiecutter.package_name}}.data import staging
+    from {{cookiecutter.package_name}}.utilities import sanitize_location
+
+    locations = [
+        location
+        for location in metadata.LOCATIONS
+        if not is_up_to_date(
+            output_dir / f"{sanitize_location(location)}.hdf", replace_keys, by_year=by_year
+        )
+    ]
+    if not locations:
+        logger.info("Every artifact is up to date. Skipping staging...")
+        return None
+
+    staging_dir = staging.get_staging_dir(output_dir)
+    logger.info(
+        f"Staging {len(metadata.STAGED_MODELABLE_ENTITIES)} modelable entities for "
+        f"{len(locations)} locations in {str(staging_dir)}."
+    )
+    staging.stage_modelable_entities(staging_dir, locations)
+    return staging_dir
+
+
+def is_up_to_date(
+    path: Path,
+    replace_keys: tuple = (),
+    key_groups: list[str] | None = None,
+    by_year: bool = False,
+) -> bool:
+    """Determines from its manifest whether an artifact already has every key.
+
+    Parameters
+    ----------
+    path
+        The path of the artifact.
+    replace_keys
+        Keys that will be replaced, so are never up to date.
+    key_groups
+        The names of the key groups to build. Every key group is checked if
+        not given.
+    by_year
+        Whether the artifact is built by year, in which case keys missing
+        any year are not up to date.
+
+    Returns
+    -------
+        Whether building the artifact would not write anything. Artifacts
+        changed outside of a build or whose last build was interrupted are
+        never up to date.
+
+    """
+    # Local import to avoid data dependencies
+    from {{cookiecutter.package_name}}.data import builder
+    from {{cookiecutter.package_name}}.data.journal import is_interrupted
+    from {{cookiecutter.package_name}}.data.manifest import ArtifactManifest
+    from {{cookiecutter.package_name}}.tools import scheduler
+
+    manifest = ArtifactManifest(path)
+    if not manifest.is_current() or is_interrupted(path):
+        return False
+    build_years = builder.get_build_years() if by_year else []
+    return not any(
+        builder.needs_data(manifest, key, key in replace_keys)
+        or builder.get_missing_years(manifest, key, build_years)
+        for key_group in scheduler.get_key_groups(key_groups)
+        for key in key_group
+    )
+
+
+class ArtifactJob(NamedTuple):
+    name: str
+    location: str
+    path: Path
+    args: list[str]
+    resources: cluster_resources.JobResources
+    retries: int = 0
+
+
+def get_shard_path(output_dir: Path, location: str, key_group_name: str) -> Path:
+    """Returns the path of the shard holding one key group of an artifact."""
+    from {{cookiecutter.package_name}}.utilities import sanitize_location
+
+    return output_dir / "shards" / f"{sanitize_location(location)}_{key_group_name}.hdf"
 
 
-def build_all_artifacts(output_dir: Path, years: str | None, verbose: int) -> None:
+def build_all_artifacts(
+    output_dir: Path,
+    years: str | None,
+    verbose: int,
+    workers: int = 1,
+    verify: bool = False,
+    use_cache: bool = True,
+    locations: list[str] | None = None,
+    fan_out: bool = False,
+    staging_dir: Path | None = None,
+    draws: int | None = None,
+    by_year: bool = False,
+    replace_keys: tuple = (),
+) -> list[str]:
     """Builds artifacts for all locations in parallel.
     Parameters
     ----------
@@ -137,67 +437,217 @@ def build_all_artifacts(output_dir: Path, years: str | None, verbose: int) -> No
         If not specified, make for most recent year.
     verbose
         How noisy the logger should be.
+    workers
+        The number of threads each job uses to load data.
+    verify
+        Whether each job checks the shape of each written key.
+    use_cache
+        Whether each job reuses locally cached extracts.
+    locations
+        The locations to build artifacts for. Defaults to all project
+        locations.
+    fan_out
+        Whether to submit one job per location and key group instead of one
+        job per location. Each job writes a shard, and the shards of each
+        location are merged into its artifact once all of them finish.
+        Shards skip the keys already in the artifact, unless they are in
+        ``replace_keys``.
+    staging_dir
+        The directory holding draws staged for all locations, if any.
+    draws
+        The number of draws each job keeps for a preview build, if any.
+    by_year
+        Whether each job loads and writes keys one year at a time.
+    replace_keys
+        The keys that fanned out jobs rebuild even if they are already in
+        the artifact.
+
+    Returns
+    -------
+        The locations with at least one failed job.
+
     Note
     ----
         This function should not be called directly.  It is intended to be
         called by the :func:`build_artifacts` function located in the same
         module.
+
+        Each job requests the resources estimated from the last complete
+        build of its artifact or shard. Jobs killed for exceeding their
+        memory or runtime are resubmitted with escalated limits up to
+        ``metadata.MAKE_ARTIFACT_MAX_RETRIES`` times. See
+        :mod:`{{cookiecutter.package_name}}.tools.job_monitor`.
     """
     from vivarium_cluster_tools.utilities import get_drmaa
 
-    drmaa = get_drmaa()
+    from {{cookiecutter.package_name}}.constants import data_keys
+    from {{cookiecutter.package_name}}.utilities import sanitize_location
 
-    jobs = {}
-    with drmaa.Session() as session:
-        for location in metadata.LOCATIONS:
-            location_cleaned = sanitize_location(location)
-            path = output_dir / f"{location_cleaned}.hdf"
-
-            job_template = session.createJobTemplate()
-            job_template.remoteCommand = shutil.which("python")
-            job_template.args = [__file__, str(path), f'"{location}"', str(years)]
-            job_template.jobEnvironment = {
-                "LC_ALL": "en_US.UTF-8",
-                "LANG": "en_US.UTF-8",
-            }
-            job_template.nativeSpecification = (
-                f"-A {metadata.CLUSTER_PROJECT} "
-                f"-p {metadata.CLUSTER_QUEUE} "
-                f"--mem={metadata.MAKE_ARTIFACT_MEM*1024} "
-                f"-c {metadata.MAKE_ARTIFACT_CPU} "
-                f"-t {metadata.MAKE_ARTIFACT_RUNTIME} "
-                f"-C archive "  # Need J-drive access for data
-                f"-J {location_cleaned}_artifact"  # Name of the job
-            )
-            jobs[location] = (session.runJob(job_template), drmaa.JobState.UNDETERMINED)
-            logger.info(
-                f"Submitted job {jobs[location][0]} to build artifact for {location}."
+    drmaa = get_drmaa()
+    locations = metadata.LOCATIONS if locations is None else locations
+
+    job_args = [str(years), f"--workers={workers}"]
+    if verify:
+        job_args.append("--verify")
+    if not use_cache:
+        job_args.append("--no-cache")
+    if staging_dir is not None:
+        job_args.append(f"--staging-dir={staging_dir}")
+    if draws is not None:
+        job_args.append(f"--draws={draws}")
+    if by_year:
+        job_args.append("--by-year")
+
+    artifact_jobs = []
+    for location in locations:
+        if fan_out:
+            built_keys = get_built_keys(
+                output_dir / f"{sanitize_location(location)}.hdf", replace_keys
             )
-            session.deleteJobTemplate(job_template)
-
-        if verbose:
-            logger.info("Entering monitoring loop.")
-            logger.info("-------------------------")
-            logger.info("")
-
-            while any(
-                [
-                    job[1] not in [drmaa.JobState.DONE, drmaa.JobState.FAILED]
-                    for job in jobs.values()
-                ]
-            ):
-                for location, (job_id, status) in jobs.items():
-                    jobs[location] = (job_id, session.jobStatus(job_id))
-                    logger.info(
-                        f"{location:<35}: {decode_status(drmaa, jobs[location][1]):>15}"
+            for key_group in data_keys.MAKE_ARTIFACT_KEY_GROUPS:
+                path = get_shard_path(output_dir, location, key_group.name)
+                path.parent.mkdir(exist_ok=True)
+                resources = cluster_resources.estimate_resources(path, workers, [key_group])
+                skip_args = [f"--skip-key={key}" for key in key_group if key in built_keys]
+                artifact_jobs.append(
+                    ArtifactJob(
+                        path.stem,
+                        location,
+                        path,
+                        job_args + [f"--key-group={key_group.name}"] + skip_args,
+                        resources,
                     )
-                logger.info("")
-                time.sleep(metadata.MAKE_ARTIFACT_SLEEP)
-                logger.info("Checking status again")
-                logger.info("---------------------")
-                logger.info("")
+                )
+        else:
+            path = output_dir / f"{sanitize_location(location)}.hdf"
+            resources = cluster_resources.estimate_resources(path, workers)
+            artifact_jobs.append(ArtifactJob(path.stem, location, path, job_args, resources))
 
+    with drmaa.Session() as session:
+        jobs = {submit_artifact_job(session, job): job for job in artifact_jobs}
+        monitor = job_monitor.JobMonitor(
+            session, drmaa, lambda job: submit_artifact_job(session, job), verbose=verbose
+        )
+        failures = monitor.run(jobs)
+
+    failed_locations = sorted({failure.location for failure in failures})
+    if fan_out:
+        for location in locations:
+            if location in failed_locations:
+                logger.error(f"Not merging shards for {location} since a job failed.")
+            else:
+                merge_shards(output_dir, location)
+
+    if failures:
+        job_monitor.log_failure_summary(failures)
     logger.info("**Done**")
+    return failed_locations
+
+
+def get_built_keys(path: Path, replace_keys: tuple = ()) -> set[str]:
+    """Returns the keys of an artifact that a fanned out build doesn't rebuild.
+
+    Parameters
+    ----------
+    path
+        The path of the artifact.
+    replace_keys
+        The keys being replaced, which are rebuilt.
+
+    Returns
+    -------
+        The keys the manifest of the artifact records. If the manifest
+        isn't current, the keys are read from the artifact itself.
+
+    """
+    from {{cookiecutter.package_name}}.data.manifest import ArtifactManifest
+
+    manifest = ArtifactManifest(path)
+    if manifest.is_current():
+        keys = set(manifest.keys)
+    elif path.exists():
+        from vivarium.framework.artifact import Artifact
+
+        keys = set(Artifact(path).keys)
+    else:
+        keys = set()
+    return {key for key in keys if key not in replace_keys}
+
+
+def merge_shards(output_dir: Path, location: str) -> None:
+    """Merges the key group shards of a location into its artifact.
+
+    The shards are deleted once they are merged. Their logs and metrics
+    reports are kept.
+
+    Parameters
+    ----------
+    output_dir
+        The directory where the artifacts are built.
+    location
+        The location to merge the artifact shards for.
+    """
+    # Local import to avoid data dependencies
+    from {{cookiecutter.package_name}}.constants import data_keys
+    from {{cookiecutter.package_name}}.data import builder
+    from {{cookiecutter.package_name}}.data.manifest import ArtifactManifest
+    from {{cookiecutter.package_name}}.utilities import sanitize_location
+
+    path = output_dir / f"{sanitize_location(location)}.hdf"
+    shard_paths = [
+        get_shard_path(output_dir, location, key_group.name)
+        for key_group in data_keys.MAKE_ARTIFACT_KEY_GROUPS
+    ]
+    logger.info(f"Merging {len(shard_paths)} shards into the artifact at {str(path)}.")
+    artifact = builder.open_artifact(path, location)
+    builder.merge_artifacts(artifact, shard_paths)
+
+    manifest = ArtifactManifest(path)
+    for shard_path in shard_paths:
+        shard_manifest = ArtifactManifest(shard_path)
+        manifest.keys.update(shard_manifest.keys)
+        shard_manifest.delete()
+        shard_path.unlink()
+    manifest.save(location)
+
+
+def submit_artifact_job(session, job: ArtifactJob) -> str:
+    """Submits a cluster job that builds an artifact or artifact shard.
+
+    Parameters
+    ----------
+    session
+        The active :class:`drmaa.Session`.
+    job
+        The artifact to build and the resources to request for the job.
+
+    Returns
+    -------
+        The id of the submitted job.
+    """
+    job_template = session.createJobTemplate()
+    job_template.remoteCommand = shutil.which("python")
+    job_template.args = [__file__, str(job.path), f'"{job.location}"'] + job.args
+    job_template.jobEnvironment = {
+        "LC_ALL": "en_US.UTF-8",
+        "LANG": "en_US.UTF-8",
+    }
+    job_template.nativeSpecification = (
+        f"-A {metadata.CLUSTER_PROJECT} "
+        f"-p {metadata.CLUSTER_QUEUE} "
+        f"--mem={job.resources.memory*1024} "
+        f"-c {job.resources.cpu} "
+        f"-t {job.resources.runtime} "
+        f"-C archive "  # Need J-drive access for data
+        f"-J {job.name}_artifact"  # Name of the job
+    )
+    job_id = session.runJob(job_template)
+    logger.info(
+        f"Submitted job {job_id} to build {job.name} with {job.resources.memory}GB of "
+        f"memory, {job.resources.cpu} cores and a runtime of {job.resources.runtime}."
+    )
+    session.deleteJobTemplate(job_template)
+    return job_id
 
 
 def build_single_location_artifact(
@@ -206,6 +656,14 @@ def build_single_location_artifact(
     years: str | None,
     replace_keys: tuple = (),
     log_to_file: bool = False,
+    workers: int = 1,
+    verify: bool = False,
+    use_cache: bool = True,
+    key_groups: list[str] | None = None,
+    staging_dir: str | Path | None = None,
+    draws: int | None = None,
+    by_year: bool = False,
+    skip_keys: tuple = (),
 ) -> None:
     """Builds an artifact for a single location.
     Parameters
@@ -223,40 +681,148 @@ def build_single_location_artifact(
         False or if there is no existing artifact at the output location
     log_to_file
         Whether we should write the application logs to a file.
+    workers
+        The number of threads used to load data for independent keys
+        concurrently. Keys are loaded in the order given by the declared
+        key dependencies, and writes to the artifact are always serialized
+        on the calling thread.
+    verify
+        Whether to check the shape of each key after it is written instead
+        of reading the key back from the artifact.
+    use_cache
+        Whether to reuse locally cached extracts. Keys in ``replace_keys``
+        are always pulled fresh and their cached extracts are refreshed.
+    key_groups
+        The names of the key groups to build. Builds every key group in
+        ``data_keys.MAKE_ARTIFACT_KEY_GROUPS`` if not given.
+    staging_dir
+        The directory holding modelable entity draws staged for all
+        locations (see :mod:`{{cookiecutter.package_name}}.data.staging`).
+    draws
+        If given, keep only the first ``draws`` draws of every key (see
+        :mod:`{{cookiecutter.package_name}}.data.preview`).
+    by_year
+        Whether to load and write keys indexed by year one GBD estimation
+        year at a time. Keys the manifest recorded by year only load and
+        append the years they are missing. Requires ``years`` to be
+        "estimation".
+    skip_keys
+        Keys not to build even if they are missing, such as the keys a
+        shard's artifact already has.
     Note
     ----
         This function should not be called directly.  It is intended to be
         called by the :func:`build_artifacts` function located in the same
         module.
+
+        Every write is recorded in a journal next to the artifact. If the
+        artifact is being built again after an interrupted build, keys that
+        were only partially written are rolled back and rebuilt, and all
+        completed keys are kept.
+
+        Each written key is recorded in the manifest of the output directory
+        (see :mod:`{{cookiecutter.package_name}}.data.manifest`). If the
+        manifest shows the artifact already has every key, the artifact is
+        not opened at all.
     """
     location = location.strip('"')
     path = Path(path)
     if log_to_file:
-        log_file = path.parent / "logs" / f"{sanitize_location(location)}.log"
+        log_file = path.parent / "logs" / f"{path.stem}.log"
         if log_file.exists():
             log_file.unlink()
         add_logging_sink(log_file, verbose=2)
 
     # Local import to avoid data dependencies
-    from {{cookiecutter.package_name}}.data import builder
+    from {{cookiecutter.package_name}}.data import builder, cache, preview, staging
+    from {{cookiecutter.package_name}}.data.journal import BuildJournal
+    from {{cookiecutter.package_name}}.data.manifest import ArtifactManifest
+    from {{cookiecutter.package_name}}.tools import scheduler
+
+    if use_cache:
+        cache.enable_cache(refresh_keys=replace_keys)
+    else:
+        cache.disable_cache()
+    if staging_dir is not None:
+        staging.enable_staging(staging_dir)
+    else:
+        staging.disable_staging()
+    if draws is not None:
+        preview.enable_preview(draws)
+    else:
+        preview.disable_preview()
+
+    if is_up_to_date(path, replace_keys, key_groups, by_year):
+        logger.info(f"Artifact for {location} is up to date. Skipping...")
+        return
 
     logger.info(f"Building artifact for {location} at {str(path)}.")
     artifact = builder.open_artifact(path, location)
 
-    for key_group in data_keys.MAKE_ARTIFACT_KEY_GROUPS:
-        logger.info(f"Loading and writing {key_group.log_name} data")
-        for key in key_group:
-            logger.info(f"   - Loading and writing {key} data")
-            builder.load_and_write_data(artifact, key, location, years, key in replace_keys)
+    manifest = ArtifactManifest(path)
+    journal = BuildJournal(path)
+    incomplete = journal.get_incomplete()
+    if incomplete:
+        logger.info(
+            f"Resuming interrupted build with {len(journal.get_complete())} keys complete. "
+            f"Rolling back partially written keys {incomplete}."
+        )
+        builder.rollback_keys(artifact, incomplete)
+        for key in incomplete:
+            manifest.remove(key)
+
+    metrics = build_metrics.BuildMetrics(location)
+    scheduler.build_keys(
+        artifact,
+        location,
+        years,
+        replace_keys,
+        workers,
+        verify,
+        metrics,
+        key_groups,
+        journal,
+        manifest,
+        by_year,
+        skip_keys,
+    )
+    journal.finish()
+    metrics.log_summary()
+    metrics.write_report(build_metrics.get_report_path(path))
 
     logger.info(f"**Done building -- {location}**")
 
 
+def parse_job_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build an artifact for a single location.")
+    parser.add_argument("path")
+    parser.add_argument("location")
+    parser.add_argument("years")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--verify", action="store_true")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false")
+    parser.add_argument("--key-group", dest="key_groups", action="append")
+    parser.add_argument("--staging-dir")
+    parser.add_argument("--draws", type=int)
+    parser.add_argument("--by-year", action="store_true")
+    parser.add_argument("--skip-key", dest="skip_keys", action="append", default=[])
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    artifact_path = sys.argv[1]
-    artifact_location = sys.argv[2]
-    artifact_years = None if sys.argv[3] == "None" else sys.argv[3]
+    args = parse_job_arguments()
 
     build_single_location_artifact(
-        path=artifact_path, location=artifact_location, years=artifact_years, log_to_file=True
+        path=args.path,
+        location=args.location,
+        years=None if args.years == "None" else args.years,
+        log_to_file=True,
+        workers=args.workers,
+        verify=args.verify,
+        use_cache=args.use_cache,
+        key_groups=args.key_groups,
+        staging_dir=args.staging_dir,
+        draws=args.draws,
+        by_year=args.by_year,
+        skip_keys=tuple(args.skip_keys),
     )
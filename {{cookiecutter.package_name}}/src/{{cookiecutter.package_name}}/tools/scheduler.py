@@ -0,0 +1,434 @@
+"""Dependency-aware scheduling of the keys in an artifact build.
+
+Keys are loaded in topological order of :data:`data_keys.KEY_DEPENDENCIES`.
+Every key whose inputs are available is loaded in a thread pool, so
+independent branches of the graph load in parallel. Inputs shared by
+several keys are loaded once and held in memory until the last key that
+depends on them is loaded. Keys that read an input for other years than it
+was loaded for load it again themselves. All writes to the artifact happen on the
+calling thread.
+
+Loaders may return an iterator of chunks instead of a whole table for
+keys too large to hold in memory. Chunks are produced as they are
+written, so for these keys the time spent loading is counted as write
+time. Chunks can only be read once, so no other key may depend on a
+chunked key.
+
+Keys being replaced are only rewritten if their freshly loaded data
+differs from what is stored, as judged by the content hash the manifest
+recorded for them.
+
+Year-partitioned builds split ``years="all"`` into the GBD estimation years.
+Keys indexed by year are loaded and appended to the artifact one year at a
+time, and keys already in the artifact only load and append the years the
+manifest doesn't record for them. Keys that other keys depend on, or that
+depend on other keys, are loaded for all of their years at once, since
+inputs are shared between keys whole.
+
+.. admonition::
+
+   Logging in this module should typically be done at the ``info`` level.
+   Use your best judgement.
+
+"""
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from graphlib import TopologicalSorter
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from {{cookiecutter.package_name}}.tools.build_metrics import (
+    BuildMetrics,
+    KeyMetrics,
+    get_key_size,
+    get_peak_rss,
+    get_shape,
+)
+
+if TYPE_CHECKING:
+    from vivarium.framework.artifact import Artifact
+
+    from {{cookiecutter.package_name}}.data.journal import BuildJournal
+    from {{cookiecutter.package_name}}.data.manifest import ArtifactManifest
+
+
+def get_build_graph(keys: list[str]) -> dict[str, list[str]]:
+    """Returns the dependency graph needed to build a set of keys.
+
+    Parameters
+    ----------
+    keys
+        The keys to build.
+
+    Returns
+    -------
+        A mapping from every key that must be loaded, including inputs
+        that are not themselves in ``keys``, to the keys it depends on.
+
+    """
+    from {{cookiecutter.package_name}}.constants import data_keys
+
+    graph = {}
+    to_visit = list(keys)
+    while to_visit:
+        key = to_visit.pop()
+        if key not in graph:
+            graph[key] = list(data_keys.KEY_DEPENDENCIES.get(key, []))
+            to_visit.extend(graph[key])
+    return graph
+
+
+def get_key_groups(key_groups: list[str] | None = None) -> list:
+    """Returns the key groups to build, in build order.
+
+    Parameters
+    ----------
+    key_groups
+        The names of the key groups to build. All key groups in
+        ``data_keys.MAKE_ARTIFACT_KEY_GROUPS`` are returned if not given.
+
+    Raises
+    ------
+    ValueError
+        If any of the names is not the name of a key group.
+
+    """
+    from {{cookiecutter.package_name}}.constants import data_keys
+
+    all_groups = data_keys.MAKE_ARTIFACT_KEY_GROUPS
+    if key_groups is None:
+        return all_groups
+    unknown = set(key_groups) - {key_group.name for key_group in all_groups}
+    if unknown:
+        raise ValueError(f"Unknown key groups {sorted(unknown)}.")
+    return [key_group for key_group in all_groups if key_group.name in key_groups]
+
+
+def get_keys_to_write(
+    artifact: "Artifact",
+    replace_keys: tuple,
+    key_groups: list[str] | None = None,
+    manifest: "ArtifactManifest | None" = None,
+    years: list[int] | None = None,
+    skip_keys: tuple = (),
+) -> list[str]:
+    """Returns the artifact keys which are missing or should be replaced.
+
+    Parameters
+    ----------
+    artifact
+        The artifact being built.
+    replace_keys
+        A list of keys to replace in the artifact.
+    key_groups
+        The names of the key groups to consider. Defaults to all of them.
+    manifest
+        The manifest of the artifact, which must be current.
+    years
+        The years of a year-partitioned build. Keys the manifest recorded
+        by year that are missing any of them are returned as well.
+    skip_keys
+        Keys to leave out even if they are missing, such as the keys
+        already built in the artifact a shard is merged into.
+
+    Returns
+    -------
+        The keys to load and write, in key group order.
+
+    """
+    from {{cookiecutter.package_name}}.data import builder
+
+    keys = []
+    for key_group in get_key_groups(key_groups):
+        for key in key_group:
+            if key in skip_keys:
+                logger.info(f"   - Data for {key} already built. Skipping...")
+                continue
+            if builder.needs_data(artifact, key, key in replace_keys):
+                keys.append(key)
+                continue
+            missing_years = (
+                builder.get_missing_years(manifest, key, years)
+                if manifest is not None and years is not None
+                else []
+            )
+            if missing_years:
+                logger.info(f"   - Extending {key} with years {missing_years}.")
+                keys.append(key)
+            else:
+                logger.info(f"   - Data for {key} already in artifact. Skipping...")
+    return keys
+
+
+def get_years_to_load(
+    graph: dict[str, list[str]],
+    keys_to_write: set[str],
+    years: list[int],
+    manifest: "ArtifactManifest | None" = None,
+    extended: set[str] = frozenset(),
+) -> dict[str, list[int]]:
+    """Returns the years each key of a year-partitioned build has to load.
+
+    Parameters
+    ----------
+    graph
+        The dependency graph of the build (see :func:`get_build_graph`).
+    keys_to_write
+        The artifact keys the build writes.
+    years
+        The years of the build.
+    manifest
+        The manifest of the artifact, which must be given if any keys are
+        extended.
+    extended
+        The keys in ``keys_to_write`` that are already in the artifact and
+        only need the years the manifest doesn't record for them.
+
+    Returns
+    -------
+        The years to load for every key in ``graph``. Keys that are only
+        loaded as inputs to other keys load every year their dependents
+        load.
+
+    """
+    from {{cookiecutter.package_name}}.data import builder
+
+    dependents = defaultdict(list)
+    for key, dependencies in graph.items():
+        for dependency in dependencies:
+            dependents[dependency].append(key)
+
+    years_to_load = {}
+    # Dependents come before their inputs in reverse topological order
+    for key in reversed(list(TopologicalSorter(graph).static_order())):
+        if key in extended:
+            years_to_load[key] = builder.get_missing_years(manifest, key, years)
+        elif key in keys_to_write:
+            years_to_load[key] = list(years)
+        else:
+            years_to_load[key] = sorted(
+                {year for dependent in dependents[key] for year in years_to_load[dependent]}
+            )
+    return years_to_load
+
+
+def build_keys(
+    artifact: "Artifact",
+    location: str,
+    years: str | None,
+    replace_keys: tuple,
+    workers: int = 1,
+    verify: bool = False,
+    metrics: BuildMetrics | None = None,
+    key_groups: list[str] | None = None,
+    journal: "BuildJournal | None" = None,
+    manifest: "ArtifactManifest | None" = None,
+    by_year: bool = False,
+    skip_keys: tuple = (),
+) -> None:
+    """Loads and writes every missing key of an artifact in dependency order.
+
+    Parameters
+    ----------
+    artifact
+        The artifact to write to.
+    location
+        The location to build the artifact for.
+    years
+        Years for which to make an artifact. Can be a single year or 'all'.
+        If not specified, make for most recent year.
+    replace_keys
+        A list of keys to replace in the artifact.
+    workers
+        The maximum number of keys to load at the same time. With a single
+        worker each key is loaded and written before the next one starts,
+        so any rise in the peak RSS recorded after a key is due to that key.
+    verify
+        Whether to check the shape of each key after it is written.
+    metrics
+        Collector for the per-key load and write metrics. If not given,
+        the metrics are only logged.
+    key_groups
+        The names of the key groups to build. Defaults to all of them.
+    journal
+        The journal to record the start and completion of each write in.
+        Keys the journal records as started but not completed are assumed
+        to have been rolled back and are always verified after they are
+        rewritten.
+    manifest
+        The manifest to record each written key in. It is saved after
+        every write. If it is current, keys being replaced whose data
+        has the same hash as the one it recorded are not rewritten.
+    by_year
+        Whether to build by year, loading the GBD estimation years one at a
+        time. Keys indexed by year are loaded and written one year at a
+        time, and keys the manifest recorded by year only get the years
+        they are missing appended. Requires ``years`` to be "estimation".
+    skip_keys
+        Keys not to build even if they are missing from the artifact.
+
+    Raises
+    ------
+    graphlib.CycleError
+        If the declared key dependencies contain a cycle.
+    ValueError
+        If a key that other keys depend on is loaded in chunks or if
+        building by year for years other than "estimation".
+
+    """
+    from {{cookiecutter.package_name}}.data import builder, cache
+
+    if by_year and years != "estimation":
+        raise ValueError(
+            "Building by year only loads the GBD estimation years, so requires years "
+            f'"estimation". You specified {years}.'
+        )
+
+    # Recorded hashes and years can only be trusted if nothing else changed
+    # the artifact
+    trusted_manifest = manifest if manifest is not None and manifest.is_current() else None
+    build_years = builder.get_build_years() if by_year else None
+    keys_to_write = set(
+        get_keys_to_write(
+            artifact, replace_keys, key_groups, trusted_manifest, build_years, skip_keys
+        )
+    )
+    rolled_back = set(journal.get_incomplete()) if journal is not None else set()
+    graph = get_build_graph(list(keys_to_write))
+    sorter = TopologicalSorter(graph)
+    sorter.prepare()
+
+    if by_year:
+        extended = {
+            key for key in keys_to_write if key in artifact and key not in replace_keys
+        }
+        years_to_load = get_years_to_load(
+            graph, keys_to_write, build_years, trusted_manifest, extended
+        )
+    else:
+        extended = set()
+
+    consumer_counts = Counter(dep for deps in graph.values() for dep in deps)
+    shared_inputs = cache.SharedInputs(consumer_counts)
+    cache.set_shared_inputs(shared_inputs)
+
+    metrics = metrics if metrics is not None else BuildMetrics(location)
+    artifact_path = Path(artifact.path)
+    # With a single worker, keys are loaded and written strictly one at a time
+    # so a rise in the peak RSS can be attributed to a single key
+    one_at_a_time = workers == 1
+    logger.info(f"Loading {len(graph)} keys with {workers} workers")
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending, ready = {}, []
+            try:
+                while sorter.is_active():
+                    ready.extend(sorter.get_ready())
+                    while ready and not (one_at_a_time and pending):
+                        key = ready.pop(0)
+                        if by_year:
+                            # Shared inputs can't be split by year
+                            stream = not graph[key] and not consumer_counts[key]
+                            load = (
+                                builder.load_data_by_year,
+                                key,
+                                location,
+                                years_to_load[key],
+                                stream,
+                            )
+                        else:
+                            load = (builder.load_data, key, location, years)
+                        pending[executor.submit(_timed_load, *load)] = key
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key = pending.pop(future)
+                        data, load_time = future.result()
+                        if builder.is_chunked(data) and consumer_counts[key]:
+                            raise ValueError(
+                                f"{key} was loaded in chunks, but other keys depend on it."
+                            )
+                        input_years = (
+                            years_to_load[key] if by_year else builder.parse_years(years)
+                        )
+                        shared_inputs.put(key, location, input_years, data)
+                        for dependency in graph[key]:
+                            shared_inputs.release(dependency)
+
+                        write_time, bytes_on_disk = 0.0, 0
+                        shape = get_shape(data)
+                        written_years = None
+                        if by_year and builder.has_years(data):
+                            written_years = years_to_load[key]
+                        # Appended years are new, so they are never unchanged
+                        if (
+                            key in keys_to_write
+                            and key not in extended
+                            and builder.is_unchanged(artifact, trusted_manifest, key, data)
+                        ):
+                            logger.info(f"   - Data for {key} is unchanged. Skipping...")
+                            manifest.refresh(key)
+                            manifest.save(location)
+                        elif key in keys_to_write:
+                            start = time.time()
+                            if journal is not None:
+                                journal.start(key)
+                            if by_year:
+                                chunked = builder.write_by_year(
+                                    artifact,
+                                    key,
+                                    data,
+                                    key in extended,
+                                    verify or key in rolled_back,
+                                )
+                            else:
+                                chunked = builder.write_or_replace_data(
+                                    artifact, key, data, verify or key in rolled_back
+                                )
+                            if journal is not None:
+                                journal.complete(key)
+                            write_time = time.time() - start
+                            if chunked is not None:
+                                shape = chunked.shape
+                            if manifest is not None:
+                                if chunked is not None and key in extended:
+                                    manifest.extend(key, shape, chunked.hash, written_years)
+                                elif chunked is not None:
+                                    manifest.record(
+                                        key,
+                                        shape=shape,
+                                        content_hash=chunked.hash,
+                                        years=written_years,
+                                        profile=builder.get_write_profile(key),
+                                    )
+                                else:
+                                    manifest.record(
+                                        key, data, profile=builder.get_write_profile(key)
+                                    )
+                                manifest.save(location)
+                            bytes_on_disk = get_key_size(artifact_path, key)
+                        metrics.record(
+                            KeyMetrics(
+                                str(key),
+                                load_time,
+                                write_time,
+                                *shape,
+                                bytes_on_disk,
+                                get_peak_rss(),
+                            )
+                        )
+                        sorter.done(key)
+            except Exception:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+    finally:
+        cache.set_shared_inputs(None)
+
+
+def _timed_load(load: Callable, *args) -> tuple[object, float]:
+    start = time.time()
+    data = load(*args)
+    return data, time.time() - start
@@ -0,0 +1,112 @@
+"""Comparison of write profiles on the data in an existing artifact.
+
+Each key is loaded from the artifact once and then written to a scratch
+HDF file with every profile, recording how long the write takes, how long
+reading the key back takes and how much space it takes on disk.
+
+.. admonition::
+
+   Logging in this module should typically be done at the ``info`` level.
+   Use your best judgement.
+
+"""
+import tempfile
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import pandas as pd
+from loguru import logger
+
+from {{cookiecutter.package_name}}.constants import metadata
+
+
+class ProfileResult(NamedTuple):
+    key: str
+    profile: str
+    write_time: float  # seconds
+    read_time: float  # seconds
+    size: int  # bytes
+
+
+def benchmark_write_profiles(
+    artifact_path: str | Path,
+    keys: list[str] | None = None,
+    profiles: dict[str, metadata.WriteProfile] | None = None,
+) -> list[ProfileResult]:
+    """Writes and reads back keys of an artifact with several write profiles.
+
+    Parameters
+    ----------
+    artifact_path
+        The artifact to take the data from.
+    keys
+        The keys to benchmark. Defaults to every table in the artifact.
+    profiles
+        The write profiles to compare, by name. Defaults to
+        ``metadata.WRITE_PROFILES``.
+
+    Returns
+    -------
+        The timings and size of every key written with every profile.
+
+    """
+    from vivarium.framework.artifact import Artifact, EntityKey, hdf
+
+    from {{cookiecutter.package_name}}.data.builder import write_hdf
+
+    artifact = Artifact(artifact_path)
+    profiles = metadata.WRITE_PROFILES if profiles is None else profiles
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Keys in the draw store of the artifact aren't stored in the file
+        stored_keys = set(hdf.get_keys(artifact.path))
+        for key in [k for k in artifact.keys if k in stored_keys] if keys is None else keys:
+            data = artifact.load(key)
+            if not isinstance(data, (pd.DataFrame, pd.Series)):
+                continue
+            artifact.clear_cache()
+            logger.info(f"Benchmarking {len(profiles)} write profiles for {key}.")
+            for name, profile in profiles.items():
+                path = Path(tmp_dir) / f"{name}.hdf"
+                start = time.time()
+                write_hdf(path, key, data, profile)
+                write_time = time.time() - start
+
+                start = time.time()
+                pd.read_hdf(path, EntityKey(key).path)
+                read_time = time.time() - start
+
+                results.append(
+                    ProfileResult(key, name, write_time, read_time, path.stat().st_size)
+                )
+                path.unlink()
+    return results
+
+
+def format_results(results: list[ProfileResult]) -> list[str]:
+    """Formats benchmark results as table rows, with per-profile totals."""
+    key_width = max([len(r.key) for r in results] + [len("total")])
+    profile_width = max([len(r.profile) for r in results] + [len("profile")])
+    rows = [
+        f"{'key':<{key_width}} | {'profile':<{profile_width}} | {'write (s)':>9} | "
+        f"{'read (s)':>9} | {'size (MB)':>9}"
+    ]
+    totals = {}
+    for r in results:
+        rows.append(
+            f"{r.key:<{key_width}} | {r.profile:<{profile_width}} | {r.write_time:>9.2f} | "
+            f"{r.read_time:>9.2f} | {r.size / 1024**2:>9.1f}"
+        )
+        write_time, read_time, size = totals.get(r.profile, (0.0, 0.0, 0))
+        totals[r.profile] = (
+            write_time + r.write_time,
+            read_time + r.read_time,
+            size + r.size,
+        )
+    for profile, (write_time, read_time, size) in totals.items():
+        rows.append(
+            f"{'total':<{key_width}} | {profile:<{profile_width}} | {write_time:>9.2f} | "
+            f"{read_time:>9.2f} | {size / 1024**2:>9.1f}"
+        )
+    return rows
@@ -1,14 +1,19 @@
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
 import numpy as np
 import pandas as pd
 from loguru import logger
-from scipy import stats
-from vivarium.framework.randomness import get_hash
-from vivarium_public_health.risks.data_transformations import pivot_categorical
 
 from {{cookiecutter.package_name}}.constants import metadata
+from {{cookiecutter.package_name}}.data import draw_store
+
+# scipy, vivarium and vivarium_public_health are slow to import, so they are
+# imported by the functions that use them. This keeps the command line tools,
+# which only need the file name helpers here, fast to start.
+if TYPE_CHECKING:
+    from scipy import stats
 
 
 def len_longest_location() -> int:
@@ -70,13 +75,10 @@ def read_data_by_draw(artifact_path: str, key : str, draw: int) -> pd.DataFrame:
         The data to retrieve.
 
     """
-    key = key.replace(".", "/")
-    with pd.HDFStore(artifact_path, mode='r') as store:
-        index = store.get(f'{key}/index')
-        draw = store.get(f'{key}/draw_{draw}')
-    draw = draw.rename("value")
-    data = pd.concat([index, draw], axis=1)
-    data = data.drop(columns='location')
+    from vivarium_public_health.risks.data_transformations import pivot_categorical
+
+    data = _read_draw(artifact_path, key, draw)
+    data = data.drop(columns='location', errors='ignore')
     data = pivot_categorical(data)
     data[
         project_globals.LBWSG_MISSING_CATEGORY.CAT
@@ -84,11 +86,59 @@ def read_data_by_draw(artifact_path: str, key : str, draw: int) -> pd.DataFrame:
     return data
 
 
+def _read_draw(artifact_path: str, key: str, draw: int) -> pd.DataFrame:
+    """Reads a single draw of a key written by draw, in long format.
+
+    Draws in the draw store are read as a view of the memory-mapped draw
+    file, but putting the draw in long format copies it once.
+
+    """
+    root = draw_store.get_draw_store_root(artifact_path)
+    if draw_store.has_key(root, key):
+        data = draw_store.read_draws(root, key, draw)
+        return data.rename(columns={f"draw_{draw}": "value"}).reset_index()
+
+    # Artifacts built before the draw store hold each draw in its own node
+    # of the artifact file
+    key = key.replace(".", "/")
+    with pd.HDFStore(artifact_path, mode='r') as store:
+        index = store.get(f'{key}/index')
+        draw = store.get(f'{key}/draw_{draw}')
+    draw = draw.rename("value")
+    return pd.concat([index, draw], axis=1)
+
+
+def read_compact_data(artifact_path: str, key: str) -> pd.DataFrame:
+    """Reads a key from an artifact, restoring the dtypes of compact tables.
+
+    Keys written with a write profile that uses compact dtypes come back with
+    float64 values and their original demographic index. Other keys are
+    returned as stored.
+
+    Parameters
+    ----------
+    artifact_path
+        The artifact to read from.
+    key
+        The entity key associated with the data to read.
+
+    """
+    from vivarium.framework.artifact import Artifact
+
+    from {{cookiecutter.package_name}}.data import compact
+
+    data = Artifact(artifact_path).load(key)
+    spec = compact.read_spec(artifact_path, key) if isinstance(data, pd.DataFrame) else None
+    return data if spec is None else compact.restore_dtypes(data, spec)
+
+
 def get_norm(
         mean: float,
         sd: float = None,
         ninety_five_pct_confidence_interval: tuple[float, float] = None
-) -> stats.norm:
+) -> "stats.norm":
+    from scipy import stats
+
     sd = _get_standard_deviation(mean, sd, ninety_five_pct_confidence_interval)
     return stats.norm(loc=mean, scale=sd)
 
@@ -99,7 +149,9 @@ def get_truncnorm(
         ninety_five_pct_confidence_interval: tuple[float, float] = None,
         lower_clip: float = 0.0,
         upper_clip: float = 1.0
-) -> stats.norm:
+) -> "stats.norm":
+    from scipy import stats
+
     sd = _get_standard_deviation(mean, sd, ninety_five_pct_confidence_interval)
     a = (lower_clip - mean) / sd if sd else mean - 1e-03
     b = (upper_clip - mean) / sd if sd else mean + 1e03
@@ -109,6 +161,8 @@ def get_truncnorm(
 def _get_standard_deviation(
         mean: float, sd: float, ninety_five_pct_confidence_interval: tuple[float, float]
 ) -> float:
+    from scipy import stats
+
     if sd is None and ninety_five_pct_confidence_interval is None:
         raise ValueError(
             "Must provide either a standard deviation or a 95% confidence interval."
@@ -133,11 +187,13 @@ def _get_standard_deviation(
 
 def get_lognorm_from_quantiles(
         median: float, lower: float, upper: float, quantiles: tuple[float, float] = (0.025, 0.975)
-    ) -> stats.lognorm:
+    ) -> "stats.lognorm":
     """Returns a frozen lognormal distribution with the specified median, such that
     (lower, upper) are approximately equal to the quantiles with ranks
     (quantile_ranks[0], quantile_ranks[1]).
     """
+    from scipy import stats
+
     # Let Y ~ norm(mu, sigma^2) and X = exp(Y), where mu = log(median)
     # so X ~ lognorm(s=sigma, scale=exp(mu)) in scipy's notation.
     # We will determine sigma from the two specified quantiles lower and upper.
@@ -164,7 +220,7 @@ def get_lognorm_from_quantiles(
 
 
 def get_random_variable_draws(
-        columns: pd.Index, seed: str, distribution: stats.rv_continuous
+        columns: pd.Index, seed: str, distribution: "stats.rv_continuous"
     ) -> pd.Series:
     return pd.Series(
         [get_random_variable(x, seed, distribution) for x in range(0, columns.size)],
@@ -172,6 +228,52 @@ def get_random_variable_draws(
     )
 
 
-def get_random_variable(draw: int, seed: str, distribution: stats.rv_continuous) -> float:
+def get_random_variable(draw: int, seed: str, distribution: "stats.rv_continuous") -> float:
+    from vivarium.framework.randomness import get_hash
+
     np.random.seed(get_hash(f"{seed}_draw_{draw}"))
     return distribution.rvs()
+
+
+def get_random_variable_draws_for_parameters(
+        columns: pd.Index, distributions: "dict[str, stats.rv_continuous]"
+    ) -> pd.DataFrame:
+    """Samples draws for many uncertain parameters at once.
+
+    The draws of each parameter come from a counter-based generator keyed on
+    the parameter's seed, where draw ``i`` is generated from counter ``i``.
+    Draw ``i`` of a parameter is therefore the same no matter how many draws
+    or which other parameters are sampled alongside it. Sampling is done by
+    inverse transform, so each distribution is evaluated in a single
+    vectorized ``ppf`` call. The global NumPy random state is never touched.
+
+    Parameters
+    ----------
+    columns
+        The draw columns to sample, e.g. :data:`metadata.ARTIFACT_COLUMNS`.
+    distributions
+        A mapping from the seed of each parameter to its frozen distribution.
+
+    Returns
+    -------
+        A frame indexed by ``columns`` with one column of draws per seed.
+
+    """
+    return pd.DataFrame(
+        {
+            seed: distribution.ppf(_get_uniform_draws(seed, columns.size))
+            for seed, distribution in distributions.items()
+        },
+        index=columns,
+    )
+
+
+def _get_uniform_draws(seed: str, draw_count: int) -> np.ndarray:
+    from vivarium.framework.randomness import get_hash
+
+    # Philox is counter-based: its i-th output depends only on the key and
+    # i, so draw i comes out the same however many draws are generated.
+    states = np.random.Philox(key=get_hash(seed)).random_raw(draw_count)
+    # Use the top 53 bits, offset by half a step, for a uniform on the open
+    # interval (0, 1) so ppf never returns an infinite value.
+    return ((states >> np.uint64(11)).astype(np.float64) + 0.5) / 2.0**53
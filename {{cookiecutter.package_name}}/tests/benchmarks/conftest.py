@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from {{cookiecutter.package_name}}.constants import metadata
+
+SEXES = ["Female", "Male"]
+# fmt: off
+AGE_BINS = [
+    0.0, 0.01917808, 0.07671233, 0.5, 1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 25.0, 30.0,
+    35.0, 40.0, 45.0, 50.0, 55.0, 60.0, 65.0, 70.0, 75.0, 80.0, 85.0, 90.0, 95.0, 125.0,
+]
+# fmt: on
+ESTIMATION_YEARS = list(range(1990, 2024))
+
+
+def get_years(years: int | str | list[int] | None) -> list[int]:
+    if years is None:
+        return ESTIMATION_YEARS[-1:]
+    if years == "all":
+        return ESTIMATION_YEARS
+    return [years] if isinstance(years, int) else list(years)
+
+
+def get_demographic_index(
+    years: int | str | list[int] | None, categories=None
+) -> pd.MultiIndex:
+    index = pd.DataFrame(
+        [
+            (sex, age_start, age_end, year, year + 1)
+            for sex in SEXES
+            for age_start, age_end in zip(AGE_BINS[:-1], AGE_BINS[1:])
+            for year in get_years(years)
+        ],
+        columns=metadata.ARTIFACT_INDEX_COLUMNS,
+    )
+    if categories is not None:
+        index = index.merge(pd.Series(categories, name="parameter"), how="cross")
+    return pd.MultiIndex.from_frame(index)
+
+
+class FakeInterface:
+    """Stand-in for :mod:`vivarium_inputs.interface`.
+
+    Returns random data shaped like GBD extracts: every sex, GBD age group
+    and requested year, with :data:`metadata.DRAW_COUNT` draws.
+
+    """
+
+    def __init__(self, seed: int = 0):
+        self._rng = np.random.default_rng(seed)
+
+    def get_draws(self, index: pd.Index) -> pd.DataFrame:
+        return pd.DataFrame(
+            self._rng.random((len(index), metadata.DRAW_COUNT)),
+            index=index,
+            columns=metadata.ARTIFACT_COLUMNS,
+        )
+
+    def get_age_bins(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "age_group_id": range(len(AGE_BINS) - 1),
+                "age_start": AGE_BINS[:-1],
+                "age_end": AGE_BINS[1:],
+            }
+        )
+
+    def get_demographic_dimensions(self, location: str, years=None) -> pd.DataFrame:
+        return pd.DataFrame(index=get_demographic_index(years))
+
+    def get_population_structure(self, location: str, years=None) -> pd.DataFrame:
+        index = get_demographic_index(years)
+        return pd.DataFrame({"value": self._rng.random(len(index)) * 1e6}, index=index)
+
+    def get_theoretical_minimum_risk_life_expectancy(self) -> pd.DataFrame:
+        ages = np.arange(0.0, 110.0, 0.01)
+        return pd.DataFrame(
+            {"value": 90.0 - ages * 0.8},
+            index=pd.MultiIndex.from_arrays(
+                [ages, ages + 0.01], names=["age_start", "age_end"]
+            ),
+        )
+
+    def load_standard_data(self, key: str, location: str, years=None) -> pd.DataFrame:
+        return self.get_draws(get_demographic_index(years))
+
+
+@pytest.fixture
+def fake_interface(monkeypatch) -> FakeInterface:
+    """Replaces the data sources behind ``loader.get_data`` with fakes."""
+    from {{cookiecutter.package_name}}.data import cache, loader
+
+    interface = FakeInterface()
+    monkeypatch.setattr(loader, "interface", interface)
+    cache.disable_cache()
+    return interface
+
+
+@pytest.fixture
+def categorical_draws(fake_interface) -> pd.DataFrame:
+    """A large categorical exposure table, like LBWSG, for a single year."""
+    categories = [f"cat{i}" for i in range(1, 59)]
+    return fake_interface.get_draws(get_demographic_index(2023, categories))
@@ -0,0 +1,112 @@
+"""Benchmarks for the artifact build pipeline.
+
+These run against a fake of ``vivarium_inputs.interface`` and record the
+peak memory allocated by the benchmarked call and the size on disk of what
+was written alongside the timings. Run them in the artifact environment with::
+
+    pytest tests/benchmarks --runslow --benchmark-autosave
+
+and compare runs across commits with ``pytest-benchmark compare``.
+
+"""
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("vivarium_inputs")
+
+from {{cookiecutter.package_name}}.constants import data_keys
+from {{cookiecutter.package_name}}.data import builder, draw_store
+from {{cookiecutter.package_name}}.tools import make_artifacts
+
+pytestmark = pytest.mark.slow
+
+LOCATION = "Fakeland"
+LBWSG_EXPOSURE = "risk_factor.low_birth_weight_and_short_gestation.exposure"
+
+
+def get_size_mb(*paths: Path) -> float:
+    size = 0
+    for path in paths:
+        if path.is_dir():
+            size += sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+        elif path.exists():
+            size += path.stat().st_size
+    return size / 1024**2
+
+
+def record_resources(benchmark, run: Callable[[], object], *paths: Path) -> None:
+    # Tracing slows the call down, so the peak memory comes from one more
+    # call after the timed rounds. tracemalloc reports the peak of that call
+    # alone, unlike the RSS high-water mark of the whole test process.
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["peak_memory_mb"] = peak / 1024**2
+    benchmark.extra_info["size_on_disk_mb"] = get_size_mb(*paths)
+
+
+def run_with_setup(function: Callable, setup: Callable[[], tuple]) -> None:
+    args, kwargs = setup()
+    function(*args, **kwargs)
+
+
+def test_build_single_location_artifact(benchmark, tmp_path, fake_interface):
+    path = tmp_path / "fakeland.hdf"
+
+    def setup():
+        path.unlink(missing_ok=True)
+        return (path, LOCATION, "all"), {"use_cache": False}
+
+    build = make_artifacts.build_single_location_artifact
+    benchmark.pedantic(build, setup=setup, rounds=3)
+    record_resources(benchmark, lambda: run_with_setup(build, setup), path)
+
+
+@pytest.mark.parametrize("key", list(data_keys.POPULATION))
+def test_load_and_write_data(benchmark, tmp_path, fake_interface, key):
+    path = tmp_path / "fakeland.hdf"
+
+    def setup():
+        path.unlink(missing_ok=True)
+        artifact = builder.open_artifact(path, LOCATION)
+        return (artifact, key, LOCATION, "all", False), {}
+
+    benchmark.pedantic(builder.load_and_write_data, setup=setup, rounds=3)
+    record_resources(
+        benchmark, lambda: run_with_setup(builder.load_and_write_data, setup), path
+    )
+
+
+def test_write_data_by_draw(benchmark, tmp_path, categorical_draws):
+    path = tmp_path / "fakeland.hdf"
+    artifact = builder.open_artifact(path, LOCATION)
+
+    args = (artifact, LBWSG_EXPOSURE, categorical_draws)
+    benchmark.pedantic(builder.write_data_by_draw, args=args, rounds=3)
+    record_resources(
+        benchmark,
+        lambda: builder.write_data_by_draw(*args),
+        path,
+        draw_store.get_draw_store_root(path),
+    )
+
+
+def test_read_single_draw(benchmark, tmp_path, categorical_draws):
+    path = tmp_path / "fakeland.hdf"
+    artifact = builder.open_artifact(path, LOCATION)
+    builder.write_data_by_draw(artifact, LBWSG_EXPOSURE, categorical_draws)
+    root = draw_store.get_draw_store_root(path)
+
+    data = benchmark(draw_store.read_draws, root, LBWSG_EXPOSURE, 0)
+
+    assert data.shape == (len(categorical_draws), 1)
+    record_resources(
+        benchmark, lambda: draw_store.read_draws(root, LBWSG_EXPOSURE, 0), path, root
+    )
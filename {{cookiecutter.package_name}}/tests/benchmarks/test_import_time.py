@@ -0,0 +1,51 @@
+"""Guards against slow imports creeping back into the command line tools.
+
+Every ``make_artifacts`` invocation, including ``--help`` and every cluster
+job, imports the CLI module, so it must not pull in the scientific stack.
+Imports are measured in a fresh interpreter, since this test process has
+usually imported everything already.
+
+"""
+import importlib.util
+import json
+import subprocess
+import sys
+
+import pytest
+
+CLI_MODULE = "{{cookiecutter.package_name}}.tools.cli"
+HEAVY_MODULES = [
+    "pandas",
+    "pyarrow",
+    "scipy",
+    "vivarium",
+    "vivarium_public_health",
+    "vivarium_inputs",
+]
+
+
+def get_imported_modules(module: str) -> list[str]:
+    code = f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def test_cli_does_not_import_heavy_dependencies():
+    imported = {module.split(".")[0] for module in get_imported_modules(CLI_MODULE)}
+    assert imported.isdisjoint(HEAVY_MODULES), imported.intersection(HEAVY_MODULES)
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(
+    importlib.util.find_spec("pytest_benchmark") is None,
+    reason="requires pytest-benchmark",
+)
+def test_cli_import_time(benchmark):
+    benchmark.pedantic(
+        subprocess.run,
+        args=([sys.executable, "-c", f"import {CLI_MODULE}"],),
+        kwargs={"check": True},
+        rounds=5,
+    )
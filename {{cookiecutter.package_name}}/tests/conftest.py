@@ -1,3 +1,8 @@
+from collections.abc import Sequence
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
 import pytest
 
 
@@ -17,3 +22,105 @@ def pytest_collection_modifyitems(config, items):
     for item in items:
         if "slow" in item.keywords:
             item.add_marker(skip_slow)
+
+
+@pytest.fixture
+def make_draws():
+    """Returns a factory of tables of random draws over a demographic index.
+
+    Tables are indexed by sex, age_start and year_start followed by any
+    extra levels given by name. Levels given as ``None`` are left out.
+
+    """
+
+    def make_draws(
+        columns: int | list[str] = 3,
+        seed: int = 0,
+        ages: Sequence[float] | None = (0.0, 5.0, 10.0),
+        years: Sequence[int] | None = (2021,),
+        **levels: list,
+    ) -> pd.DataFrame:
+        levels = {"sex": ["Female", "Male"], "age_start": ages, "year_start": years, **levels}
+        levels = {name: list(values) for name, values in levels.items() if values is not None}
+        index = pd.MultiIndex.from_product(list(levels.values()), names=list(levels))
+        if isinstance(columns, int):
+            columns = [f"draw_{i}" for i in range(columns)]
+        values = np.random.default_rng(seed).random((len(index), len(columns)))
+        return pd.DataFrame(values, index=index, columns=columns)
+
+    return make_draws
+
+
+class GBDLookups(NamedTuple):
+    locations: dict[str, int]
+    age_bins: pd.DataFrame
+    estimation_years: list[int]
+
+
+@pytest.fixture
+def gbd_lookups(monkeypatch) -> GBDLookups:
+    """Replaces the GBD lookups of vivarium_inputs with a few locations and age groups."""
+    utility_data = pytest.importorskip("vivarium_inputs.utility_data")
+    lookups = GBDLookups(
+        locations={"Ethiopia": 179, "Nigeria": 214, "Pakistan": 165},
+        age_bins=pd.DataFrame(
+            {
+                "age_group_id": [2, 3, 388, 389],
+                "age_group_name": [
+                    "Early Neonatal",
+                    "Late Neonatal",
+                    "1-5 months",
+                    "6-11 months",
+                ],
+                "age_start": [0.0, 0.01917808, 0.07671233, 0.5],
+                "age_end": [0.01917808, 0.07671233, 0.5, 1.0],
+            }
+        ),
+        estimation_years=[2015, 2020, 2023],
+    )
+    location_ids = pd.DataFrame(
+        {
+            "location_name": list(lookups.locations),
+            "location_id": list(lookups.locations.values()),
+        }
+    )
+    monkeypatch.setattr(utility_data, "get_raw_location_ids", lambda: location_ids)
+    monkeypatch.setattr(
+        utility_data, "get_age_bins", lambda *_, **__: lookups.age_bins.copy()
+    )
+    monkeypatch.setattr(
+        utility_data,
+        "get_age_group_ids",
+        lambda *_, **__: lookups.age_bins.age_group_id.tolist(),
+    )
+    monkeypatch.setattr(
+        utility_data, "get_estimation_years", lambda *_, **__: lookups.estimation_years
+    )
+    return lookups
+
+
+@pytest.fixture
+def get_raw_draws(gbd_lookups):
+    """Returns raw GBD draws shaped like ``gbd.get_modelable_entity_draws``."""
+    vi_globals = pytest.importorskip("vivarium_inputs.globals")
+
+    def get_raw_draws(sex_ids: list[int], location_ids: list[int] | None = None):
+        if location_ids is None:
+            location_ids = list(gbd_lookups.locations.values())
+        index = pd.MultiIndex.from_product(
+            [
+                location_ids,
+                sex_ids,
+                gbd_lookups.age_bins.age_group_id,
+                range(2014, 2024),
+                [vi_globals.MEASURES["Prevalence"], vi_globals.MEASURES["Incidence rate"]],
+            ],
+            names=["location_id", "sex_id", "age_group_id", "year_id", "measure_id"],
+        )
+        data = index.to_frame(index=False).assign(metric_id=3, modelable_entity_id=1234)
+        draws = np.random.default_rng(0).random((len(data), 10))
+        draws = pd.DataFrame(draws, columns=vi_globals.DRAW_COLUMNS[:10])
+        data = pd.concat([data, draws], axis=1)
+        return data.sample(frac=1, random_state=0).reset_index(drop=True)
+
+    return get_raw_draws
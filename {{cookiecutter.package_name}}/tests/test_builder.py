@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("vivarium_inputs")
+
+from vivarium.framework.artifact import Artifact
+
+from {{cookiecutter.package_name}} import utilities
+from {{cookiecutter.package_name}}.constants import metadata
+from {{cookiecutter.package_name}}.data import builder, compact, manifest
+
+KEY = "cause.some_disease.prevalence"
+OTHER_KEY = "cause.some_disease.incidence_rate"
+DRAWS = [f"draw_{i}" for i in range(3)]
+
+
+@pytest.fixture
+def get_table(make_draws):
+    return lambda seed: make_draws(DRAWS, seed, years=[2021, 2022])
+
+
+def test_merge_artifacts_copies_keys_as_stored(tmp_path, get_table):
+    artifact = builder.open_artifact(tmp_path / "ethiopia.hdf", "Ethiopia")
+    builder.write_or_replace_data(artifact, KEY, get_table(0))
+
+    shard = builder.open_artifact(tmp_path / "shard.hdf", "Ethiopia")
+    builder.write_or_replace_data(shard, KEY, get_table(1))
+    compact_profile = metadata.WRITE_PROFILES["compact_dtypes"]
+    builder.write_or_replace_data(shard, OTHER_KEY, get_table(2), profile=compact_profile)
+
+    builder.merge_artifacts(artifact, [shard.path])
+    merged = Artifact(artifact.path)
+    assert set(merged.keys) == set(shard.keys)
+    for key in [KEY, OTHER_KEY]:
+        pd.testing.assert_frame_equal(merged.load(key), Artifact(shard.path).load(key))
+    spec = compact.read_spec(artifact.path, OTHER_KEY)
+    assert spec is not None and spec == compact.read_spec(shard.path, OTHER_KEY)
+
+
+def test_compact_tables_load_as_their_values_and_restore_their_dtypes(tmp_path, make_draws):
+    # GBD age groups start at fractions of a year float32 can't hold exactly
+    ages = [0.0, 7 / 365, 28 / 365, 0.5, 1.0, 5.0]
+    data = make_draws(DRAWS, ages=ages, years=[2021, 2022])
+    data["tiny"] = 1e-300
+    compact_profile = metadata.WRITE_PROFILES["compact_dtypes"]
+    artifact = builder.open_artifact(tmp_path / "ethiopia.hdf", "Ethiopia")
+    builder.write_or_replace_data(artifact, KEY, data, profile=compact_profile)
+
+    loaded = Artifact(artifact.path).load(KEY)
+    assert (loaded[DRAWS].dtypes == np.float32).all()
+    assert loaded["tiny"].dtype == np.float64
+    assert loaded.index.get_level_values("age_start").dtype == np.float32
+    assert loaded.index.get_level_values("year_start").dtype == np.int16
+    np.testing.assert_allclose(
+        loaded.index.get_level_values("age_start"),
+        data.index.get_level_values("age_start"),
+        rtol=metadata.COMPACT_DTYPES_RTOL,
+    )
+    np.testing.assert_array_equal(
+        loaded.index.get_level_values("year_start"),
+        data.index.get_level_values("year_start"),
+    )
+    np.testing.assert_allclose(loaded, data, rtol=metadata.COMPACT_DTYPES_RTOL)
+    assert loaded.memory_usage().sum() < data.memory_usage().sum()
+
+    # Merged keys keep their original ages as well
+    merged = builder.open_artifact(tmp_path / "merged.hdf", "Ethiopia")
+    builder.merge_artifacts(merged, [artifact.path])
+    for path in [artifact.path, merged.path]:
+        restored = utilities.read_compact_data(path, KEY)
+        pd.testing.assert_index_equal(restored.index, data.index, exact=False)
+        pd.testing.assert_frame_equal(
+            restored, data, check_index_type=False, rtol=metadata.COMPACT_DTYPES_RTOL
+        )
+
+
+def get_year_chunks(data: pd.DataFrame):
+    return (chunk for _, chunk in data.groupby("year_start", sort=False))
+
+
+def test_write_chunks_writes_the_whole_table(tmp_path, get_table):
+    data = get_table(0).sort_index(level="year_start", sort_remaining=False)
+    artifact = builder.open_artifact(tmp_path / "ethiopia.hdf", "Ethiopia")
+    written = builder.write_or_replace_data(artifact, KEY, get_year_chunks(data), verify=True)
+
+    assert isinstance(written, builder.ChunkedTable)
+    assert written.shape == data.shape
+    assert written.hash == manifest.hash_data(data)
+    pd.testing.assert_frame_equal(Artifact(artifact.path).load(KEY), data)
+
+
+def test_write_chunks_replaces_or_appends_to_stored_tables(tmp_path, get_table):
+    data = get_table(0).sort_index(level="year_start", sort_remaining=False)
+    first_year, second_year = [chunk for chunk in get_year_chunks(data)]
+    artifact = builder.open_artifact(tmp_path / "ethiopia.hdf", "Ethiopia")
+
+    builder.write_chunks(artifact, KEY, iter([second_year]))
+    builder.write_chunks(artifact, KEY, iter([first_year]))
+    pd.testing.assert_frame_equal(Artifact(artifact.path).load(KEY), first_year)
+
+    appended = builder.write_chunks(artifact, KEY, iter([second_year]), append=True)
+    assert appended.shape == data.shape
+    assert appended.hash == manifest.hash_data(second_year)
+    pd.testing.assert_frame_equal(Artifact(artifact.path).load(KEY), data)
+
+    with pytest.raises(ValueError, match="columns"):
+        builder.write_chunks(artifact, KEY, iter([first_year, second_year[DRAWS[:1]]]))
+    with pytest.raises(ValueError, match="empty"):
+        builder.write_chunks(artifact, OTHER_KEY, iter([first_year.iloc[:0]]))
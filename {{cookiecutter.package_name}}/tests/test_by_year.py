@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("vivarium_inputs")
+
+from vivarium.framework.artifact import Artifact
+
+from {{cookiecutter.package_name}}.data import builder
+from {{cookiecutter.package_name}}.data.manifest import ArtifactManifest
+from {{cookiecutter.package_name}}.tools import scheduler
+
+KEY = "cause.some_disease.prevalence"
+DRAWS = [f"draw_{i}" for i in range(3)]
+
+
+@pytest.fixture
+def get_year(make_draws):
+    return lambda year: make_draws(DRAWS, seed=year, ages=[0.0, 5.0], years=[year])
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    return Artifact(tmp_path / "ethiopia.hdf")
+
+
+def test_load_data_by_year_streams_one_year_at_a_time(monkeypatch, get_year):
+    loaded = []
+
+    def get_data(key, location, years):
+        loaded.append(years)
+        return get_year(years)
+
+    monkeypatch.setattr(builder.loader, "get_data", get_data)
+    chunks = builder.load_data_by_year(KEY, "Ethiopia", [2021, 2022, 2023])
+    assert loaded == [2021]
+    assert next(chunks).equals(get_year(2021))
+    assert loaded == [2021]
+    remaining = list(chunks)
+    assert loaded == [2021, 2022, 2023]
+    assert all(chunk.equals(get_year(year)) for year, chunk in zip([2022, 2023], remaining))
+
+
+def test_load_data_by_year_returns_data_without_years_as_is(monkeypatch):
+    age_bins = pd.DataFrame({"age_start": [0.0, 5.0], "age_end": [5.0, 10.0]})
+    monkeypatch.setattr(builder.loader, "get_data", lambda *_: age_bins)
+    assert builder.load_data_by_year(KEY, "Ethiopia", [2021, 2022]) is age_bins
+
+
+def test_write_by_year_appends_years(artifact, get_year):
+    years = [2021, 2022]
+    written = builder.write_by_year(artifact, KEY, iter(get_year(year) for year in years))
+    appended = builder.write_by_year(artifact, KEY, get_year(2023), append=True, verify=True)
+
+    expected = pd.concat([get_year(year) for year in [2021, 2022, 2023]])
+    assert written.shape == (8, 3)
+    assert appended.shape == (12, 3)
+    pd.testing.assert_frame_equal(Artifact(artifact.path).load(KEY), expected)
+
+
+def test_write_by_year_rejects_appending_to_missing_keys(artifact, get_year):
+    with pytest.raises(ValueError, match="isn't in the artifact"):
+        builder.write_by_year(artifact, KEY, get_year(2023), append=True)
+
+
+def test_manifest_records_appended_years(artifact, get_year):
+    manifest = ArtifactManifest(artifact.path)
+    written = builder.write_by_year(artifact, KEY, iter([get_year(2021), get_year(2022)]))
+    manifest.record(KEY, shape=written.shape, content_hash=written.hash, years=[2021, 2022])
+    assert builder.get_missing_years(manifest, KEY, [2021, 2022, 2023]) == [2023]
+
+    appended = builder.write_by_year(artifact, KEY, get_year(2023), append=True)
+    manifest.extend(KEY, appended.shape, appended.hash, [2023])
+    assert manifest.get_years(KEY) == [2021, 2022, 2023]
+    assert manifest.keys[KEY]["shape"] == [12, 3]
+    assert not manifest.has_hash(KEY, written.hash)
+    assert builder.get_missing_years(manifest, KEY, [2021, 2022, 2023]) == []
+
+
+def test_inputs_load_the_years_of_their_dependents(tmp_path):
+    graph = {"paf": ["exposure", "relative_risk"], "exposure": [], "relative_risk": []}
+    manifest = ArtifactManifest(tmp_path / "ethiopia.hdf")
+    manifest.keys["paf"] = {"years": [2021, 2022]}
+    years = scheduler.get_years_to_load(
+        graph, {"paf", "exposure"}, [2021, 2022, 2023], manifest, {"paf"}
+    )
+    assert years == {
+        "paf": [2023],
+        "exposure": [2021, 2022, 2023],
+        "relative_risk": [2023],
+    }
+
+
+def test_estimation_years_are_the_only_years_built_by_year(artifact, monkeypatch):
+    monkeypatch.setattr(builder.loader, "get_estimation_years", lambda: [2021, 2023])
+    assert builder.parse_years("estimation") == [2021, 2023]
+    assert builder.parse_years("all") == "all"
+    # "all" also holds the years between estimation years
+    with pytest.raises(ValueError, match='requires years "estimation"'):
+        scheduler.build_keys(artifact, "Ethiopia", "all", (), by_year=True)
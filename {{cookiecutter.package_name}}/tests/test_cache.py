@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from {{cookiecutter.package_name}}.data import cache
+
+KEY = "cause.some_disease.prevalence"
+
+
+def get_extract(rows: int = 10) -> pd.DataFrame:
+    values = np.random.default_rng(0).random((rows, 3))
+    return pd.DataFrame(values, columns=[f"draw_{i}" for i in range(3)])
+
+
+@pytest.fixture
+def data_cache(tmp_path):
+    return cache.DataCache(tmp_path / "cache", max_size=1)
+
+
+def test_cache_hits_saved_extracts(data_cache):
+    data = get_extract()
+    data_cache.save(KEY, "Ethiopia", 2021, data)
+    pd.testing.assert_frame_equal(data_cache.load(KEY, "Ethiopia", 2021), data)
+
+
+@pytest.mark.parametrize(
+    "location, years, draw_count",
+    [("Nigeria", 2021, None), ("Ethiopia", 2022, None), ("Ethiopia", 2021, 10)],
+)
+def test_cache_misses_other_extracts(data_cache, location, years, draw_count):
+    data_cache.save(KEY, "Ethiopia", 2021, get_extract())
+    assert data_cache.load(KEY, location, years, draw_count) is None
+
+
+def test_cache_misses_refreshed_keys(tmp_path):
+    cache.DataCache(tmp_path, max_size=1).save(KEY, "Ethiopia", 2021, get_extract())
+    refreshing = cache.DataCache(tmp_path, max_size=1, refresh_keys=(KEY,))
+    assert refreshing.load(KEY, "Ethiopia", 2021) is None
+
+
+def test_cache_misses_extracts_of_edited_loaders(tmp_path, monkeypatch):
+    cache.DataCache(tmp_path, max_size=1).save(KEY, "Ethiopia", 2021, get_extract())
+    monkeypatch.setattr(cache, "get_source_hash", lambda: "edited")
+    assert cache.DataCache(tmp_path, max_size=1).load(KEY, "Ethiopia", 2021) is None
+
+
+def test_cache_evicts_least_recently_used_extracts(data_cache):
+    for i, year in enumerate([2021, 2022, 2023]):
+        data_cache.save(KEY, "Ethiopia", year, get_extract(1000))
+        os.utime(data_cache._get_path(KEY, "Ethiopia", year), (1000 + i, 1000 + i))
+    # Loading the oldest extract makes it the most recently used
+    data_cache.load(KEY, "Ethiopia", 2021)
+
+    extract_size = data_cache._get_path(KEY, "Ethiopia", 2021).stat().st_size
+    data_cache.max_size = 2.5 * extract_size / 1024**3
+    data_cache.evict()
+    assert data_cache.load(KEY, "Ethiopia", 2021) is not None
+    assert data_cache.load(KEY, "Ethiopia", 2022) is None
+    assert data_cache.load(KEY, "Ethiopia", 2023) is not None
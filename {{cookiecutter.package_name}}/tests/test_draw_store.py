@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("vivarium_inputs")
+
+from vivarium.framework.artifact import Artifact
+
+from {{cookiecutter.package_name}} import utilities
+from {{cookiecutter.package_name}}.data import builder, draw_store
+
+KEY = "risk_factor.low_birth_weight_and_short_gestation.exposure"
+DRAWS = [f"draw_{i}" for i in range(4)]
+
+
+@pytest.fixture
+def exposure(make_draws):
+    return make_draws(DRAWS, ages=[0.0, 0.01], years=None, parameter=["cat1", "cat2"])
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    return Artifact(tmp_path / "pakistan.hdf")
+
+
+def test_write_data_by_draw_round_trips_and_registers_the_key(artifact, exposure):
+    blocks = iter([exposure[DRAWS[:2]], exposure[DRAWS[2:]]])
+    builder.write_data_by_draw(artifact, KEY, blocks)
+
+    root = draw_store.get_draw_store_root(artifact.path)
+    pd.testing.assert_frame_equal(draw_store.read_draws(root, KEY), exposure)
+    single_draw = draw_store.read_draws(root, KEY, 2)
+    pd.testing.assert_frame_equal(single_draw, exposure[["draw_2"]])
+    assert not single_draw["draw_2"].to_numpy().flags.writeable
+
+    reopened = Artifact(artifact.path)
+    assert KEY in reopened
+    assert reopened.load(KEY) == draw_store.get_pointer(KEY)
+    assert not builder.needs_data(reopened, KEY, replace=False)
+    builder.verify_data(reopened, KEY, exposure)
+
+
+def test_draws_are_merged_with_their_stubs(tmp_path, artifact, exposure):
+    shard = Artifact(tmp_path / "pakistan_shard.hdf")
+    builder.write_data_by_draw(shard, KEY, exposure)
+    builder.write_data_by_draw(artifact, KEY, exposure[DRAWS[:2]])
+
+    builder.merge_artifacts(artifact, [shard.path])
+    merged = Artifact(artifact.path)
+    assert merged.load(KEY) == draw_store.get_pointer(KEY)
+    root = draw_store.get_draw_store_root(artifact.path)
+    pd.testing.assert_frame_equal(draw_store.read_draws(root, KEY), exposure)
+
+
+def test_draw_blocks_must_share_an_index(artifact, exposure):
+    blocks = iter([exposure[DRAWS[:2]], exposure[DRAWS[2:]].iloc[::-1]])
+    with pytest.raises(ValueError, match="same index"):
+        builder.write_data_by_draw(artifact, KEY, blocks)
+
+
+def test_rollback_removes_draws(artifact, exposure):
+    builder.write_data_by_draw(artifact, KEY, exposure)
+    builder.rollback_keys(artifact, [KEY])
+    assert KEY not in Artifact(artifact.path)
+    assert not draw_store.has_key(draw_store.get_draw_store_root(artifact.path), KEY)
+
+
+def test_draws_are_read_from_either_layout(tmp_path, artifact, exposure):
+    builder.write_data_by_draw(artifact, KEY, exposure)
+
+    # Artifacts built before the draw store hold one node per draw
+    legacy_path = tmp_path / "legacy.hdf"
+    node = KEY.replace(".", "/")
+    with pd.HDFStore(legacy_path, mode="a") as store:
+        store.put(f"{node}/index", exposure.index.to_frame(index=False))
+        for column in DRAWS:
+            store.put(f"{node}/{column}", exposure[column].reset_index(drop=True))
+
+    expected = exposure["draw_3"].rename("value").reset_index()
+    pd.testing.assert_frame_equal(utilities._read_draw(artifact.path, KEY, 3), expected)
+    pd.testing.assert_frame_equal(utilities._read_draw(legacy_path, KEY, 3), expected)
@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+from typing import NamedTuple
+
+import pytest
+
+from {{cookiecutter.package_name}}.tools import cluster_resources
+from {{cookiecutter.package_name}}.tools.job_monitor import JobMonitor
+
+
+class ExitTimeoutException(Exception):
+    pass
+
+
+JOB_STATES = [
+    "UNDETERMINED",
+    "QUEUED_ACTIVE",
+    "SYSTEM_ON_HOLD",
+    "USER_ON_HOLD",
+    "USER_SYSTEM_ON_HOLD",
+    "RUNNING",
+    "SYSTEM_SUSPENDED",
+    "USER_SUSPENDED",
+    "DONE",
+    "FAILED",
+]
+DRMAA = SimpleNamespace(
+    ExitTimeoutException=ExitTimeoutException,
+    Session=SimpleNamespace(JOB_IDS_SESSION_ANY="any"),
+    JobState=SimpleNamespace(**{state: state for state in JOB_STATES}),
+)
+
+
+class Job(NamedTuple):
+    name: str
+    location: str
+    resources: cluster_resources.JobResources
+    retries: int = 0
+
+
+def get_job_info(job_id: str, exit_status: int = 0, signal: str | None = None):
+    return SimpleNamespace(
+        jobId=job_id,
+        hasExited=signal is None,
+        exitStatus=exit_status,
+        hasSignal=signal is not None,
+        terminatedSignal=signal,
+        wasAborted=False,
+    )
+
+
+class FakeSession:
+    """Finishes jobs in a set order, timing out when given ``None``."""
+
+    def __init__(self, finished: list):
+        self.finished = list(finished)
+        self.waits = []
+        self.status_queries = []
+
+    def wait(self, job_id, timeout):
+        self.waits.append(job_id)
+        job_info = self.finished.pop(0)
+        if job_info is None:
+            raise ExitTimeoutException()
+        return job_info
+
+    def jobStatus(self, job_id):
+        self.status_queries.append(job_id)
+        return "RUNNING"
+
+
+def get_jobs(count: int) -> dict[str, Job]:
+    resources = cluster_resources.JobResources(10, 1, "3:00:00")
+    return {str(i): Job(f"location_{i}", f"Location {i}", resources) for i in range(count)}
+
+
+def test_monitor_waits_on_any_job_without_polling_statuses():
+    session = FakeSession(
+        [None, get_job_info("1"), None, get_job_info("0", exit_status=1), get_job_info("2")]
+    )
+    failures = JobMonitor(session, DRMAA, submit=None).run(get_jobs(3))
+
+    assert set(session.waits) == {"any"}
+    assert session.status_queries == []
+    assert [(failure.job_id, failure.reason) for failure in failures] == [
+        ("0", "exit status 1")
+    ]
+
+
+def test_monitor_bounds_status_queries_per_cycle():
+    session = FakeSession([None, None, None] + [get_job_info(str(i)) for i in range(5)])
+    JobMonitor(session, DRMAA, submit=None, verbose=1, max_status_queries=2).run(get_jobs(5))
+    # Two queries per timeout, taking turns between the jobs
+    assert session.status_queries == ["0", "1", "2", "3", "4", "0"]
+
+
+def test_monitor_resubmits_killed_jobs():
+    killed = get_job_info("0", exit_status=cluster_resources.KILLED_EXIT_STATUS)
+    session = FakeSession([killed, get_job_info("10")])
+    submitted = []
+
+    def submit(job):
+        submitted.append(job)
+        return "10"
+
+    failures = JobMonitor(session, DRMAA, submit).run(get_jobs(1))
+    assert failures == []
+    assert [job.retries for job in submitted] == [1]
+    assert submitted[0].resources.memory == 20
+
+
+@pytest.mark.parametrize(
+    "job_info, killed",
+    [
+        (get_job_info("0", signal="SIGKILL"), True),
+        (get_job_info("0", signal="XCPU"), True),
+        (get_job_info("0", signal="9"), True),
+        (get_job_info("0", exit_status=152), True),
+        (get_job_info("0", signal="SIGTERM"), False),
+        (get_job_info("0", exit_status=143), False),
+        (get_job_info("0", exit_status=1), False),
+    ],
+)
+def test_only_resource_kills_count_as_killed_for_resources(job_info, killed):
+    assert cluster_resources.was_killed_for_resources(job_info) == killed
+
+
+def test_monitor_fails_cancelled_jobs():
+    session = FakeSession([get_job_info("0", signal="SIGTERM")])
+    failures = JobMonitor(session, DRMAA, submit=None).run(get_jobs(1))
+    assert [(failure.job_id, failure.reason) for failure in failures] == [
+        ("0", "killed by SIGTERM")
+    ]
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from {{cookiecutter.package_name}}.data.paf import compute_categorical_paf
+
+DRAWS = [f"draw_{i}" for i in range(5)]
+CATEGORIES = ["cat1", "cat2", "cat3"]
+
+
+def reference_paf(exposure: pd.DataFrame, relative_risk: pd.DataFrame) -> pd.DataFrame:
+    # The data frame computation the PAF engine replaced
+    groups = [name for name in relative_risk.index.names if name != "parameter"]
+    sum_exp_x_rr = (exposure * relative_risk).groupby(groups).sum()
+    return (sum_exp_x_rr - 1) / sum_exp_x_rr
+
+
+@pytest.fixture
+def exposure(make_draws):
+    exposure = make_draws(DRAWS, parameter=CATEGORIES)
+    return exposure / exposure.groupby(["sex", "age_start", "year_start"]).transform("sum")
+
+
+@pytest.fixture
+def relative_risk(exposure):
+    frames = []
+    for affected_entity in ["diarrheal_diseases", "lower_respiratory_infections"]:
+        for affected_measure in ["incidence_rate", "excess_mortality_rate"]:
+            frames.append(
+                pd.concat(
+                    {(affected_entity, affected_measure): 1 + exposure.iloc[::-1]},
+                    names=["affected_entity", "affected_measure"],
+                )
+            )
+    return pd.concat(frames)
+
+
+def test_compute_categorical_paf_matches_reference(exposure, relative_risk):
+    paf = compute_categorical_paf(exposure, relative_risk)
+    expected = reference_paf(exposure, relative_risk)
+    pd.testing.assert_frame_equal(paf, expected)
+
+
+def test_compute_categorical_paf_skips_missing_exposure(exposure, relative_risk):
+    exposure = exposure.drop("cat2", level="parameter")
+    paf = compute_categorical_paf(exposure, relative_risk)
+    expected = reference_paf(exposure, relative_risk)
+    pd.testing.assert_frame_equal(paf, expected)
+
+
+def test_compute_categorical_paf_handles_unsorted_relative_risk(exposure, relative_risk):
+    # Shuffled rows with some categories missing for some groups
+    relative_risk = relative_risk.sample(frac=1, random_state=0).iloc[5:]
+    paf = compute_categorical_paf(exposure, relative_risk)
+    expected = reference_paf(exposure, relative_risk)
+    pd.testing.assert_frame_equal(paf, expected)
+
+
+def test_compute_categorical_paf_rejects_mismatched_draws(exposure, relative_risk):
+    with pytest.raises(ValueError, match="draw columns"):
+        compute_categorical_paf(exposure, relative_risk[DRAWS[:2]])
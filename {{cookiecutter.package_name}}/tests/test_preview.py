@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from {{cookiecutter.package_name}}.constants import metadata
+from {{cookiecutter.package_name}}.data import preview
+
+
+@pytest.fixture
+def draws(make_draws):
+    return make_draws(metadata.ARTIFACT_COLUMNS, ages=[0.0, 5.0], years=None)
+
+
+@pytest.fixture(autouse=True)
+def preview_build():
+    preview.enable_preview(10)
+    yield
+    preview.disable_preview()
+
+
+def test_subset_draws_keeps_the_first_draws(draws):
+    subset = preview.subset_draws(draws)
+    pd.testing.assert_frame_equal(subset, draws[[f"draw_{i}" for i in range(10)]])
+
+
+def test_subset_draws_keeps_other_columns(draws):
+    data = draws.assign(value=1.0)[["value"] + list(draws.columns)]
+    subset = preview.subset_draws(data)
+    assert list(subset.columns) == ["value"] + [f"draw_{i}" for i in range(10)]
+
+    population = pd.DataFrame({"location": ["Ethiopia"], "value": [1.0]})
+    assert preview.subset_draws(population) is population
+    assert preview.subset_draws("Ethiopia") == "Ethiopia"
+
+
+def test_subset_draws_subsets_each_chunk(draws):
+    chunks = preview.subset_draws(iter([draws.iloc[:2], draws.iloc[2:]]))
+    pd.testing.assert_frame_equal(pd.concat(chunks), preview.subset_draws(draws))
+
+
+def test_disabled_preview_keeps_every_draw(draws):
+    preview.disable_preview()
+    assert preview.get_draw_count() is None
+    assert preview.subset_draws(draws) is draws
+
+
+@pytest.mark.parametrize("draw_count", [0, metadata.DRAW_COUNT + 1])
+def test_enable_preview_rejects_invalid_draw_counts(draw_count):
+    with pytest.raises(ValueError, match="between 1 and"):
+        preview.enable_preview(draw_count)
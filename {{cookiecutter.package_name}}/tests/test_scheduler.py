@@ -0,0 +1,216 @@
+import threading
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("vivarium_inputs")
+
+from vivarium.framework.artifact import Artifact, hdf
+
+from {{cookiecutter.package_name}}.constants import data_keys, metadata
+from {{cookiecutter.package_name}}.data import builder, cache, journal, loader
+from {{cookiecutter.package_name}}.data.manifest import ArtifactManifest
+from {{cookiecutter.package_name}}.tools import make_artifacts, scheduler
+from {{cookiecutter.package_name}}.tools.build_metrics import BuildMetrics, get_key_size
+
+STRUCTURE = data_keys.POPULATION.STRUCTURE
+DEMOGRAPHY = data_keys.POPULATION.DEMOGRAPHY
+TMRLE = data_keys.POPULATION.TMRLE
+ACMR = data_keys.POPULATION.ACMR
+
+
+class KeyGroup(list):
+    name = "test"
+
+
+def get_table(value: float) -> pd.DataFrame:
+    index = pd.Index([0.0, 5.0], name="age_start")
+    return pd.DataFrame({"draw_0": [value, value]}, index=index)
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Loads ACMR and TMRLE from shared structure and demography inputs."""
+    loads = []
+    lock = threading.Lock()
+
+    def load(key, location, years):
+        with lock:
+            loads.append((key, location, years))
+        if key in [ACMR, TMRLE]:
+            inputs = [loader.get_data(input_key, location, years) for input_key in graph[key]]
+            return get_table(sum(data["draw_0"].iloc[0] for data in inputs))
+        return get_table(1.0)
+
+    graph = {ACMR: [STRUCTURE], TMRLE: [STRUCTURE, DEMOGRAPHY]}
+    monkeypatch.setattr(data_keys, "KEY_DEPENDENCIES", graph)
+    monkeypatch.setattr(data_keys, "MAKE_ARTIFACT_KEY_GROUPS", [KeyGroup([ACMR, TMRLE])])
+    monkeypatch.setattr(cache, "get_active_cache", lambda: None)
+    monkeypatch.setattr(loader.interface, "load_standard_data", load, raising=False)
+    monkeypatch.setattr(
+        loader.interface, "get_population_structure", lambda *args: load(STRUCTURE, *args)
+    )
+    monkeypatch.setattr(
+        loader.interface, "get_demographic_dimensions", lambda *args: load(DEMOGRAPHY, *args)
+    )
+    monkeypatch.setattr(
+        loader,
+        "load_theoretical_minimum_risk_life_expectancy",
+        lambda key, location, years: load(key, location, years),
+    )
+    return loads
+
+
+def test_build_keys_loads_shared_inputs_once_before_their_dependents(
+    tmp_path, loads, monkeypatch
+):
+    releases = []
+    shared_inputs = []
+
+    class SharedInputs(cache.SharedInputs):
+        def __init__(self, consumer_counts):
+            super().__init__(consumer_counts)
+            shared_inputs.append(self)
+
+        def release(self, key):
+            releases.append(key)
+            super().release(key)
+
+    monkeypatch.setattr(cache, "SharedInputs", SharedInputs)
+    artifact = Artifact(tmp_path / "ethiopia.hdf")
+    scheduler.build_keys(artifact, "Ethiopia", "2021", (), workers=2)
+
+    loaded = [key for key, _, _ in loads]
+    assert sorted(loaded) == sorted([STRUCTURE, DEMOGRAPHY, ACMR, TMRLE])
+    assert loaded.index(STRUCTURE) < loaded.index(ACMR)
+    assert max(loaded.index(STRUCTURE), loaded.index(DEMOGRAPHY)) < loaded.index(TMRLE)
+    assert all(years == 2021 for _, _, years in loads)
+
+    assert sorted(releases) == sorted([STRUCTURE, STRUCTURE, DEMOGRAPHY])
+    assert shared_inputs[0].get(STRUCTURE, "Ethiopia", 2021) is None
+    assert set(artifact.keys) >= {ACMR, TMRLE}
+    assert STRUCTURE not in artifact
+    assert artifact.load(TMRLE)["draw_0"].iloc[0] == 2.0
+
+
+def test_shared_inputs_are_only_returned_for_the_years_they_were_loaded_for():
+    shared_inputs = cache.SharedInputs({STRUCTURE: 1})
+    data = get_table(1.0)
+    shared_inputs.put(STRUCTURE, "Ethiopia", [2021, 2022], data)
+    assert shared_inputs.get(STRUCTURE, "Ethiopia", [2021, 2022]) is data
+    assert shared_inputs.get(STRUCTURE, "Ethiopia", None) is None
+    assert shared_inputs.get(STRUCTURE, "Nigeria", [2021, 2022]) is None
+
+    shared_inputs.release(STRUCTURE)
+    assert shared_inputs.get(STRUCTURE, "Ethiopia", [2021, 2022]) is None
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_build_keys_records_key_metrics(tmp_path, loads, workers):
+    artifact = builder.open_artifact(tmp_path / "ethiopia.hdf", "Ethiopia")
+    metrics = BuildMetrics("Ethiopia")
+    scheduler.build_keys(artifact, "Ethiopia", "2021", (), workers=workers, metrics=metrics)
+
+    written = {m.key: m for m in metrics.keys if m.key in [ACMR, TMRLE]}
+    assert len(written) == 2
+    assert all(m.bytes_on_disk > 0 for m in written.values())
+    # Keys stored as JSON have a size as well
+    assert get_key_size(artifact.path, data_keys.METADATA_LOCATIONS) > 0
+    assert all((m.rows, m.columns) == (2, 1) for m in written.values())
+    # Memory is only attributed to keys built one at a time
+    assert all(m.peak_memory > 0 for m in metrics.keys)
+
+
+def test_interrupted_builds_roll_back_incomplete_keys_and_resume(
+    tmp_path, loads, monkeypatch
+):
+    path = tmp_path / "ethiopia.hdf"
+    write_or_replace_data = builder.write_or_replace_data
+
+    def write_and_die(artifact, key, data, *args, **kwargs):
+        if key == TMRLE:
+            # The build dies part way through writing the key
+            hdf.write(artifact.path, key, data.iloc[:1])
+            raise MemoryError
+        return write_or_replace_data(artifact, key, data, *args, **kwargs)
+
+    monkeypatch.setattr(builder, "write_or_replace_data", write_and_die)
+    with pytest.raises(MemoryError):
+        make_artifacts.build_single_location_artifact(
+            path, "Ethiopia", "2021", use_cache=False
+        )
+    assert journal.is_interrupted(path)
+    build_journal = journal.BuildJournal(path)
+    assert build_journal.get_incomplete() == [TMRLE]
+    completed = build_journal.get_complete()
+    assert ACMR in completed
+    assert TMRLE in hdf.get_keys(path) and TMRLE not in Artifact(path)
+
+    monkeypatch.setattr(builder, "write_or_replace_data", write_or_replace_data)
+    loads.clear()
+    make_artifacts.build_single_location_artifact(path, "Ethiopia", "2021", use_cache=False)
+
+    assert not journal.is_interrupted(path)
+    loaded = [key for key, _, _ in loads]
+    assert TMRLE in loaded
+    assert not set(completed) & set(loaded)
+    artifact = Artifact(path)
+    assert set(artifact.keys) >= {ACMR, TMRLE}
+    assert artifact.load(TMRLE).shape == (2, 1)
+    assert artifact.load(TMRLE)["draw_0"].iloc[0] == 2.0
+
+
+def test_replaced_keys_are_only_rewritten_if_their_data_or_profile_changed(
+    tmp_path, loads, monkeypatch
+):
+    path = tmp_path / "ethiopia.hdf"
+    make_artifacts.build_single_location_artifact(path, "Ethiopia", "2021", use_cache=False)
+    manifest = ArtifactManifest(path)
+    manifest.keys[TMRLE].update(versions={}, built="2000-01-01T00:00:00")
+    manifest.save("Ethiopia")
+
+    written = []
+    write_or_replace_data = builder.write_or_replace_data
+
+    def write(artifact, key, *args, **kwargs):
+        written.append(key)
+        return write_or_replace_data(artifact, key, *args, **kwargs)
+
+    monkeypatch.setattr(builder, "write_or_replace_data", write)
+    make_artifacts.build_single_location_artifact(
+        path, "Ethiopia", "2021", replace_keys=(TMRLE,), use_cache=False
+    )
+    assert TMRLE in [key for key, _, _ in loads] and not written
+    # The unchanged key is recorded as pulled again
+    refreshed = ArtifactManifest(path).keys[TMRLE]
+    assert refreshed["versions"] == cache.get_upstream_versions()
+    assert refreshed["built"] != "2000-01-01T00:00:00"
+
+    key_group = data_keys.MAKE_ARTIFACT_KEY_GROUPS[0]
+    monkeypatch.setattr(type(key_group), "write_profile", "compact", raising=False)
+    make_artifacts.build_single_location_artifact(
+        path, "Ethiopia", "2021", replace_keys=(TMRLE,), use_cache=False
+    )
+    assert written == [TMRLE]
+    assert ArtifactManifest(path).has_profile(TMRLE, metadata.WRITE_PROFILES["compact"])
+    assert Artifact(path).load(TMRLE)["draw_0"].iloc[0] == 2.0
+
+
+def test_fanned_out_shards_skip_keys_already_in_the_artifact(tmp_path, loads):
+    path = tmp_path / "ethiopia.hdf"
+    make_artifacts.build_single_location_artifact(path, "Ethiopia", "2021", use_cache=False)
+    built_keys = make_artifacts.get_built_keys(path, replace_keys=(TMRLE,))
+    assert ACMR in built_keys and TMRLE not in built_keys
+
+    loads.clear()
+    shard_path = make_artifacts.get_shard_path(tmp_path, "Ethiopia", "test")
+    shard_path.parent.mkdir()
+    make_artifacts.build_single_location_artifact(
+        shard_path, "Ethiopia", "2021", use_cache=False, skip_keys=tuple(built_keys)
+    )
+    assert ACMR not in [key for key, _, _ in loads]
+    assert ACMR not in Artifact(shard_path) and TMRLE in Artifact(shard_path)
+
+    make_artifacts.merge_shards(tmp_path, "Ethiopia")
+    assert {ACMR, TMRLE} <= set(Artifact(path).keys)
+    assert not shard_path.exists()
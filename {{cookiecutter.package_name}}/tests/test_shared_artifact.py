@@ -0,0 +1,111 @@
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from vivarium.framework.artifact import Artifact
+
+from {{cookiecutter.package_name}}.components import shared_artifact
+
+KEY = "cause.some_disease.prevalence"
+LONG_KEY = "cause.some_disease.incidence_rate"
+DRAWS = [f"draw_{i}" for i in range(5)]
+
+
+@pytest.fixture
+def artifact_path(tmp_path, make_draws):
+    artifact = Artifact(tmp_path / "ethiopia.hdf")
+    artifact.write(KEY, make_draws(DRAWS))
+    # Stored long on draws, with draw as an index level
+    artifact.write(LONG_KEY, make_draws(["value"], draw=range(len(DRAWS))))
+    artifact.write("metadata.locations", ["Ethiopia"])
+    yield artifact.path
+    shared_artifact.release_shared()
+
+
+def get_shared_path(artifact_path, key: str, filter_terms=None):
+    filter_terms = shared_artifact.get_shared_filter_terms(filter_terms)
+    name = shared_artifact.get_shared_table_name(artifact_path, key, filter_terms)
+    return shared_artifact.LOCK_DIR / name
+
+
+@pytest.mark.parametrize(
+    "filter_terms", [None, ["draw == 2"], ["draw in [1, 3]", "sex == 'Female'"]]
+)
+def test_shared_artifact_loads_what_artifact_loads(artifact_path, filter_terms):
+    shared = shared_artifact.SharedMemoryArtifact(artifact_path, filter_terms)
+    artifact = Artifact(artifact_path, filter_terms)
+    for key in [KEY, LONG_KEY]:
+        pd.testing.assert_frame_equal(shared.load(key), artifact.load(key))
+    assert shared.load("metadata.locations") == artifact.load("metadata.locations")
+
+
+def test_tables_long_on_draws_only_keep_the_rows_of_the_simulated_draw(artifact_path):
+    shared = shared_artifact.SharedMemoryArtifact(artifact_path, ["draw == 3"])
+    expected = Artifact(artifact_path, filter_terms=["draw == 3"]).load(LONG_KEY)
+    pd.testing.assert_frame_equal(shared.load(LONG_KEY), expected)
+    assert set(expected.index.get_level_values("draw")) == {3}
+
+
+def test_shared_tables_are_read_only_views(artifact_path):
+    first = shared_artifact.SharedMemoryArtifact(artifact_path).load(KEY)
+    second = shared_artifact.SharedMemoryArtifact(artifact_path).load(KEY)
+    assert np.shares_memory(first.to_numpy(), second.to_numpy())
+    with pytest.raises(ValueError, match="read-only"):
+        first.to_numpy()[0, 0] = 0
+
+
+def test_workers_simulating_different_draws_share_tables(artifact_path):
+    first = shared_artifact.SharedMemoryArtifact(artifact_path, ["draw == 1"])
+    second = shared_artifact.SharedMemoryArtifact(artifact_path, ["draw == 2"])
+    assert list(first.load(KEY).columns) == ["draw_1"]
+    assert list(second.load(KEY).columns) == ["draw_2"]
+
+    def load_unshared():
+        pytest.fail("The table was not shared between draws.")
+
+    tables = [
+        shared_artifact.load_shared(
+            get_shared_path(artifact_path, KEY, terms).name, load_unshared
+        )
+        for terms in [["draw == 1"], ["draw == 2"]]
+    ]
+    assert np.shares_memory(tables[0].to_numpy(), tables[1].to_numpy())
+    assert list(tables[0].columns) == DRAWS
+
+
+def test_shared_tables_outlive_workers_until_the_last_detaches(artifact_path):
+    shared_artifact.SharedMemoryArtifact(artifact_path).load(KEY)
+    shared_path = get_shared_path(artifact_path, KEY)
+    lock_path = shared_path.with_name(f"{shared_path.name}.lock")
+    assert shared_path.exists() and lock_path.exists()
+
+    # Another worker on the node attaches to the table and exits
+    worker = (
+        "from {{cookiecutter.package_name}}.components import shared_artifact; "
+        f"artifact = shared_artifact.SharedMemoryArtifact({str(artifact_path)!r}); "
+        f"print(artifact.load({KEY!r}).to_numpy().sum())"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", worker], capture_output=True, text=True, check=True
+    )
+    expected = Artifact(artifact_path).load(KEY).to_numpy().sum()
+    assert float(result.stdout) == pytest.approx(expected)
+    assert shared_path.exists() and lock_path.exists()
+
+    shared_artifact.release_shared()
+    assert not shared_path.exists()
+    assert not lock_path.exists()
+
+
+def test_last_worker_removes_tables_without_resource_tracker_errors(artifact_path):
+    worker = (
+        "from {{cookiecutter.package_name}}.components import shared_artifact; "
+        f"shared_artifact.SharedMemoryArtifact({str(artifact_path)!r}).load({KEY!r})"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", worker], capture_output=True, text=True, check=True
+    )
+    assert "Traceback" not in result.stderr
+    assert not get_shared_path(artifact_path, KEY).exists()
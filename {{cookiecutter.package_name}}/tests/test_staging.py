@@ -0,0 +1,92 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("vivarium_inputs")
+# Staged draws are stored as parquet
+pytest.importorskip("pyarrow")
+
+from {{cookiecutter.package_name}}.constants import data_keys, metadata
+from {{cookiecutter.package_name}}.data import builder, cache, staging
+from {{cookiecutter.package_name}}.data.loader import transform_gbd_draws
+from {{cookiecutter.package_name}}.tools import make_artifacts
+
+KEY = "cause.some_disease.prevalence"
+MEASURES = ["Prevalence", "Incidence rate"]
+
+
+class FakeGBD:
+    """Stand-in for :mod:`vivarium_gbd_access.gbd` that records its queries."""
+
+    def __init__(self, locations: dict[str, int], draws: pd.DataFrame):
+        self.locations = locations
+        self.draws = draws
+        self.queries = []
+
+    def get_location_ids(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "location_name": list(self.locations),
+                "location_id": list(self.locations.values()),
+            }
+        )
+
+    def get_modelable_entity_draws(self, meid: int, location_ids: list[int]) -> pd.DataFrame:
+        self.queries.append((meid, location_ids))
+        return self.draws[self.draws.location_id.isin(location_ids)]
+
+
+class KeyGroup(list):
+    name = "test"
+
+
+@pytest.fixture
+def staging_dir(tmp_path):
+    yield staging.get_staging_dir(tmp_path)
+    staging.disable_staging()
+
+
+def test_stage_modelable_entities_pulls_once_for_all_locations(
+    staging_dir, gbd_lookups, get_raw_draws
+):
+    draws = get_raw_draws([1, 2])
+    gbd = FakeGBD(gbd_lookups.locations, draws)
+    locations = list(gbd_lookups.locations)
+    staging.stage_modelable_entities(staging_dir, locations, {1234: MEASURES}, gbd=gbd)
+    assert gbd.queries == [(1234, list(gbd_lookups.locations.values()))]
+
+    assert staging.load_staged(1234, "Prevalence", "Nigeria") is None
+    staging.enable_staging(staging_dir)
+    for location, location_id in gbd_lookups.locations.items():
+        for measure in MEASURES:
+            # What a location build pulls on its own
+            location_draws = draws[draws.location_id == location_id]
+            expected = transform_gbd_draws(location_draws, measure, [location])
+            pd.testing.assert_frame_equal(
+                staging.load_staged(1234, measure, location),
+                expected.droplevel("location"),
+            )
+    assert staging.load_staged(1234, "Remission rate", "Nigeria") is None
+
+
+def test_only_locations_that_need_building_are_staged(tmp_path, gbd_lookups, monkeypatch):
+    staged = []
+    monkeypatch.setattr(metadata, "LOCATIONS", list(gbd_lookups.locations))
+    monkeypatch.setattr(metadata, "STAGED_MODELABLE_ENTITIES", {1234: MEASURES})
+    monkeypatch.setattr(data_keys, "MAKE_ARTIFACT_KEY_GROUPS", [KeyGroup([KEY])])
+    monkeypatch.setattr(cache, "get_active_cache", lambda: None)
+    monkeypatch.setattr(builder, "load_data", lambda *args: pd.DataFrame({"draw_0": [1.0]}))
+    monkeypatch.setattr(
+        staging,
+        "stage_modelable_entities",
+        lambda staging_dir, locations: staged.append(locations),
+    )
+
+    for location in ["Ethiopia", "Nigeria"]:
+        make_artifacts.build_single(location, "2021", tmp_path, (), use_cache=False)
+    assert make_artifacts.stage_modelable_entities(tmp_path) is not None
+    assert staged == [["Pakistan"]]
+
+    make_artifacts.build_single("Pakistan", "2021", tmp_path, (), use_cache=False)
+    assert make_artifacts.stage_modelable_entities(tmp_path) is None
+    assert make_artifacts.stage_modelable_entities(tmp_path, replace_keys=(KEY,))
+    assert staged == [["Pakistan"], list(gbd_lookups.locations)]
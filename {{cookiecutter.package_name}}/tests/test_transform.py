@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+vi_globals = pytest.importorskip("vivarium_inputs.globals")
+vi_utils = pytest.importorskip("vivarium_inputs.utilities")
+
+from {{cookiecutter.package_name}}.data import preview
+from {{cookiecutter.package_name}}.data.loader import transform_gbd_draws
+
+
+def reference_transform(
+    data: pd.DataFrame, measure: str, locations: list[str]
+) -> pd.DataFrame:
+    # The chain of full-frame passes the fused transform replaced
+    data = data[data.measure_id == vi_globals.MEASURES[measure]]
+    data = vi_utils.normalize(data, cols_to_fill=vi_globals.DRAW_COLUMNS, fill_value=0)
+    data = data.filter(vi_globals.DEMOGRAPHIC_COLUMNS + vi_globals.DRAW_COLUMNS)
+    data = vi_utils.reshape(data, value_cols=vi_globals.DRAW_COLUMNS)
+    data = vi_utils.scrub_gbd_conventions(data, locations)
+    data = vi_utils.split_interval(data, interval_column="age", split_column_prefix="age")
+    data = vi_utils.split_interval(data, interval_column="year", split_column_prefix="year")
+    return vi_utils.sort_hierarchical_data(data)
+
+
+@pytest.fixture(autouse=True)
+def locations(gbd_lookups) -> list[str]:
+    return list(gbd_lookups.locations)
+
+
+@pytest.mark.parametrize(
+    "sex_ids", [[1, 2, 3], [1, 2], [1]], ids=["combined", "both", "male"]
+)
+@pytest.mark.parametrize("measure", ["Prevalence", "Incidence rate"])
+def test_transform_gbd_draws_matches_reference(get_raw_draws, locations, sex_ids, measure):
+    data = get_raw_draws(sex_ids)
+    expected = reference_transform(data.copy(), measure, locations)
+    transformed = transform_gbd_draws(data, measure, locations)
+    pd.testing.assert_frame_equal(transformed, expected)
+
+
+def test_transform_gbd_draws_takes_preview_draws(get_raw_draws, locations):
+    data = get_raw_draws([1, 2])
+    expected = reference_transform(data.copy(), "Prevalence", locations)
+    preview.enable_preview(3)
+    try:
+        transformed = transform_gbd_draws(data, "Prevalence", locations)
+    finally:
+        preview.disable_preview()
+    pd.testing.assert_frame_equal(transformed, expected[["draw_0", "draw_1", "draw_2"]])
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from {{cookiecutter.package_name}} import utilities
+from {{cookiecutter.package_name}}.constants import metadata
+
+DISTRIBUTIONS = {
+    "relative_risk": stats.lognorm(s=0.1, scale=1.5),
+    "coverage": stats.uniform(0.2, 0.6),
+}
+
+
+def test_parameter_draws_are_reproducible():
+    draws = utilities.get_random_variable_draws_for_parameters(
+        metadata.ARTIFACT_COLUMNS, DISTRIBUTIONS
+    )
+    again = utilities.get_random_variable_draws_for_parameters(
+        metadata.ARTIFACT_COLUMNS, DISTRIBUTIONS
+    )
+    pd.testing.assert_frame_equal(draws, again)
+    assert draws.index.equals(metadata.ARTIFACT_COLUMNS)
+    assert draws.notna().all().all()
+    assert not np.allclose(*[stats.rankdata(draws[seed]) for seed in DISTRIBUTIONS])
+
+
+def test_parameter_draws_do_not_depend_on_the_draws_sampled_alongside():
+    draws = utilities.get_random_variable_draws_for_parameters(
+        metadata.ARTIFACT_COLUMNS, DISTRIBUTIONS
+    )
+    first_draws = utilities.get_random_variable_draws_for_parameters(
+        metadata.ARTIFACT_COLUMNS[:10], {"coverage": DISTRIBUTIONS["coverage"]}
+    )
+    pd.testing.assert_frame_equal(first_draws, draws.iloc[:10][["coverage"]])
+
+
+def test_parameter_draws_leave_the_global_random_state_alone():
+    np.random.seed(1234)
+    expected = np.random.random(5)
+
+    np.random.seed(1234)
+    utilities.get_random_variable_draws_for_parameters(
+        metadata.ARTIFACT_COLUMNS, DISTRIBUTIONS
+    )
+    assert np.random.random(5) == pytest.approx(expected)